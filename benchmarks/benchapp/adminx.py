@@ -0,0 +1,70 @@
+import xadmin
+from xadmin import views
+from xadmin.views import BaseAdminPlugin, ListAdminView
+
+from benchapp.models import NODES, SCALE, Record, column_names
+
+
+class RecordAdmin(object):
+    list_display = ['title', 'status', 'active', 'amount', 'created'] + column_names()
+    list_filter = ['status', 'active', 'amount', 'created']
+    search_fields = ('title', 'body')
+    aggregate_fields = {'amount': 'sum'}
+    data_charts = {
+        'amount': {'title': 'Amount', 'x-field': 'created', 'y-field': ('amount',)},
+        'amount_by_week': {'title': 'Amount by week', 'x-field': 'created', 'y-field': ('amount', 'id'),
+                           'bucket': 'week', 'aggregate': {'amount': 'avg', 'id': 'count'}},
+        'amount_by_hour': {'title': 'Amount by hour', 'x-field': 'created', 'y-field': ('amount',),
+                           'bucket': 'hour', 'downsample': 'lttb'},
+        'amount_by_status': {'title': 'Amount by status', 'x-field': 'status', 'y-field': ('amount',),
+                             'bucket': 'category'},
+        'amount_bins': {'title': 'Amounts', 'x-field': 'amount', 'y-field': ('id',),
+                        'bucket': 100, 'aggregate': 'count'},
+    }
+
+if NODES:
+    # Follows every foreign key of the chain for each row
+    RecordAdmin.list_display += [
+        'parent', '__'.join(['parent'] + ['next'] * (len(NODES) - 1) + ['name'])]
+    RecordAdmin.list_filter.append('parent')
+
+xadmin.site.register(Record, RecordAdmin)
+for node in NODES:
+    xadmin.site.register(node)
+
+
+WIDGETS = (
+    {'type': 'list', 'model': 'benchapp.record', 'params': {'o': '-amount'}},
+    {'type': 'chart', 'model': 'benchapp.record', 'chart': 'amount'},
+    {'type': 'qbutton', 'title': 'Records', 'btns': [{'model': 'benchapp.record'}]},
+    {'type': 'html', 'title': 'Notes', 'content': '<p>Benchmark dashboard</p>'},
+    {'type': 'addform', 'model': 'benchapp.record'},
+)
+
+
+class Dashboard(object):
+    # SCALE['widgets'] widgets of rotating types, in two columns
+    widgets = [
+        [dict(WIDGETS[i % len(WIDGETS)]) for i in range(SCALE['widgets']) if i % 2 == col]
+        for col in (0, 1)]
+
+xadmin.site.register(views.website.IndexView, Dashboard)
+
+
+class IdlePlugin(BaseAdminPlugin):
+    """
+    Plugin taking part in the hooks run for every list cell, to measure the
+    cost of plugins themselves.
+    """
+
+    def get_context(self, context):
+        return context
+
+    def result_header(self, item, field_name, row):
+        return item
+
+    def result_item(self, item, obj, field_name, row):
+        return item
+
+for i in range(SCALE['plugins']):
+    xadmin.site.register_plugin(type('IdlePlugin%d' % i, (IdlePlugin,), {}), ListAdminView)
@@ -0,0 +1,79 @@
+import datetime
+import decimal
+import random
+
+from django.contrib.auth.models import User
+from django.db import models, transaction
+
+from benchapp.models import NODES, SCALE, STATUS_CHOICES, Record, column_names
+
+WORDS = ('alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot', 'golf', 'hotel',
+         'india', 'juliett', 'kilo', 'lima', 'mike', 'november', 'oscar', 'papa')
+START = datetime.datetime(2015, 1, 1)
+BATCH_SIZE = 500
+
+
+def words(rnd, count):
+    return ' '.join([rnd.choice(WORDS) for i in range(count)])
+
+
+def column_value(rnd, field):
+    if field.choices:
+        return rnd.choice(field.choices)[0]
+    if isinstance(field, models.CharField):
+        return words(rnd, 3)
+    if isinstance(field, models.DecimalField):
+        return decimal.Decimal(rnd.randint(0, 10 ** 6)) / 100
+    if isinstance(field, models.IntegerField):
+        return rnd.randint(0, 10 ** 6)
+    if isinstance(field, models.DateTimeField):
+        return START + datetime.timedelta(minutes=rnd.randint(0, 10 ** 6))
+    if isinstance(field, models.BooleanField):
+        return rnd.random() < 0.5
+    raise ValueError(field)
+
+
+def create_nodes(rnd, rows):
+    """
+    Create one node per ten records on every level, each pointing to a node
+    of the next level. Return the pks of the ``Node0`` objects.
+    """
+    count = max(rows // 10, 1)
+    pks = []
+    for model in reversed(NODES):
+        objs = [model(name=words(rnd, 2)) for i in range(count)]
+        for obj in objs:
+            if pks:
+                obj.next_id = rnd.choice(pks)
+        model.objects.bulk_create(objs, batch_size=BATCH_SIZE)
+        pks = list(model.objects.values_list('pk', flat=True))
+    return pks
+
+
+@transaction.atomic
+def populate(seed=0):
+    """
+    Create the admin user and ``SCALE['rows']`` records, the same ones for a
+    given seed.
+    """
+    rnd = random.Random(seed)
+    User.objects.create_superuser('admin', 'admin@example.com', 'admin')
+
+    parents = create_nodes(rnd, SCALE['rows']) if NODES else None
+    fields = [Record._meta.get_field(name) for name in column_names()]
+    objs = []
+    for i in range(SCALE['rows']):
+        obj = Record(
+            title='%s %d' % (words(rnd, 2), i), body=words(rnd, 12),
+            status=rnd.choice(STATUS_CHOICES)[0], active=rnd.random() < 0.8,
+            amount=rnd.randint(0, 1000),
+            created=START + datetime.timedelta(hours=i))
+        for field in fields:
+            setattr(obj, field.attname, column_value(rnd, field))
+        if parents:
+            obj.parent_id = rnd.choice(parents)
+        objs.append(obj)
+        if len(objs) == BATCH_SIZE:
+            Record.objects.bulk_create(objs)
+            objs = []
+    Record.objects.bulk_create(objs)
@@ -0,0 +1,71 @@
+"""
+Synthetic models of the benchmarks, shaped by ``settings.XADMIN_BENCH``:
+
+* ``Node0`` ... ``Node<fk_depth - 1>``, each with a foreign key to the
+  next one.
+* ``Record``, the model of the list view benchmarks. It has a few fixed
+  fields the filters, search and charts use, ``columns`` more fields of
+  rotating types, and a foreign key to ``Node0``.
+"""
+from django.conf import settings
+from django.db import models
+
+SCALE = settings.XADMIN_BENCH
+
+STATUS_CHOICES = (('draft', 'Draft'), ('review', 'Review'), ('published', 'Published'))
+
+COLUMN_TYPES = (
+    lambda: models.CharField(max_length=64, blank=True),
+    lambda: models.IntegerField(default=0),
+    lambda: models.DecimalField(max_digits=12, decimal_places=2, default=0),
+    lambda: models.DateTimeField(null=True, blank=True),
+    lambda: models.BooleanField(default=False),
+    lambda: models.CharField(max_length=16, choices=STATUS_CHOICES, blank=True),
+)
+
+
+def column_names():
+    return ['c%d' % i for i in range(SCALE['columns'])]
+
+
+def _str(self):
+    return self.name
+
+
+def create_node_models(depth):
+    nodes = []
+    for i in reversed(range(depth)):
+        attrs = {
+            '__module__': __name__,
+            '__str__': _str,
+            '__unicode__': _str,
+            'name': models.CharField(max_length=64),
+        }
+        if nodes:
+            attrs['next'] = models.ForeignKey(nodes[0], null=True, blank=True)
+        nodes.insert(0, type('Node%d' % i, (models.Model,), attrs))
+    return nodes
+
+NODES = create_node_models(SCALE['fk_depth'])
+
+
+class Record(models.Model):
+    title = models.CharField(max_length=128)
+    body = models.TextField(blank=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default='draft')
+    active = models.BooleanField(default=True)
+    amount = models.IntegerField(default=0)
+    created = models.DateTimeField()
+
+    def __str__(self):
+        return self.title
+    __unicode__ = __str__
+
+for i, name in enumerate(column_names()):
+    Record.add_to_class(name, COLUMN_TYPES[i % len(COLUMN_TYPES)]())
+
+if NODES:
+    Record.add_to_class('parent', models.ForeignKey(NODES[0], null=True, blank=True))
+
+for node in NODES:
+    globals()[node.__name__] = node
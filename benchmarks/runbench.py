@@ -0,0 +1,359 @@
+#!/usr/bin/env python
+"""
+Benchmarks of the admin site on synthetic models and data, see
+benchapp/models.py. They run on an in-memory SQLite database::
+
+    python runbench.py --rows 20000 --columns 20 --fk-depth 3 --output before.json
+    # change xadmin, then with the same options
+    python runbench.py --rows 20000 --columns 20 --fk-depth 3 --output after.json
+    python runbench.py --compare before.json after.json
+
+Every benchmark records its wall time over ``--repeat`` runs, the number of
+queries of one run and the peak memory Python allocated during one run
+(``tracemalloc``, Python 3.4+). Pass benchmark names to run some of them,
+the ``downsample_*`` ones take a while on the default 10M points.
+"""
+from __future__ import print_function
+
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+BENCH_ROOT = os.path.realpath(os.path.dirname(__file__))
+
+sys.path.insert(0, os.path.join(BENCH_ROOT, os.pardir))
+sys.path.insert(0, BENCH_ROOT)
+
+timer = getattr(time, 'perf_counter', time.time)
+
+
+class Benchmark(object):
+
+    def __init__(self, name, func, once=False):
+        self.name = name
+        self.func = func
+        # Run a single time, without warming up, e.g. autodiscover
+        self.once = once
+
+    def measure(self, repeat):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        if self.once:
+            repeat = 1
+        else:
+            # The first request of a view builds its class, the first one of
+            # the dashboard creates the widgets.
+            self.func()
+        times = []
+        queries = None
+        for i in range(repeat):
+            gc.collect()
+            with CaptureQueriesContext(connection) as captured:
+                start = timer()
+                self.func()
+                times.append(timer() - start)
+            queries = len(captured)
+
+        peak_memory = None
+        if tracemalloc is not None and not self.once:
+            gc.collect()
+            tracemalloc.start()
+            self.func()
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        times.sort()
+        return {
+            'times': times,
+            'min': times[0],
+            'median': times[len(times) // 2],
+            'queries': queries,
+            'peak_memory': peak_memory,
+        }
+
+
+class Client(object):
+    """
+    Logged in test client failing on any response but a 200.
+    """
+
+    def __init__(self):
+        from django.test import Client
+        self.client = Client()
+        self.client.login(username='admin', password='admin')
+
+    def get(self, path):
+        response = self.client.get(path)
+        if response.status_code != 200:
+            raise AssertionError('GET %s returned %s' % (path, response.status_code))
+        if getattr(response, 'streaming', False):
+            for chunk in response.streaming_content:
+                pass
+        return response
+
+    def page(self, path):
+        return lambda: self.get(path)
+
+
+def startup_benchmarks():
+    import xadmin
+    from django.core.urlresolvers import RegexURLResolver
+
+    def get_urls():
+        # Includes building the reverse lookups, done on the first reverse()
+        RegexURLResolver(r'^/', xadmin.site.get_urls()).reverse_dict
+
+    return [
+        Benchmark('autodiscover', xadmin.autodiscover, once=True),
+        Benchmark('get_urls', get_urls),
+    ]
+
+
+def result_rows(path):
+    """
+    Build the rows of a list page and read their cells as the template does,
+    without the rest of the request. Its peak memory is mostly the rows.
+    """
+    from importlib import import_module
+
+    import xadmin
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.test import RequestFactory
+    from xadmin.views import ListAdminView
+    from benchapp.models import Record
+
+    request = RequestFactory().get(path)
+    request.user = User.objects.get(username='admin')
+    request.session = import_module(settings.SESSION_ENGINE).SessionStore()
+    view_class = xadmin.site.get_view_class(ListAdminView, xadmin.site._registry[Record])
+    view = view_class(request)
+    view.make_result_list()
+
+    def build():
+        for row in view.results():
+            for cell in row.cells:
+                cell.tagattrs, cell.label
+    return build
+
+
+def request_benchmarks():
+    from xadmin.plugins.export import ExportMenuPlugin, has_xlwt, has_xlsxwriter
+    from benchapp.models import NODES, Record
+
+    client = Client()
+    changelist = '/xadmin/benchapp/record/'
+    benchmarks = [
+        Benchmark('changelist', client.page(changelist)),
+        Benchmark('changelist_filter', client.page(
+            changelist + '?_p_status__exact=review&_p_active__exact=1&_p_amount__gte=100')),
+        Benchmark('changelist_search', client.page(changelist + '?_q_=alpha+bravo')),
+        Benchmark('changelist_ordering', client.page(changelist + '?o=-amount.title')),
+        Benchmark('changelist_last_page', client.page(
+            changelist + '?p=%d' % (Record.objects.count() // 50))),
+        Benchmark('result_rows', result_rows(changelist)),
+    ]
+    for export_type in ExportMenuPlugin.list_export:
+        if (export_type != 'xlsx' or has_xlsxwriter) and (export_type != 'xls' or has_xlwt):
+            benchmarks.append(Benchmark('export_%s' % export_type, client.page(
+                changelist + '?_do_=export&all=on&export_type=%s' % export_type)))
+
+    record = Record.objects.order_by('pk')[0]
+    benchmarks += [
+        Benchmark('chart', client.page(changelist + 'chart/amount/')),
+        # Every record, not only the first page
+        Benchmark('chart_bucket', client.page(changelist + 'chart/amount_by_week/')),
+        Benchmark('chart_downsample', client.page(changelist + 'chart/amount_by_hour/?_width=500')),
+        Benchmark('change_form', client.page(changelist + '%s/update/' % record.pk)),
+        Benchmark('dashboard', client.page('/xadmin/')),
+    ]
+    if NODES:
+        # Deleting a node collects every record below it
+        node = NODES[0].objects.order_by('pk')[0]
+        benchmarks.append(Benchmark('delete_confirm', client.page(
+            '/xadmin/benchapp/node0/%s/delete/' % node.pk)))
+    else:
+        benchmarks.append(Benchmark('delete_confirm', client.page(
+            changelist + '%s/delete/' % record.pk)))
+    return benchmarks
+
+
+def downsample_benchmarks(points, width=1000):
+    """
+    Downsampling of a series of ``points`` points to ``width`` pixels, with
+    NumPy when it is installed and in pure Python.
+    """
+    from xadmin import downsample
+
+    series = {}
+
+    def get_series(use_numpy):
+        # Built on the first run, which isn't measured. A random walk.
+        if False not in series:
+            import random
+            rnd = random.Random(0)
+            ys, y = [], 0.0
+            for i in range(points):
+                y += rnd.random() - 0.5
+                ys.append(y)
+            series[False] = [float(i) for i in range(points)], ys
+        if use_numpy and True not in series:
+            series[True] = tuple(downsample.numpy.array(values) for values in series[False])
+        return series[use_numpy]
+
+    def run(method, use_numpy):
+        def func():
+            xs, ys = get_series(use_numpy)
+            downsample.downsample_indexes(xs, ys, width, method, use_numpy=use_numpy)
+        return func
+
+    benchmarks = []
+    for method in sorted(downsample.METHODS):
+        if downsample.numpy is not None:
+            benchmarks.append(Benchmark('downsample_%s' % method, run(method, True)))
+        benchmarks.append(Benchmark('downsample_%s_python' % method, run(method, False)))
+    return benchmarks
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=BENCH_ROOT).decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scale, repeat, names, verbosity):
+    import django
+    from django.conf import settings
+
+    settings.XADMIN_BENCH = scale
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0, interactive=False)
+
+    from benchapp.data import populate
+    populate()
+
+    results = {}
+
+    def run_benchmarks(benchmarks):
+        for benchmark in benchmarks:
+            # autodiscover always runs, the other benchmarks need it
+            if names and benchmark.name not in names and not benchmark.once:
+                continue
+            results[benchmark.name] = result = benchmark.measure(repeat)
+            if verbosity:
+                print(format_result(benchmark.name, result))
+
+    run_benchmarks(startup_benchmarks())
+    run_benchmarks(request_benchmarks())
+    run_benchmarks(downsample_benchmarks(scale['points']))
+
+    return {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'scale': scale,
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def format_memory(value):
+    return '-' if value is None else '%.1f MB' % (value / 1024.0 / 1024)
+
+
+def format_result(name, result):
+    return '%-24s %9.1f ms %9.1f ms %6s queries %12s' % (
+        name, result['min'] * 1000, result['median'] * 1000, result['queries'],
+        format_memory(result['peak_memory']))
+
+
+def compare(old_file, new_file):
+    with open(old_file) as f:
+        old = json.load(f)
+    with open(new_file) as f:
+        new = json.load(f)
+    if old['scale'] != new['scale']:
+        print('Warning: the scales differ, %s and %s' % (old['scale'], new['scale']))
+    print('%-24s %22s %8s %13s %24s' % ('', 'min time', '', 'queries', 'peak memory'))
+    for name, result in sorted(new['results'].items()):
+        before = old['results'].get(name)
+        if before is None:
+            print('%-24s %9.1f ms (new)' % (name, result['min'] * 1000))
+            continue
+        print('%-24s %8.1f > %8.1f ms %+6.0f%% %5s > %5s %10s > %10s' % (
+            name, before['min'] * 1000, result['min'] * 1000,
+            (result['min'] / before['min'] - 1) * 100 if before['min'] else 0,
+            before['queries'], result['queries'],
+            format_memory(before['peak_memory']), format_memory(result['peak_memory'])))
+
+
+if __name__ == "__main__":
+    from optparse import OptionParser
+    usage = "%prog [options] [benchmark benchmark ...]"
+    parser = OptionParser(usage=usage)
+    parser.add_option(
+        '--rows', action='store', dest='rows', type='int', default=1000,
+        help='Number of records.')
+    parser.add_option(
+        '--columns', action='store', dest='columns', type='int', default=10,
+        help='Number of extra record fields, all shown in the list.')
+    parser.add_option(
+        '--fk-depth', action='store', dest='fk_depth', type='int', default=2,
+        help='Length of the foreign key chain below the records.')
+    parser.add_option(
+        '--plugins', action='store', dest='plugins', type='int', default=0,
+        help='Number of extra list view plugins taking part in every hook.')
+    parser.add_option(
+        '--widgets', action='store', dest='widgets', type='int', default=4,
+        help='Number of dashboard widgets.')
+    parser.add_option(
+        '--points', action='store', dest='points', type='int', default=10000000,
+        help='Number of points of the downsampled chart series.')
+    parser.add_option(
+        '--repeat', action='store', dest='repeat', type='int', default=5,
+        help='Number of timed runs of every benchmark.')
+    parser.add_option(
+        '-o', '--output', action='store', dest='output', default=None,
+        help='Write the results to this JSON file.')
+    parser.add_option(
+        '--compare', action='store_true', dest='compare', default=False,
+        help='Compare the two JSON files given as arguments.')
+    parser.add_option(
+        '-v', '--verbosity', action='store', dest='verbosity', default='1',
+        type='choice', choices=['0', '1'],
+        help='Verbosity level; 0=no output, 1=one line per benchmark')
+    options, args = parser.parse_args()
+
+    if options.compare:
+        if len(args) != 2:
+            parser.error('--compare needs two JSON files')
+        compare(*args)
+        sys.exit(0)
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+    scale = {
+        'rows': options.rows,
+        'columns': options.columns,
+        'fk_depth': options.fk_depth,
+        'plugins': options.plugins,
+        'widgets': options.widgets,
+        'points': options.points,
+    }
+    report = run(scale, options.repeat, set(args), int(options.verbosity))
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
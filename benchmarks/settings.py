@@ -0,0 +1,55 @@
+DEBUG = False
+TEMPLATE_DEBUG = False
+ALLOWED_HOSTS = ['*']
+SECRET_KEY = 'xadmin-benchmarks'
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+INSTALLED_APPS = [
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+
+    'xadmin',
+    'crispy_forms',
+
+    'benchapp',
+]
+MIDDLEWARE_CLASSES = (
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.common.CommonMiddleware',
+)
+TEMPLATE_CONTEXT_PROCESSORS = (
+    'django.contrib.auth.context_processors.auth',
+    'django.core.context_processors.request',
+    'django.contrib.messages.context_processors.messages',
+)
+PASSWORD_HASHERS = ('django.contrib.auth.hashers.MD5PasswordHasher',)
+ROOT_URLCONF = 'urls'
+STATIC_URL = '/static/'
+USE_I18N = False
+USE_TZ = False
+
+# Scale of the synthetic models and data, see benchapp/models.py. runbench.py
+# overrides it from the command line.
+XADMIN_BENCH = {
+    'rows': 1000,
+    'columns': 10,
+    'fk_depth': 2,
+    'plugins': 0,
+    'widgets': 4,
+}
@@ -0,0 +1,8 @@
+from django.conf.urls import patterns, include
+
+import xadmin
+
+# runbench.py runs xadmin.autodiscover() itself, to time it.
+urlpatterns = patterns('',
+    (r'^xadmin/', include(xadmin.site.urls)),
+)
@@ -121,9 +121,9 @@ class HostAdmin(object):
     
     data_charts = {
         "host_service_type_counts": {'title': u"Host service type count", "x-field": "service_type", "y-field": ("service_type",), 
+                              "bucket": "category", "aggregate": "count",
                               "option": {
                                          "series": {"bars": {"align": "center", "barWidth": 0.8,'show':True}}, 
-                                         "xaxis": {"aggregate": "count", "mode": "categories"},
                                          },
                               },
     }
@@ -183,17 +183,14 @@ class AccessRecordAdmin(object):
     data_charts = {
         "user_count": {'title': u"User Report", "x-field": "date", "y-field": ("user_count", "view_count"), "order": ('date',)},
         "avg_count": {'title': u"Avg Report", "x-field": "date", "y-field": ('avg_count',), "order": ('date',)},
-        "per_month": {'title': u"Monthly Users", "x-field": "_chart_month", "y-field": ("user_count", ), 
+        "per_month": {'title': u"Monthly Users", "x-field": "date", "y-field": ("user_count", ), 
+                              "bucket": "month", "aggregate": "sum",
                               "option": {
-                                         "series": {"bars": {"align": "center", "barWidth": 0.8,'show':True}}, 
-                                         "xaxis": {"aggregate": "sum", "mode": "categories"},
+                                         "series": {"bars": {"align": "center", "barWidth": 25 * 24 * 3600 * 1000, 'show':True}}, 
+                                         "xaxis": {"mode": "time", "timeformat": "%y/%m"},
                                          },
                             },
     }
-    
-    def _chart_month(self,obj):
-        return obj.date.strftime("%B")
-        
 
 xadmin.site.register(Host, HostAdmin)
 xadmin.site.register(HostGroup, HostGroupAdmin)
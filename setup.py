@@ -27,6 +27,7 @@ setup(
         'Excel': ['xlwt', 'xlsxwriter'],
         'Reversion': ['django-reversion'],
         'Comment': ['django-contrib-comments'],
+        'Charts': ['numpy'],
     },
     zip_safe=False,
     keywords=['admin', 'django', 'xadmin', 'bootstrap'],
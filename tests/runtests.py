@@ -31,7 +31,7 @@ ALWAYS_INSTALLED_APPS = [
 def get_test_modules():
     modules = []
     for f in os.listdir(RUNTESTS_DIR):
-        if (f.startswith('__init__') or
+        if (f.startswith('__') or
             f.startswith('.') or
             f.startswith('sql') or not os.path.isdir(os.path.join(RUNTESTS_DIR, f))):
             continue
@@ -53,7 +53,7 @@ def setup(verbosity, test_labels):
     }
 
     # Redirect some settings for the duration of these tests.
-    settings.INSTALLED_APPS = ALWAYS_INSTALLED_APPS
+    settings.INSTALLED_APPS = list(ALWAYS_INSTALLED_APPS)
     settings.ROOT_URLCONF = 'urls'
     settings.STATIC_URL = '/static/'
     settings.STATIC_ROOT = os.path.join(TEMP_DIR, 'static')
@@ -72,30 +72,16 @@ def setup(verbosity, test_labels):
     # in our tests.
     settings.MANAGERS = ("admin@xadmin.io",)
 
-    # Load all the ALWAYS_INSTALLED_APPS.
-    # (This import statement is intentionally delayed until after we
-    # access settings because of the USE_I18N dependency.)
-
-    django.setup()
-    from django.db.models.loading import get_apps, load_app
-    get_apps()
-
-    # Load all the test model apps.
+    # Install the test apps, every one of them unless some were named on
+    # the command line.
     test_labels_set = set([label.split('.')[0] for label in test_labels])
-    test_modules = get_test_modules()
-
-    for module_name in test_modules:
-        module_label = '.'.join(['xtests', module_name])
-        # if the module was named on the command line, or
-        # no modules were named (i.e., run all), import
-        # this module and add it to the list to test.
+    for module_name in get_test_modules():
         if not test_labels or module_name in test_labels_set:
             if verbosity >= 2:
-                print "Importing application %s" % module_name
-            mod = load_app(module_label)
-            if mod:
-                if module_label not in settings.INSTALLED_APPS:
-                    settings.INSTALLED_APPS.append(module_label)
+                print("Importing application %s" % module_name)
+            settings.INSTALLED_APPS.append('.'.join(['xtests', module_name]))
+
+    django.setup()
 
     return state
 
@@ -105,7 +91,8 @@ def teardown(state):
     # so that it will successfully remove temp trees containing
     # non-ASCII filenames on Windows. (We're assuming the temp dir
     # name itself does not contain non-ASCII characters.)
-    shutil.rmtree(unicode(TEMP_DIR))
+    from django.utils import six
+    shutil.rmtree(six.text_type(TEMP_DIR))
     # Restore the old settings.
     for key, value in state.items():
         setattr(settings, key, value)
@@ -118,12 +105,14 @@ def django_tests(verbosity, interactive, failfast, test_labels):
     # Run the test suite, including the extra validation tests.
     from django.test.utils import get_runner
     if not hasattr(settings, 'TEST_RUNNER'):
-        settings.TEST_RUNNER = 'django.test.simple.DjangoTestSuiteRunner'
+        settings.TEST_RUNNER = 'django.test.runner.DiscoverRunner'
     TestRunner = get_runner(settings)
 
     test_runner = TestRunner(verbosity=verbosity, interactive=interactive,
         failfast=failfast)
-    failures = test_runner.run_tests(test_labels or get_test_modules(), extra_tests=extra_tests)
+    failures = test_runner.run_tests(
+        ['.'.join(['xtests', label]) for label in test_labels or get_test_modules()],
+        extra_tests=extra_tests)
 
     teardown(state)
     return failures
@@ -0,0 +1,10 @@
+from django.conf.urls import patterns, include
+
+import xadmin
+xadmin.autodiscover()
+
+# xadmin.site, where the test apps register their models. It takes the
+# "xadmin" namespace the view_base site has in the main urls.
+urlpatterns = patterns('',
+    (r'^xadmin/', include(xadmin.site.urls)),
+)
@@ -1,7 +1,12 @@
 from django.test import TestCase
+from django.test.utils import override_settings
 from django.contrib.auth.models import User
 from django.test.client import RequestFactory
 
+# Registers the test apps on xadmin.site. autodiscover() sets the crispy
+# forms settings, out of override_settings they outlive the first test.
+import xtests.admin_urls
+
 class BaseTest(TestCase):
 
     def setUp(self):
@@ -14,4 +19,17 @@ class BaseTest(TestCase):
         request = self.factory.get(url)
         request.user = isinstance(user, User) and user or self._create_superuser(user)
         request.session = {}
-        return request
\ No newline at end of file
+        return request
+
+
+@override_settings(ROOT_URLCONF='xtests.admin_urls')
+class SiteTest(BaseTest):
+    """
+    Test of the views of xadmin.site, with the client logged in as a
+    superuser.
+    """
+
+    def setUp(self):
+        super(SiteTest, self).setUp()
+        self.admin = User.objects.create_superuser('admin', 'admin@xadmin.io', 'admin')
+        self.client.login(username='admin', password='admin')
@@ -0,0 +1,9 @@
+from xadmin.views.dashboard import widget_manager, HtmlWidget
+
+
+@widget_manager.register
+class LazyHtmlWidget(HtmlWidget):
+    widget_type = 'lazyhtml'
+    lazy_load = True
+    cache_timeout = 60
+    refresh_interval = 30
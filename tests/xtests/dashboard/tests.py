@@ -0,0 +1,97 @@
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+from xtests.base import BaseTest, SiteTest
+from xadmin.models import UserSettings, UserWidget
+from xadmin.views.dashboard import WidgetExecutor, WidgetTask, wait_tasks
+
+
+class WidgetExecutorTest(BaseTest):
+
+    def test_page_deadline(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        executor = WidgetExecutor()
+        tasks = [WidgetTask(release.wait) for i in range(6)]
+        executor.submit(tasks, 2)
+
+        start = time.time()
+        self.assertEqual(wait_tasks(tasks, 0.3), [False] * 6)
+        # One timeout for all the tasks, not one each
+        self.assertTrue(time.time() - start < 0.6)
+        # The tasks not started by then are dropped
+        self.assertEqual([task.cancelled for task in tasks], [False, False, True, True, True, True])
+
+        release.set()
+        self.assertEqual(wait_tasks(tasks[:2], 1), [True, True])
+        self.assertEqual([task.done.is_set() for task in tasks[2:]], [False] * 4)
+
+    def test_shared_threads(self):
+        executor = WidgetExecutor()
+        executor.submit([WidgetTask(int)], 2)
+        executor.submit([WidgetTask(int)], 1)
+        self.assertEqual(len(executor.threads), 2)
+
+
+class DashboardWidgetViewTest(SiteTest):
+
+    def setUp(self):
+        super(DashboardWidgetViewTest, self).setUp()
+        cache.clear()
+        self.user_widget = self.create_widget(self.admin, '<p>Lazy content</p>')
+        UserSettings(user=self.admin, key='dashboard:home:pos',
+                     value=str(self.user_widget.pk)).save()
+        self.url = '/xadmin/dashboard/widget/%s/' % self.user_widget.pk
+
+    def create_widget(self, user, content):
+        user_widget = UserWidget(user=user, page_id='home', widget_type='lazyhtml')
+        user_widget.set_value({'title': 'Lazy', 'content': content})
+        user_widget.save()
+        return user_widget
+
+    def test_placeholder(self):
+        response = self.client.get('/xadmin/')
+
+        self.assertContains(response, 'id="%s" data-widget-url="%s" data-widget-refresh="30"' %
+                            (self.user_widget.pk, self.url))
+        self.assertContains(response, 'widget loading')
+        self.assertContains(response, 'Loading widget...')
+        self.assertNotContains(response, 'Lazy content')
+
+    def test_widget(self):
+        response = self.client.get(self.url)
+
+        self.assertContains(response, 'Lazy content')
+        self.assertNotContains(response, 'Loading widget...')
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_other_user(self):
+        other = User.objects.create_user('other', 'other@xadmin.io', 'other')
+        other_widget = self.create_widget(other, 'Other content')
+
+        response = self.client.get('/xadmin/dashboard/widget/%s/' % other_widget.pk)
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get('/xadmin/dashboard/widget/0/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_options_changed(self):
+        etag = self.client.get(self.url)['ETag']
+        self.user_widget.set_value({'title': 'Lazy', 'content': '<p>New content</p>'})
+        self.user_widget.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'New content')
+        self.assertNotEqual(response['ETag'], etag)
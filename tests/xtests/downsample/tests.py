@@ -0,0 +1,69 @@
+import datetime
+import random
+import unittest
+
+from xtests.base import BaseTest
+from xadmin import downsample as ds
+
+
+class DownsampleTest(BaseTest):
+
+    def series(self, count, seed=0):
+        # Integer values, so both implementations sum them exactly; few
+        # distinct ones, so there are ties to break the same way
+        rand = random.Random(seed)
+        return list(range(count)), [rand.randint(0, 20) for i in range(count)]
+
+    @unittest.skipIf(ds.numpy is None, 'NumPy is not installed')
+    def test_numpy_same_indexes(self):
+        for method in ('lttb', 'minmax'):
+            for count, buckets in ((10, 3), (100, 7), (1000, 30), (1001, 999)):
+                xs, ys = self.series(count, seed=count)
+                self.assertEqual(
+                    ds.downsample_indexes(xs, ys, buckets, method, use_numpy=False),
+                    ds.downsample_indexes(xs, ys, buckets, method, use_numpy=True),
+                    '%s of %s points in %s buckets' % (method, count, buckets))
+
+    def test_first_and_last(self):
+        for use_numpy in (False, ds.numpy is not None):
+            for method in ('lttb', 'minmax'):
+                for count, buckets in ((5, 1), (10, 3), (500, 20), (501, 500)):
+                    xs, ys = self.series(count)
+                    # Neither the lowest nor the highest point
+                    ys[0] = ys[-1] = 10
+                    indexes = ds.downsample_indexes(xs, ys, buckets, method, use_numpy)
+                    self.assertEqual(indexes[0], 0)
+                    self.assertEqual(indexes[-1], count - 1)
+                    self.assertEqual(indexes, sorted(set(indexes)))
+                    self.assertTrue(len(indexes) <= max(buckets, 3) * 2 + 2)
+
+    def test_small_series(self):
+        points = [(1, 2), (2, 3)]
+        self.assertEqual(ds.downsample(points, 10), points)
+        self.assertEqual(ds.downsample_indexes([1, 2], [2, 3], 1), [0, 1])
+
+    def test_none_dropped(self):
+        points = [(i, None if i % 3 == 0 else i % 7) for i in range(1, 100)]
+        for method in ('lttb', 'minmax'):
+            kept = ds.downsample(points, 10, method)
+            self.assertTrue(kept)
+            self.assertTrue(all(y is not None for x, y in kept))
+            self.assertEqual(kept[0], (1, 1))
+            self.assertEqual(kept[-1], (98, 0))
+
+    def test_dates(self):
+        start = datetime.datetime(2015, 1, 1)
+        points = [(start + datetime.timedelta(hours=i), i % 5) for i in range(100)]
+        kept = ds.downsample(points, 10)
+        self.assertEqual(kept[0], points[0])
+        self.assertEqual(kept[-1], points[-1])
+        self.assertEqual(len(kept), 10)
+
+    def test_categories(self):
+        points = [('category %s' % i, i) for i in range(100)]
+        self.assertIs(ds.downsample(points, 10), points)
+        points = [(i, 'value %s' % i) for i in range(100)]
+        self.assertIs(ds.downsample(points, 10, 'minmax'), points)
+
+    def test_unknown_method(self):
+        self.assertRaises(ValueError, ds.downsample_indexes, [1], [1], 10, 'average')
@@ -0,0 +1,17 @@
+import xadmin
+
+from xtests.export.models import Book, Article
+
+
+class BookAdmin(object):
+    list_display = ('title',)
+
+xadmin.site.register(Book, BookAdmin)
+
+
+class ArticleAdmin(object):
+    list_display = ('title',)
+    list_per_page = 4
+    queryset_chunk_size = 2
+
+xadmin.site.register(Article, ArticleAdmin)
@@ -0,0 +1,9 @@
+from django.db import models
+
+
+class Book(models.Model):
+    title = models.CharField(max_length=64)
+
+
+class Article(models.Model):
+    title = models.CharField(max_length=64)
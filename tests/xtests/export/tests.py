@@ -0,0 +1,160 @@
+import shutil
+import tempfile
+import threading
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.test.utils import override_settings
+
+from xtests.base import BaseTest, SiteTest
+from xtests.export.models import Book, Article
+from xadmin.models import ExportJob, UserSettings, UserWidget
+from xadmin.plugins import export
+from xadmin.plugins.export import ThreadExportExecutor, run_export_job
+
+
+class ThreadExportExecutorTest(BaseTest):
+
+    def fail(self):
+        raise ValueError('Export failed')
+
+    def test_failing_job(self):
+        executor = ThreadExportExecutor(workers=1)
+        done = threading.Event()
+        executor.submit(self.fail)
+        executor.submit(done.set)
+
+        # The worker survived the first job
+        self.assertTrue(done.wait(5))
+        self.assertEqual(len(executor.threads), 1)
+
+    def test_dead_thread(self):
+        executor = ThreadExportExecutor(workers=1)
+        dead = threading.Thread(target=int)
+        dead.start()
+        dead.join()
+        executor.threads.append(dead)
+        done = threading.Event()
+        executor.submit(done.set)
+
+        self.assertTrue(done.wait(5))
+        self.assertNotIn(dead, executor.threads)
+
+
+class ExportTest(SiteTest):
+
+    def setUp(self):
+        super(ExportTest, self).setUp()
+        for i in range(7):
+            Article.objects.create(title='article %d' % i)
+
+    def export(self, query=''):
+        response = self.client.get('/xadmin/export/article/?_do_=export&export_type=csv' + query)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode('utf-8').split('\r\n')
+
+    def test_page(self):
+        # A page of more rows than a chunk
+        self.assertEqual(self.export(), ['"article %d"' % i for i in (6, 5, 4, 3)])
+        self.assertEqual(self.export('&p=1'), ['"article %d"' % i for i in (2, 1, 0)])
+
+    def test_all(self):
+        self.assertEqual(self.export('&all=on'), ['"article %d"' % i for i in range(6, -1, -1)])
+
+
+class SyncExecutor(object):
+
+    def submit(self, func, *args):
+        func(*args)
+
+
+class ExportJobTest(SiteTest):
+
+    def setUp(self):
+        super(ExportJobTest, self).setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        for title in ('Emma', 'Ulysses', 'Walden'):
+            Book.objects.create(title=title)
+
+    def create_job(self, user, export_type='csv'):
+        return ExportJob.objects.create(
+            user=user, content_type=ContentType.objects.get_for_model(Book),
+            export_type=export_type, query='_do_=export&export_type=%s' % export_type)
+
+    def read_file(self, job):
+        job.file.open('rb')
+        try:
+            return job.file.read().decode('utf-8')
+        finally:
+            job.file.close()
+
+    def test_done(self):
+        job = self.create_job(self.admin)
+        run_export_job(job.pk)
+        job = ExportJob.objects.get(pk=job.pk)
+
+        self.assertEqual(job.status, 'done')
+        self.assertEqual((job.progress, job.total), (3, 3))
+        self.assertTrue(job.finished)
+        self.assertEqual(self.read_file(job), '"Walden"\r\n"Ulysses"\r\n"Emma"')
+
+    def test_failed(self):
+        job = self.create_job(self.admin, 'unknown')
+        run_export_job(job.pk)
+        job = ExportJob.objects.get(pk=job.pk)
+
+        self.assertEqual(job.status, 'failed')
+        self.assertIn('KeyError', job.error)
+        self.assertTrue(job.finished)
+
+    def test_missing_job(self):
+        run_export_job(0)
+
+    def test_background(self):
+        self.addCleanup(setattr, export, '_export_executor', export._export_executor)
+        export._export_executor = SyncExecutor()
+        response = self.client.get('/xadmin/export/book/?_do_=export&export_type=csv'
+                                   '&export_background=on')
+
+        self.assertEqual(response.status_code, 302)
+        job = ExportJob.objects.get()
+        self.assertEqual((job.user, job.status), (self.admin, 'done'))
+        self.assertEqual(job.query, '_do_=export&export_type=csv')
+
+    def test_download(self):
+        job = self.create_job(self.admin)
+        run_export_job(job.pk)
+        url = '/xadmin/xadmin/export/%s/' % job.pk
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'"Walden"\r\n"Ulysses"\r\n"Emma"')
+        self.assertIn('book.csv', response['Content-Disposition'])
+
+        other = User.objects.create_user('other', 'other@xadmin.io', 'other')
+        other.is_staff = True
+        other.save()
+        self.client.login(username='other', password='other')
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_widget(self):
+        done = self.create_job(self.admin)
+        run_export_job(done.pk)
+        failed = self.create_job(self.admin, 'unknown')
+        run_export_job(failed.pk)
+        other = self.create_job(User.objects.create_user('other', 'other@xadmin.io', 'other'))
+        run_export_job(other.pk)
+        user_widget = UserWidget(user=self.admin, page_id='home', widget_type='exports')
+        user_widget.set_value({'title': 'Exports'})
+        user_widget.save()
+        UserSettings(user=self.admin, key='dashboard:home:pos', value=str(user_widget.pk)).save()
+
+        response = self.client.get('/xadmin/')
+        self.assertContains(response, '/xadmin/xadmin/export/%s/' % done.pk)
+        self.assertContains(response, 'Failed')
+        self.assertNotContains(response, '/xadmin/xadmin/export/%s/' % failed.pk)
+        self.assertNotContains(response, '/xadmin/xadmin/export/%s/' % other.pk)
@@ -0,0 +1,74 @@
+import xadmin
+from xadmin.listquery import CookieListQuery, CacheListQuery
+
+from xtests.list_view.models import Item, CookieItem, CacheItem, CachedRowItem, Entry, \
+    Product, SelectedProduct, Gadget
+
+
+class ItemAdmin(object):
+    list_display = ('name', 'rank')
+
+xadmin.site.register(Item, ItemAdmin)
+
+
+class CookieItemAdmin(ItemAdmin):
+    list_query_store = CookieListQuery
+
+xadmin.site.register(CookieItem, CookieItemAdmin)
+
+
+class CountingCacheListQuery(CacheListQuery):
+    # The values written, the tests check nothing is written twice
+    stored = []
+
+    def store(self, value):
+        self.stored.append(value)
+        super(CountingCacheListQuery, self).store(value)
+
+
+class CacheItemAdmin(ItemAdmin):
+    list_query_store = CountingCacheListQuery
+
+xadmin.site.register(CacheItem, CacheItemAdmin)
+
+
+class CachedRowItemAdmin(ItemAdmin):
+    list_editable = ('name',)
+    list_row_cache = True
+
+xadmin.site.register(CachedRowItem, CachedRowItemAdmin)
+
+
+class EntryAdmin(object):
+    list_display = ('name', 'rank')
+    list_pagination = 'keyset'
+    list_per_page = 3
+
+xadmin.site.register(Entry, EntryAdmin)
+
+
+class ProductAdmin(object):
+    list_display = ('name', 'category', 'tag_names')
+
+    def tag_names(self, obj):
+        return ', '.join(tag.name for tag in obj.tags.all())
+    tag_names.admin_fields = ('tags__name',)
+
+xadmin.site.register(Product, ProductAdmin)
+
+
+class SelectedProductAdmin(object):
+    list_display = ('name', 'price')
+
+    def queryset(self):
+        return super(SelectedProductAdmin, self).queryset().select_related('category')
+
+xadmin.site.register(SelectedProduct, SelectedProductAdmin)
+
+
+class GadgetAdmin(object):
+    list_display = ('name', 'status')
+    list_filter = ('status', 'active', 'category', 'tags', 'name')
+    list_filter_facets = True
+
+xadmin.site.register(Gadget, GadgetAdmin)
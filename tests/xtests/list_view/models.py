@@ -0,0 +1,67 @@
+from django.db import models
+
+
+class ItemBase(models.Model):
+    name = models.CharField(max_length=64)
+    rank = models.IntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class Item(ItemBase):
+    pass
+
+
+class CookieItem(ItemBase):
+    pass
+
+
+class CacheItem(ItemBase):
+    pass
+
+
+class CachedRowItem(ItemBase):
+    pass
+
+
+class Entry(models.Model):
+    name = models.CharField(max_length=64)
+    rank = models.IntegerField(default=0)
+
+
+class Category(models.Model):
+    name = models.CharField(max_length=64)
+
+    def __str__(self):
+        return self.name
+
+
+class Tag(models.Model):
+    name = models.CharField(max_length=64)
+
+
+class ProductBase(models.Model):
+    name = models.CharField(max_length=64)
+    price = models.IntegerField(default=0)
+    category = models.ForeignKey(Category)
+    tags = models.ManyToManyField(Tag)
+
+    class Meta:
+        abstract = True
+
+
+class Product(ProductBase):
+    pass
+
+
+class SelectedProduct(ProductBase):
+    pass
+
+
+class Gadget(models.Model):
+    name = models.CharField(max_length=64)
+    status = models.CharField(max_length=16, choices=(('draft', 'Draft'), ('published', 'Published')))
+    active = models.BooleanField(default=True)
+    category = models.ForeignKey(Category)
+    tags = models.ManyToManyField(Tag, blank=True)
@@ -0,0 +1,394 @@
+import re
+import unittest
+
+from django.conf import settings
+from django.contrib.postgres.lookups import Unaccent
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import CharField
+
+from xtests.base import BaseTest, SiteTest
+from xtests.list_view.adminx import CountingCacheListQuery
+from xtests.list_view.models import Item, CookieItem, CacheItem, CachedRowItem, Entry, \
+    Category, Tag, Product, SelectedProduct, Gadget
+from xadmin import filters
+from xadmin.counts import EstimatedCount, estimate_count
+from xadmin.listquery import CookieListQuery
+from xadmin.planner import QueryPlan
+from xadmin.views.list import CURSOR_NEXT, CURSOR_PREV
+
+
+class ListViewTest(SiteTest):
+
+    def setUp(self):
+        super(ListViewTest, self).setUp()
+        for i in range(5):
+            Item.objects.create(name='item %d' % i, rank=i % 2)
+
+
+class ListCountTest(ListViewTest):
+
+    def test_count_keeps_list_query(self):
+        self.client.get('/xadmin/list_view/item/?o=-rank&p=0')
+        response = self.client.get('/xadmin/list_view/item/count/?_q_=item')
+
+        self.assertContains(response, '"count": 5')
+        self.assertEqual(self.client.session['LIST_QUERY'], ['list_view', 'item', 'o=-rank&p=0'])
+
+
+class ListQueryTest(SiteTest):
+
+    def setUp(self):
+        super(ListQueryTest, self).setUp()
+        cache.clear()
+        del CountingCacheListQuery.stored[:]
+
+    def assertListRedirect(self, model, query):
+        obj = model.objects.create(name='item', rank=1)
+        url = '/xadmin/list_view/%s/' % model._meta.model_name
+        response = self.client.post('%s%s/update/' % (url, obj.pk), {'name': 'item', 'rank': 2})
+        self.assertRedirects(response, url + ('?' + query if query else ''),
+                             fetch_redirect_response=False)
+
+    def test_session(self):
+        self.client.get('/xadmin/list_view/item/?o=-rank&p=0')
+        self.assertListRedirect(Item, 'o=-rank&p=0')
+
+    def test_cookie(self):
+        self.client.get('/xadmin/list_view/cookieitem/?o=-rank&p=0')
+        self.assertNotIn('LIST_QUERY', self.client.session)
+        self.assertListRedirect(CookieItem, 'o=-rank&p=0')
+
+    def test_cache(self):
+        self.client.get('/xadmin/list_view/cacheitem/?o=-rank&p=0')
+        self.assertNotIn('LIST_QUERY', self.client.session)
+        self.assertListRedirect(CacheItem, 'o=-rank&p=0')
+
+    def test_other_model(self):
+        self.client.get('/xadmin/list_view/entry/?o=-rank')
+        self.assertListRedirect(Item, None)
+
+    def test_tampered_cookie(self):
+        self.client.get('/xadmin/list_view/cookieitem/?o=-rank')
+        signed = self.client.cookies[CookieListQuery.cookie_name].value
+        self.client.cookies[CookieListQuery.cookie_name] = signed.replace('-rank', '-name')
+        self.assertListRedirect(CookieItem, None)
+
+    def test_session_unchanged(self):
+        self.client.get('/xadmin/list_view/item/?o=-rank')
+        response = self.client.get('/xadmin/list_view/item/?o=-rank')
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        response = self.client.get('/xadmin/list_view/item/?o=rank')
+        self.assertIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+    def test_cookie_unchanged(self):
+        response = self.client.get('/xadmin/list_view/cookieitem/?o=-rank')
+        self.assertIn(CookieListQuery.cookie_name, response.cookies)
+        response = self.client.get('/xadmin/list_view/cookieitem/?o=-rank')
+        self.assertNotIn(CookieListQuery.cookie_name, response.cookies)
+
+    def test_cache_unchanged(self):
+        self.client.get('/xadmin/list_view/cacheitem/?o=-rank')
+        self.client.get('/xadmin/list_view/cacheitem/?o=-rank')
+        self.client.get('/xadmin/list_view/cacheitem/?o=rank')
+        self.assertEqual(CountingCacheListQuery.stored, [
+            ['list_view', 'cacheitem', 'o=-rank'], ['list_view', 'cacheitem', 'o=rank']])
+
+
+class RowCacheTest(SiteTest):
+
+    url = '/xadmin/list_view/cachedrowitem/'
+
+    def setUp(self):
+        super(RowCacheTest, self).setUp()
+        cache.clear()
+        for i in range(5):
+            CachedRowItem.objects.create(name='item %d' % i, rank=i)
+
+    def get_content(self, url=None):
+        response = self.client.get(url or self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode('utf-8')
+
+    def rename(self):
+        # Without the signals, the cached rows are kept
+        CachedRowItem.objects.filter(name='item 2').update(name='renamed')
+
+    def test_cached_page(self):
+        built = self.get_content()
+        self.rename()
+        cached = self.get_content()
+
+        self.assertNotIn('renamed', cached)
+        self.assertEqual(cached, built)
+
+    def test_editable_media(self):
+        self.get_content()
+        self.rename()
+        cached = self.get_content()
+
+        self.assertNotIn('renamed', cached)
+        self.assertIn('xadmin.plugin.editable.js', cached)
+        self.assertIn('editable-handler', cached)
+
+    def test_post_save(self):
+        self.get_content()
+        item = CachedRowItem.objects.get(name='item 2')
+        item.name = 'renamed'
+        item.save()
+        content = self.get_content()
+
+        self.assertIn('renamed', content)
+        self.assertIn('item 3', content)
+
+    def test_export(self):
+        url = self.url + '?_do_=export&export_type=json'
+        self.get_content(url)
+        self.rename()
+        content = self.get_content(url)
+
+        self.assertIn('renamed', content)
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'SQLite estimates')
+class CountEstimateTest(BaseTest):
+
+    def setUp(self):
+        super(CountEstimateTest, self).setUp()
+        category = Category.objects.create(name='category')
+        for i in range(10):
+            Product.objects.create(name='product %d' % i, category=category)
+        # Gaps in the primary keys
+        Product.objects.filter(name__in=['product 3', 'product 4', 'product 5']).delete()
+
+    def analyze(self):
+        cursor = connection.cursor()
+        cursor.execute('ANALYZE')
+        cursor.close()
+
+    def test_analyzed(self):
+        self.analyze()
+        # From the statistics of the index of the foreign key
+        self.assertEqual(estimate_count(Product.objects.all()), 7)
+
+    def test_primary_keys(self):
+        self.assertEqual(estimate_count(Product.objects.all()), 10)
+
+    def test_filtered(self):
+        self.assertIsNone(estimate_count(Product.objects.filter(name='product 1')))
+
+    def test_threshold(self):
+        self.analyze()
+        view = type('View', (object,), {'estimate_count_threshold': 5})()
+        self.assertEqual(EstimatedCount(view)(Product.objects.all()), (7, True))
+        view.estimate_count_threshold = 100
+        self.assertEqual(EstimatedCount(view)(Product.objects.all()), (7, False))
+        self.assertEqual(EstimatedCount(view)(Product.objects.filter(name='product 1')), (1, False))
+
+
+class FilterFacetTest(SiteTest):
+
+    def setUp(self):
+        super(FilterFacetTest, self).setUp()
+        cache.clear()
+        self.a, self.b = [Category.objects.create(name=name) for name in ('a', 'b')]
+        self.t0, self.t1 = [Tag.objects.create(name=name) for name in ('t0', 't1')]
+        for name, status, active, category, tags in (
+                ('one', 'draft', True, self.a, [self.t0]),
+                ('two', 'draft', False, self.b, [self.t0, self.t1]),
+                ('three', 'published', True, self.a, [])):
+            gadget = Gadget.objects.create(name=name, status=status, active=active, category=category)
+            gadget.tags.add(*tags)
+
+    def get_list(self, query=''):
+        response = self.client.get('/xadmin/list_view/gadget/' + query)
+        self.assertEqual(response.status_code, 200)
+        return response.context['cl']
+
+    def get_counts(self, query=''):
+        cl = self.get_list(query)
+        return [spec.facet_counts for spec in cl.filter_specs]
+
+    def test_counts(self):
+        status, active, category, tags, name = self.get_counts()
+
+        self.assertEqual(status, {'draft': 2, 'published': 1})
+        self.assertEqual(active, {'True': 2, 'False': 1})
+        self.assertEqual(category, {str(self.a.pk): 2, str(self.b.pk): 1})
+        self.assertEqual(tags, {str(self.t0.pk): 2, str(self.t1.pk): 1, None: 1})
+        # Text filters have no choices to count
+        self.assertIsNone(name)
+
+    def test_used_filter(self):
+        status, active, category, tags, name = self.get_counts('?_p_status__exact=draft')
+
+        # Counted under the other filters only
+        self.assertEqual(status, {'draft': 2, 'published': 1})
+        self.assertEqual(active, {'True': 1, 'False': 1})
+        self.assertEqual(category, {str(self.a.pk): 1, str(self.b.pk): 1})
+        self.assertEqual(tags, {str(self.t0.pk): 2, str(self.t1.pk): 1})
+
+    def test_cached(self):
+        self.get_counts()
+        Gadget.objects.filter(name='three').update(status='draft')
+        self.assertEqual(self.get_counts()[0], {'draft': 2, 'published': 1})
+        # Another filter, another entry
+        self.assertEqual(self.get_counts('?_p_active__exact=1')[0], {'draft': 2})
+
+    def test_cache_key(self):
+        plugin = [p for p in self.get_list().plugins if hasattr(p, 'get_facet_cache_key')][0]
+
+        def get_key(query):
+            plugin.request = self.factory.get('/xadmin/list_view/gadget/' + query)
+            return plugin.get_facet_cache_key()
+
+        self.assertEqual(get_key('?_p_status__exact=draft&o=name&p=1'),
+                         get_key('?_p_status__exact=draft'))
+        self.assertNotEqual(get_key('?_p_status__exact=draft&_p_status__exact=published'),
+                            get_key('?_p_status__exact=published'))
+        self.assertEqual(get_key('?_p_a=1&_p_a=2'), get_key('?_p_a=2&_p_a=1'))
+
+    def test_text_filter_params(self):
+        # The text filters filter the list and each facet query, with the
+        # unaccent lookups of django.contrib.postgres too
+        cl = self.get_list('?_p_name__istartswith=t')
+        spec = cl.filter_specs[4]
+        self.assertEqual(cl.filter_specs[0].facet_counts, {'draft': 1, 'published': 1})
+        self.assertEqual(spec.used_params, {'name__istartswith': 't'})
+        CharField.register_lookup(Unaccent)
+        self.addCleanup(CharField._unregister_lookup, Unaccent)
+        self.addCleanup(setattr, filters, 'settings', filters.settings)
+        filters.settings = type('Settings', (object,), {
+            'INSTALLED_APPS': ['django.contrib.postgres']})
+
+        queries = [str(spec.do_filte(Gadget.objects.all()).query) for i in range(2)]
+
+        self.assertEqual(spec.used_params, {'name__istartswith': 't'})
+        self.assertEqual(queries[0], queries[1])
+        self.assertIn('UNACCENT', queries[0])
+
+
+class KeysetPaginationTest(SiteTest):
+
+    def setUp(self):
+        super(KeysetPaginationTest, self).setUp()
+        for i in range(10):
+            Entry.objects.create(name='entry %d' % i, rank=i % 3)
+
+    def get_page(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.context['cl']
+
+    def get_link(self, cl, direction):
+        match = re.search(r'href="([^"]+)"', cl.get_cursor_link(direction))
+        return match and '/xadmin/list_view/entry/' + match.group(1).replace('&amp;', '&')
+
+    def walk(self, query=''):
+        # Pks of every page, following the next links from the first page
+        pages = []
+        url = '/xadmin/list_view/entry/?' + query
+        while url and len(pages) < 10:
+            cl = self.get_page(url)
+            self.assertIsNone(cl.paginator)
+            pages.append([obj.pk for obj in cl.result_list])
+            url = self.get_link(cl, CURSOR_NEXT)
+        return pages
+
+    def assertWalk(self, query, *ordering):
+        pages = self.walk(query)
+        self.assertEqual([len(page) for page in pages], [3, 3, 3, 1])
+        self.assertEqual(sum(pages, []), list(Entry.objects.order_by(*ordering).values_list('pk', flat=True)))
+
+    def test_walk_pages(self):
+        self.assertWalk('', '-pk')
+
+    def test_descending_non_unique_ordering(self):
+        self.assertWalk('o=-rank', '-rank', '-pk')
+
+    def test_ascending_non_unique_ordering(self):
+        self.assertWalk('o=rank.name', 'rank', 'name', '-pk')
+
+    def test_previous_link(self):
+        first = self.get_page('/xadmin/list_view/entry/?o=-rank')
+        self.assertIsNone(self.get_link(first, CURSOR_PREV))
+        second = self.get_page(self.get_link(first, CURSOR_NEXT))
+        third = self.get_page(self.get_link(second, CURSOR_NEXT))
+
+        previous = self.get_page(self.get_link(third, CURSOR_PREV))
+        self.assertEqual(previous.result_list, second.result_list)
+        self.assertTrue(previous.has_more)
+        self.assertTrue(previous.has_previous)
+        previous = self.get_page(self.get_link(previous, CURSOR_PREV))
+        self.assertEqual(previous.result_list, first.result_list)
+        self.assertFalse(previous.has_previous)
+
+    def test_malformed_cursor(self):
+        first = [obj.pk for obj in self.get_page('/xadmin/list_view/entry/?o=-rank').result_list]
+        # Not base64, not json, not a cursor
+        for cursor in ('%21%21', 'garbage', 'WyJuIl0='):
+            cl = self.get_page('/xadmin/list_view/entry/?o=-rank&c=' + cursor)
+            self.assertEqual([obj.pk for obj in cl.result_list], first)
+            self.assertFalse(cl.has_previous)
+
+    def test_cursor_of_another_ordering(self):
+        second = self.get_link(self.get_page('/xadmin/list_view/entry/?o=-rank'), CURSOR_NEXT)
+        cl = self.get_page(second.replace('o=-rank', 'o=rank'))
+        self.assertEqual([obj.pk for obj in cl.result_list],
+                         list(Entry.objects.order_by('rank', '-pk').values_list('pk', flat=True)[:3]))
+
+
+class QueryPlanTest(SiteTest):
+
+    def setUp(self):
+        super(QueryPlanTest, self).setUp()
+        tags = [Tag.objects.create(name='tag %d' % i) for i in range(2)]
+        for i in range(3):
+            category = Category.objects.create(name='category %d' % i)
+            for model in (Product, SelectedProduct):
+                product = model.objects.create(name='product %d' % i, price=i, category=category)
+                product.tags.add(*tags[:i])
+
+    def get_list(self, model):
+        response = self.client.get('/xadmin/list_view/%s/' % model._meta.model_name)
+        self.assertEqual(response.status_code, 200)
+        return response.context['cl']
+
+    def test_plan(self):
+        plan = self.get_list(Product).query_plan
+
+        self.assertEqual(plan.select_related, ['category'])
+        self.assertEqual(plan.prefetch_related, ['tags'])
+        self.assertEqual(set(plan.only), set(['name', 'category']))
+        self.assertIsNone(plan.unprojected)
+
+    def test_rows(self):
+        cl = self.get_list(Product)
+
+        self.assertEqual(cl.result_queryset.query.deferred_loading,
+                         (set(['name', 'category']), False))
+        with self.assertNumQueries(0):
+            rows = [(p.name, p.category.name, [t.name for t in p.tags.all()])
+                    for p in cl.result_list]
+        self.assertEqual(sorted(rows), [('product 0', 'category 0', []),
+                                        ('product 1', 'category 1', ['tag 0']),
+                                        ('product 2', 'category 2', ['tag 0', 'tag 1'])])
+
+    def test_queryset_select_related(self):
+        cl = self.get_list(SelectedProduct)
+
+        # The foreign key queryset() joined is loaded, not deferred
+        self.assertEqual(cl.result_queryset.query.deferred_loading,
+                         (set(['name', 'price', 'category']), False))
+        with self.assertNumQueries(0):
+            names = [p.category.name for p in cl.result_list]
+        self.assertEqual(sorted(names), ['category 0', 'category 1', 'category 2'])
+
+    def test_unprojected(self):
+        plan = QueryPlan(Product)
+        plan.add_path('name')
+        plan.disable_projection('total')
+        queryset = Product.objects.all()
+
+        self.assertIs(plan.project(queryset), queryset)
+        self.assertIn('only: - (total)', plan.report())
@@ -0,0 +1,33 @@
+import xadmin
+from xadmin.views import BaseAdminPlugin, ModelAdminView
+
+from xtests.perms.models import Document, CachedDocument
+
+
+class OwnerPlugin(BaseAdminPlugin):
+    # Only the owners of the objects may change or delete them
+    owner_field = None
+
+    def init_request(self, *args, **kwargs):
+        if not self.owner_field:
+            return False
+        for perm in ('change', 'delete'):
+            self.admin_view.perm_oracle.add_object_predicate(
+                lambda user, obj: getattr(obj, self.owner_field) == user,
+                '%s.%s_%s' % (self.opts.app_label, perm, self.opts.model_name))
+        return True
+
+xadmin.site.register_plugin(OwnerPlugin, ModelAdminView)
+
+
+class DocumentAdmin(object):
+    list_display = ('title', 'owner')
+    owner_field = 'owner'
+
+xadmin.site.register(Document, DocumentAdmin)
+
+
+class CachedDocumentAdmin(DocumentAdmin):
+    list_row_cache = True
+
+xadmin.site.register(CachedDocument, CachedDocumentAdmin)
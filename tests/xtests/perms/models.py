@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.db import models
+
+
+class DocumentBase(models.Model):
+    title = models.CharField(max_length=64)
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL)
+
+    class Meta:
+        abstract = True
+
+
+class Document(DocumentBase):
+    pass
+
+
+class CachedDocument(DocumentBase):
+    pass
@@ -0,0 +1,103 @@
+from django.contrib.auth.models import Group, Permission, User
+from django.core.cache import cache
+
+from xtests.base import SiteTest
+from xtests.perms.models import Document, CachedDocument
+from xadmin.perms import PermissionOracle, get_user_perms
+
+
+class OwnerPredicateTest(SiteTest):
+
+    def setUp(self):
+        super(OwnerPredicateTest, self).setUp()
+        other = User.objects.create_user('other', 'other@xadmin.io', 'other')
+        self.own = Document.objects.create(title='own', owner=self.admin)
+        self.other = Document.objects.create(title='other', owner=other)
+
+    def test_update(self):
+        response = self.client.get('/xadmin/perms/document/%s/update/' % self.own.pk)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/xadmin/perms/document/%s/update/' % self.other.pk)
+        self.assertEqual(response.status_code, 403)
+
+    def test_delete(self):
+        response = self.client.get('/xadmin/perms/document/%s/delete/' % self.own.pk)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post('/xadmin/perms/document/%s/delete/' % self.other.pk,
+                                    {'post': 'yes'})
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(Document.objects.filter(pk=self.other.pk).exists())
+
+
+class RowCacheTest(SiteTest):
+
+    def test_rows_per_user(self):
+        cache.clear()
+        User.objects.create_superuser('other', 'other@xadmin.io', 'other')
+        doc = CachedDocument.objects.create(title='own', owner=self.admin)
+        update_url = '/xadmin/perms/cacheddocument/%s/update/' % doc.pk
+        detail_url = '/xadmin/perms/cacheddocument/%s/detail/' % doc.pk
+
+        response = self.client.get('/xadmin/perms/cacheddocument/')
+        self.assertContains(response, update_url)
+
+        # Another superuser, the predicate rejects the change
+        self.client.login(username='other', password='other')
+        response = self.client.get('/xadmin/perms/cacheddocument/')
+        self.assertNotContains(response, update_url)
+        self.assertContains(response, detail_url)
+
+
+class PermissionOracleTest(SiteTest):
+
+    def setUp(self):
+        super(PermissionOracleTest, self).setUp()
+        cache.clear()
+        self.user = User.objects.create_user('staff', 'staff@xadmin.io', 'staff')
+        self.doc = Document.objects.create(title='doc', owner=self.user)
+        self.calls = []
+
+    def predicate(self, user, obj):
+        self.calls.append(obj.pk)
+        return obj.owner_id == user.pk
+
+    def test_memoized(self):
+        oracle = PermissionOracle(self.admin)
+        oracle.add_object_predicate(self.predicate, 'perms.change_document')
+
+        self.assertFalse(oracle.has_perm('perms.change_document', self.doc))
+        self.assertFalse(oracle.has_perm('perms.change_document', Document.objects.get(pk=self.doc.pk)))
+        self.assertEqual(self.calls, [self.doc.pk])
+        # Another permission, without predicate
+        self.assertTrue(oracle.has_perm('perms.delete_document', self.doc))
+        self.assertEqual(self.calls, [self.doc.pk])
+
+    def test_new_predicate_clears_memo(self):
+        oracle = PermissionOracle(self.admin)
+        self.assertTrue(oracle.has_perm('perms.change_document', self.doc))
+        oracle.add_object_predicate(self.predicate)
+        self.assertFalse(oracle.has_perm('perms.change_document', self.doc))
+        self.assertEqual(self.calls, [self.doc.pk])
+
+    def get_perms(self):
+        # A new user object, the permissions are read once per object
+        return get_user_perms(User.objects.get(pk=self.user.pk))
+
+    def test_group_change(self):
+        group = Group.objects.create(name='editors')
+        self.user.groups.add(group)
+        self.assertNotIn('perms.change_document', self.get_perms())
+
+        group.permissions.add(Permission.objects.get(codename='change_document'))
+        self.assertIn('perms.change_document', self.get_perms())
+
+        self.user.groups.remove(group)
+        self.assertNotIn('perms.change_document', self.get_perms())
+
+    def test_permission_change(self):
+        perm = Permission.objects.get(codename='change_document')
+        self.user.user_permissions.add(perm)
+        self.assertIn('perms.change_document', self.get_perms())
+
+        perm.delete()
+        self.assertNotIn('perms.change_document', self.get_perms())
@@ -0,0 +1,32 @@
+import xadmin
+
+from xtests.plugins.models import Sale, CachedSale, SharedSale
+
+
+class SaleAdmin(object):
+    list_display = ('title', 'status', 'amount', 'price', 'created')
+    data_charts = {
+        'avg_by_status': {'title': 'Average by status', 'x-field': 'status',
+                          'y-field': ('amount', 'price'), 'bucket': 'category', 'aggregate': 'avg'},
+    }
+
+xadmin.site.register(Sale, SaleAdmin)
+
+
+class CachedSaleAdmin(object):
+    list_display = ('title', 'status', 'amount', 'price', 'created')
+    aggregate_fields = {'amount': 'sum', 'price': 'avg'}
+    data_charts = {
+        'daily': {'title': 'Daily', 'x-field': 'created', 'y-field': ('amount', 'price'),
+                  'bucket': 'day', 'aggregate': {'amount': 'sum', 'price': 'avg'},
+                  'incremental': True},
+    }
+    result_cache_timeout = 600
+
+xadmin.site.register(CachedSale, CachedSaleAdmin)
+
+
+class SharedSaleAdmin(CachedSaleAdmin):
+    result_cache_shared = True
+
+xadmin.site.register(SharedSale, SharedSaleAdmin)
@@ -0,0 +1,26 @@
+from django.db import models
+
+STATUS_CHOICES = (('draft', 'Draft'), ('published', 'Published'))
+
+
+class SaleBase(models.Model):
+    title = models.CharField(max_length=64)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default='draft')
+    amount = models.IntegerField(default=0)
+    price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    created = models.DateTimeField()
+
+    class Meta:
+        abstract = True
+
+
+class Sale(SaleBase):
+    pass
+
+
+class CachedSale(SaleBase):
+    pass
+
+
+class SharedSale(SaleBase):
+    pass
@@ -0,0 +1,125 @@
+import datetime
+import json
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils.encoding import force_text
+
+from xtests.base import SiteTest
+from xtests.plugins.models import Sale, CachedSale, SharedSale
+
+
+class PluginTest(SiteTest):
+
+    def create_sales(self, model, rows):
+        for i, (day, status, amount, price) in enumerate(rows):
+            model.objects.create(title='sale %d' % i, status=status, amount=amount, price=price,
+                                 created=datetime.datetime(2015, 1, day, 12))
+
+    def get_chart(self, model, name):
+        response = self.client.get('/xadmin/plugins/%s/chart/%s/' % (model._meta.model_name, name))
+        self.assertEqual(response.status_code, 200)
+        return [dict(series['data']) for series in json.loads(response.content.decode('utf-8'))['data']]
+
+
+class ChartTest(PluginTest):
+
+    def test_bucket_average(self):
+        self.create_sales(Sale, [(5, 'draft', 1, '1.00'), (5, 'draft', 2, '2.50'),
+                                 (6, 'draft', 2, '3.00'), (6, 'published', 7, '1.00')])
+
+        amount, price = self.get_chart(Sale, 'avg_by_status')
+
+        # Integer sums aren't averaged with integer division
+        self.assertEqual(amount, {'Draft': 5 / 3.0, 'Published': 7.0})
+        self.assertEqual(Decimal(price['Published']), Decimal('1'))
+        self.assertAlmostEqual(float(price['Draft']), 6.5 / 3)
+
+
+class ResultCacheTest(PluginTest):
+
+    def setUp(self):
+        super(ResultCacheTest, self).setUp()
+        cache.clear()
+        self.create_sales(CachedSale, [(5, 'draft', 1, '1.00'), (5, 'draft', 2, '2.50'),
+                                       (6, 'draft', 2, '3.00'), (7, 'published', 7, '1.00')])
+
+    def get_aggregates(self, model=CachedSale):
+        response = self.client.get('/xadmin/plugins/%s/' % model._meta.model_name)
+        self.assertEqual(response.status_code, 200)
+        return [force_text(cell.text) for cell in response.context['results'][-1].cells]
+
+    def get_results(self, model=CachedSale):
+        return self.get_chart(model, 'daily'), self.get_aggregates(model)
+
+    def get_fresh_results(self):
+        cache.clear()
+        return self.get_results()
+
+    def test_cached(self):
+        results = self.get_results()
+        # Not seen by the signals, kept until the timeout
+        CachedSale.objects.update(amount=100)
+        self.assertEqual(self.get_results(), results)
+
+    def test_created(self):
+        # At the start of the last bucket
+        CachedSale.objects.create(title='midnight', amount=5, price='1.00',
+                                  created=datetime.datetime(2015, 1, 7))
+        self.get_results()
+        # In the last bucket and in a new one
+        self.create_sales(CachedSale, [(7, 'draft', 3, '2.00'), (8, 'draft', 4, '4.00')])
+        chart, aggregates = results = self.get_results()
+
+        self.assertEqual(sorted(chart[0].values()), [2, 3, 4, 15])
+        self.assertIn('24', aggregates)
+        self.assertEqual(results, self.get_fresh_results())
+
+    def test_created_incremental(self):
+        self.get_results()
+        # Only the buckets from the last one on are aggregated again
+        CachedSale.objects.filter(created__day=5).update(amount=100)
+        self.create_sales(CachedSale, [(8, 'draft', 4, '4.00')])
+        chart, aggregates = self.get_results()
+
+        self.assertEqual(sorted(chart[0].values()), [2, 3, 4, 7])
+
+    def test_saved(self):
+        self.get_results()
+        sale = CachedSale.objects.get(created__day=5, amount=1)
+        sale.amount = 11
+        sale.save()
+        chart, aggregates = results = self.get_results()
+
+        self.assertEqual(sorted(chart[0].values()), [2, 7, 13])
+        self.assertIn('22', aggregates)
+        self.assertEqual(results, self.get_fresh_results())
+
+    def test_deleted(self):
+        self.get_results()
+        CachedSale.objects.get(created__day=5, amount=1).delete()
+        chart, aggregates = results = self.get_results()
+
+        self.assertEqual(sorted(chart[0].values()), [2, 2, 7])
+        self.assertIn('11', aggregates)
+        self.assertEqual(results, self.get_fresh_results())
+
+    def test_per_user(self):
+        results = self.get_results()
+        CachedSale.objects.update(amount=100)
+        User.objects.create_superuser('other', 'other@xadmin.io', 'other')
+        self.client.login(username='other', password='other')
+        chart, aggregates = self.get_results()
+
+        self.assertNotEqual((chart, aggregates), results)
+        self.assertIn('400', aggregates)
+
+    def test_shared(self):
+        self.create_sales(SharedSale, [(5, 'draft', 1, '1.00'), (6, 'draft', 2, '3.00')])
+        results = self.get_results(SharedSale)
+        SharedSale.objects.update(amount=100)
+        User.objects.create_superuser('other', 'other@xadmin.io', 'other')
+        self.client.login(username='other', password='other')
+
+        self.assertEqual(self.get_results(SharedSale), results)
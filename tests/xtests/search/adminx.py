@@ -0,0 +1,18 @@
+import xadmin
+from xadmin.search import FullTextSearch
+
+from xtests.search.models import Author, Article
+
+
+class AuthorAdmin(object):
+    search_fields = ('name',)
+
+xadmin.site.register(Author, AuthorAdmin)
+
+
+class ArticleAdmin(object):
+    list_display = ('title',)
+    search_fields = ('title', 'body', 'author__name')
+    search_backend = FullTextSearch
+
+xadmin.site.register(Article, ArticleAdmin)
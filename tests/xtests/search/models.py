@@ -0,0 +1,11 @@
+from django.db import models
+
+
+class Author(models.Model):
+    name = models.CharField(max_length=64)
+
+
+class Article(models.Model):
+    title = models.CharField(max_length=128)
+    body = models.TextField(blank=True)
+    author = models.ForeignKey(Author)
@@ -0,0 +1,98 @@
+import unittest
+
+from django.core.management import call_command, CommandError
+from django.db import connection
+from django.utils.six import StringIO
+
+from xtests.base import SiteTest
+from xtests.search.models import Author, Article
+from xadmin.search import FullTextSearch, LookupSearch, RANK_FIELD, get_search_backend
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'SQLite FTS5 index')
+class FullTextSearchTest(SiteTest):
+
+    def setUp(self):
+        super(FullTextSearchTest, self).setUp()
+        # The test transactions roll the index table back
+        index = FullTextSearch.indexes['sqlite']
+        index._exists.clear()
+        self.addCleanup(index._exists.clear)
+
+        self.author = Author.objects.create(name='Guido')
+        self.python = Article.objects.create(
+            title='Python', body='Python, python everywhere', author=self.author)
+        self.notes = Article.objects.create(
+            title='Notes', body='Some words about many things, and python once', author=self.author)
+        self.django = Article.objects.create(
+            title='Django', body='The web framework', author=Author.objects.create(name='Adrian'))
+
+    def index(self, *args, **options):
+        out = StringIO()
+        call_command('xadmin_search_index', *args, stdout=out, **options)
+        return out.getvalue()
+
+    def search(self, query):
+        backend = get_search_backend(Article)
+        queryset, use_distinct = backend(Article.objects.all(), query)
+        return set(article.title for article in queryset)
+
+    def get_list(self, query):
+        response = self.client.get('/xadmin/search/article/' + query)
+        self.assertEqual(response.status_code, 200)
+        return [article.title for article in response.context['cl'].result_list]
+
+    def test_backends(self):
+        self.assertIsNone(get_search_backend(Author))
+        self.assertIsInstance(get_search_backend(Article), FullTextSearch)
+
+    def test_not_indexed(self):
+        backend = get_search_backend(Article)
+        queryset, use_distinct = backend(Article.objects.all(), 'pyth')
+
+        # Lookups until the index is created
+        self.assertIsNone(backend.get_search_index('default'))
+        self.assertIsNone(backend.get_rank_ordering('pyth', 'default'))
+        self.assertNotIn(RANK_FIELD, queryset.query.extra)
+        self.assertEqual(set(a.title for a in queryset), set(['Python', 'Notes']))
+        self.assertEqual(self.search('pyth'), set(LookupSearch(Article, ('title', 'body'))(
+            Article.objects.all(), 'pyth')[0].values_list('title', flat=True)))
+
+    def test_index(self):
+        self.assertEqual(self.index(), 'Indexed 3 search.Article\n')
+
+        queryset, use_distinct = get_search_backend(Article)(Article.objects.all(), 'python')
+        self.assertIn(RANK_FIELD, queryset.query.extra)
+        self.assertEqual(self.search('python'), set(['Python', 'Notes']))
+        # Prefixes of every word, in any field
+        self.assertEqual(self.search('pyth guid'), set(['Python', 'Notes']))
+        self.assertEqual(self.search('web adrian'), set(['Django']))
+        self.assertEqual(self.search('web guido'), set())
+
+    def test_update(self):
+        self.index()
+        article = Article.objects.create(title='Snakes', body='Pythons', author=self.author)
+        self.assertEqual(self.search('snakes'), set(['Snakes']))
+
+        article.title = 'Reptiles'
+        article.save()
+        self.assertEqual(self.search('snakes'), set())
+        self.assertEqual(self.search('reptiles'), set(['Reptiles']))
+
+        article.delete()
+        self.assertEqual(self.search('reptiles'), set())
+
+    def test_ranked(self):
+        self.index()
+
+        # Best match first, instead of the default -pk ordering
+        self.assertEqual(self.get_list('?_q_=python'), ['Python', 'Notes'])
+        # Unless the user sorted the list
+        self.assertEqual(self.get_list('?_q_=python&o=-title'), ['Python', 'Notes'])
+        self.assertEqual(self.get_list('?_q_=python&o=title'), ['Notes', 'Python'])
+
+    def test_commands(self):
+        self.assertEqual(self.index('search.article'), 'Indexed 3 search.Article\n')
+        self.assertEqual(self.index('search.Article', clear=True), 'Removed search.Article from the index\n')
+        self.assertEqual(self.search('python'), set())
+        self.assertRaises(CommandError, self.index, 'search.Author')
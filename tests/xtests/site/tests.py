@@ -1,10 +1,16 @@
+import types
+
+from django.conf.urls import include
+from django.conf.urls.i18n import i18n_patterns
+from django.core.urlresolvers import RegexURLResolver, set_urlconf
 from django.http import HttpResponse
+from django.utils import translation
 
 from xtests.base import BaseTest
 from xadmin.sites import AdminSite
 from xadmin.views import BaseAdminView, BaseAdminPlugin, ModelAdminView, filter_hook
 
-from models import ModelA
+from xtests.site.models import ModelA
 
 
 class ModelAAdmin(object):
@@ -32,6 +38,29 @@ class TestPlugin(BaseAdminPlugin):
         return "%s PLUGIN" % title
 
 
+class TestPriorityPlugin(BaseAdminPlugin):
+
+    def get_title(self, title):
+        return "%s PRIORITY" % title
+    get_title.priority = 1
+
+
+class TestWrapPlugin(BaseAdminPlugin):
+
+    def get_title(self, __):
+        return "WRAP %s" % __()
+    get_title.priority = 20
+
+
+class TestDisabledPlugin(BaseAdminPlugin):
+
+    def init_request(self, *args, **kwargs):
+        return False
+
+    def get_title(self, title):
+        return "%s DISABLED" % title
+
+
 class TestModelAdminView(ModelAdminView):
 
     def get(self, request, obj_id):
@@ -41,7 +70,7 @@ class TestModelAdminView(ModelAdminView):
 class AdminSiteTest(BaseTest):
 
     def get_site(self):
-        return AdminSite('test', 'test_app')
+        return AdminSite('test')
 
     def test_register_model(self):
         site = self.get_site()
@@ -80,6 +109,23 @@ class AdminSiteTest(BaseTest):
 
         self.assertEqual(cv.get_title(), "TEST TITLE PLUGIN")
 
+    def test_plugin_hook_registry(self):
+        site = self.get_site()
+
+        site.register_view(r"^test/$", TestAdminView, 'test')
+        site.register_plugin(TestWrapPlugin, TestAdminView)
+        site.register_plugin(TestPlugin, TestAdminView)
+        site.register_plugin(TestDisabledPlugin, TestAdminView)
+        site.register_plugin(TestPriorityPlugin, TestAdminView)
+
+        c = site.get_view_class(TestAdminView)
+        self.assertEqual([c.plugin_classes[i] for i, mode in c.hook_registry.get('get_title')],
+                         [TestPriorityPlugin, TestPlugin, TestDisabledPlugin, TestWrapPlugin])
+
+        cv = c(self._mocked_request('test/'))
+
+        self.assertEqual(cv.get_title(), "WRAP TEST TITLE PRIORITY PLUGIN")
+
     def test_get_urls(self):
         site = self.get_site()
 
@@ -88,7 +134,42 @@ class AdminSiteTest(BaseTest):
         site.register_modelview(
             r'^(.+)/test/$', TestModelAdminView, name='%s_%s_test')
 
-        urls, app_name, namespace = site.urls
+        urls, name, app_name = site.urls
+
+        self.assertEqual(name, 'test')
+        self.assertEqual(app_name, 'xadmin')
+
+    def test_lazy_urls(self):
+        site = self.get_site()
+        site.lazy_urls = True
+
+        site.register(ModelA, ModelAAdmin)
+        site.register_modelview(
+            r'^(.+)/test/$', TestModelAdminView, name='%s_%s_test')
+
+        resolver = RegexURLResolver(r'^', site.get_urls())
+        self.assertFalse([name for name in site._admin_view_cache
+                          if 'TestModelAdminView' in name])
+
+        match = resolver.resolve('site/modela/1/test/')
+        request = self._mocked_request('site/modela/1/test/')
+        request.user.is_staff = True
+        response = match.func(request, *match.args, **match.kwargs)
+
+        self.assertEqual(response.content, b'1')
+        self.assertTrue([name for name in site._admin_view_cache
+                         if 'TestModelAdminView' in name])
+
+    def test_url_template_language(self):
+        site = self.get_site()
+        site.register_view(r"^test/$", TestAdminView, 'test')
+
+        urlconf = types.ModuleType('i18n_urls')
+        urlconf.urlpatterns = i18n_patterns('', (r'^admin/', include(site.urls)))
+        set_urlconf(urlconf)
+        self.addCleanup(set_urlconf, None)
 
-        self.assertEqual(app_name, 'test_app')
-        self.assertEqual(namespace, 'test')
+        with translation.override('en'):
+            self.assertEqual(site.reverse('xadmin:test'), '/en/admin/test/')
+        with translation.override('fr'):
+            self.assertEqual(site.reverse('xadmin:test'), '/fr/admin/test/')
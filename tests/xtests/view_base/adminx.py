@@ -1,6 +1,6 @@
 from xadmin.sites import AdminSite
-from xadmin.views import BaseAdminView, CommAdminView, ListAdminView
-from models import ModelA, ModelB
+from xadmin.views import BaseAdminView, CommAdminView, ListAdminView, ModelAdminView
+from xtests.view_base.models import ModelA, ModelB
 
 site = AdminSite('views_base')
 
@@ -20,8 +20,11 @@ class TestAView(BaseAdminView):
 class OptionA(object):
     option_attr = 'option_test'
 
+site.register_modelview(r'^$', ListAdminView, name='%s_%s_changelist')
 site.register_modelview(r'^list$', ListAdminView, name='%s_%s_list')
+site.register_modelview(r'^(.+)/detail$', ModelAdminView, name='%s_%s_detail')
 
+site.register_view(r"^$", TestBaseView, 'index')
 site.register_view(r"^test/base$", TestBaseView, 'test')
 site.register_view(r"^test/comm$", TestCommView, 'test_comm')
 site.register_view(r"^test/a$", TestAView, 'test_a')
@@ -1,11 +1,14 @@
 
 from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
 
 from xtests.base import BaseTest
+from xadmin.profiling import Profiler
 from xadmin.views import BaseAdminView, BaseAdminPlugin, ModelAdminView, ListAdminView
+from xadmin.views.list import ResultItem, ResultRow, LAZY_TEXT
 
-from models import ModelA, ModelB
-from adminx import site, ModelAAdmin, TestBaseView, TestCommView, TestAView, OptionA
+from xtests.view_base.models import ModelA, ModelB
+from xtests.view_base.adminx import site, ModelAAdmin, TestBaseView, TestCommView, TestAView, OptionA
 
 class BaseAdminTest(BaseTest):
 
@@ -38,6 +41,11 @@ class BaseAdminTest(BaseTest):
         test_url = self.test_view.get_model_url(ModelA, 'list')
         self.assertEqual(test_url, '/view_base/view_base/modela/list')
 
+    def test_model_url_args(self):
+        for pk in (1, 'a b/c_%d', u'\xe9'):
+            self.assertEqual(self.test_view.get_model_url(ModelA, 'detail', pk),
+                             reverse('xadmin:view_base_modela_detail', args=(pk,), current_app=site.name))
+
     def test_has_model_perm(self):
         test_user = User.objects.create(username='test_user')
 
@@ -58,7 +66,30 @@ class CommAdminTest(BaseTest):
         self.assertEqual(self.test_view.get_model_icon(ModelA), 'flag')
         self.assertEqual(self.test_view.get_model_icon(ModelB), 'test')
 
-
-
-
-
+    def test_profiler(self):
+        self.test_view.profiler = Profiler()
+        self.test_view.get_context()
+
+        report = self.test_view.profiler.get_report()
+        self.assertIn('get_context', [h['name'] for h in report['hooks']])
+        self.assertEqual(report['sql']['count'], 0)
+
+
+class ResultItemTest(BaseTest):
+
+    def test_cell_lists(self):
+        item = ResultItem('name', ResultRow())
+        self.assertEqual(item.classes, [])
+        item.classes.append('nowrap')
+        item.menus += ['<li>Menu</li>']
+        self.assertEqual(item.classes, ['nowrap'])
+        self.assertEqual(item.menus, ['<li>Menu</li>'])
+        self.assertEqual(item.btns, [])
+        self.assertEqual(item.tagattrs, ' class="nowrap"')
+
+    def test_lazy_text(self):
+        item = ResultItem('name', ResultRow())
+        item.field = ModelA._meta.get_field('name')
+        item.value = 'test'
+        item.text = LAZY_TEXT
+        self.assertEqual(item.text, 'test')
@@ -1,5 +1,5 @@
 from django.conf.urls import patterns, include
-from adminx import site
+from xtests.view_base.adminx import site
 
 urlpatterns = patterns('',
     (r'', include(site.urls)),
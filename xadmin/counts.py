@@ -0,0 +1,100 @@
+"""
+Row count strategies for the list view.
+
+``ListAdminView.count_strategy`` is called with the admin view and returns
+``(count, estimated)`` for a queryset. ``ExactCount`` runs ``COUNT(*)``,
+``EstimatedCount`` asks the database planner first and only counts when the
+estimate is below ``ListAdminView.estimate_count_threshold``.
+"""
+import re
+
+from django.db import connections, DatabaseError
+
+EXPLAIN_ROWS_RE = re.compile(r'rows=(\d+)')
+
+
+class BaseCount(object):
+
+    def __init__(self, admin_view):
+        self.admin_view = admin_view
+
+    def __call__(self, queryset):
+        raise NotImplementedError
+
+
+class ExactCount(BaseCount):
+
+    def __call__(self, queryset):
+        return queryset.count(), False
+
+
+class EstimatedCount(BaseCount):
+
+    def __call__(self, queryset):
+        estimate = estimate_count(queryset)
+        if estimate is None or estimate < self.admin_view.estimate_count_threshold:
+            return queryset.count(), False
+        return estimate, True
+
+
+def _postgresql_estimate(queryset, connection, cursor):
+    if not queryset.query.where and not queryset.query.distinct:
+        cursor.execute("SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                       [queryset.model._meta.db_table])
+    else:
+        sql, params = queryset.order_by().query.sql_with_params()
+        cursor.execute('EXPLAIN %s' % sql, params)
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    if isinstance(row[0], (int, float)):
+        # reltuples is -1 until the table has been analyzed
+        return int(row[0]) if row[0] >= 0 else None
+    match = EXPLAIN_ROWS_RE.search(row[0])
+    return int(match.group(1)) if match else None
+
+
+def _sqlite_estimate(queryset, connection, cursor):
+    # SQLite has no planner row estimates, only whole tables can be guessed.
+    if queryset.query.where or queryset.query.distinct:
+        return None
+    table = queryset.model._meta.db_table
+    try:
+        # Written by ANALYZE, one row per index of the table or a single one
+        # without index, the first number of any of them is the row count
+        cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+        row = cursor.fetchone()
+        if row:
+            return int(row[0].split()[0])
+    except DatabaseError:
+        pass
+    pk = queryset.model._meta.pk
+    if pk.get_internal_type() not in ('AutoField', 'BigAutoField'):
+        return None
+    column = connection.ops.quote_name(pk.column)
+    cursor.execute('SELECT MAX(%s) - MIN(%s) + 1 FROM %s' % (
+        column, column, connection.ops.quote_name(table)))
+    row = cursor.fetchone()
+    return row[0] if row and row[0] is not None else None
+
+
+ESTIMATORS = {
+    'postgresql': _postgresql_estimate,
+    'sqlite': _sqlite_estimate,
+}
+
+
+def estimate_count(queryset):
+    """
+    Return the planner row estimate of ``queryset``, or None if the database
+    backend can't tell.
+    """
+    connection = connections[queryset.db]
+    estimator = ESTIMATORS.get(connection.vendor)
+    if estimator is None:
+        return None
+    cursor = connection.cursor()
+    try:
+        return estimator(queryset, connection, cursor)
+    finally:
+        cursor.close()
@@ -0,0 +1,153 @@
+"""
+Fewer points for the chart series, keeping their shape.
+
+``ChartsView`` downsamples the series of the charts with a ``downsample``
+option to about one point per pixel of the chart::
+
+    data_charts = {
+        'load': {'title': 'Load', 'x-field': 'time', 'y-field': ('load',),
+                 'downsample': 'lttb'},
+    }
+
+The series are cut in as many buckets of consecutive points as the chart
+is wide, then
+
+* ``lttb``, largest triangle three buckets, keeps the point of each bucket
+  making the largest triangle with the point kept before it and the average
+  of the next bucket. It keeps the overall shape.
+* ``minmax`` keeps the lowest and the highest point of each bucket, so no
+  peak is lost, with up to twice as many points. The first and the last
+  points are kept as well.
+
+Both use NumPy when it is installed, and pure Python otherwise.
+"""
+import calendar
+import datetime
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def to_number(value):
+    """
+    Number of an x or y value, the timestamp of the dates, in milliseconds
+    like the chart data.
+    """
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return calendar.timegm(value.timetuple()) * 1000
+    return float(value)
+
+
+def bucket_bounds(count, buckets):
+    # Bounds of ``buckets`` buckets of about the same size over count points
+    size = float(count) / buckets
+    return [int(i * size) for i in range(buckets)] + [count]
+
+
+def lttb_python(xs, ys, buckets):
+    count = len(xs)
+    # The first and the last points are always kept, in their own buckets
+    bounds = [b + 1 for b in bucket_bounds(count - 2, buckets - 2)] + [count]
+    indexes = [0]
+    a = 0
+    for i in range(buckets - 2):
+        start, end, next_end = bounds[i], bounds[i + 1], bounds[i + 2]
+        next_count = float(next_end - end)
+        avg_x = sum(xs[end:next_end]) / next_count
+        avg_y = sum(ys[end:next_end]) / next_count
+        ax, ay = xs[a], ys[a]
+        max_area = -1
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > max_area:
+                max_area = area
+                a = j
+        indexes.append(a)
+    indexes.append(count - 1)
+    return indexes
+
+
+def lttb_numpy(xs, ys, buckets):
+    xs = numpy.asarray(xs, dtype=float)
+    ys = numpy.asarray(ys, dtype=float)
+    count = len(xs)
+    bounds = numpy.array([b + 1 for b in bucket_bounds(count - 2, buckets - 2)] + [count])
+    # Averages of every bucket, the last point being the last bucket
+    sizes = numpy.diff(bounds)
+    avg_xs = numpy.add.reduceat(xs, bounds[:-1]) / sizes
+    avg_ys = numpy.add.reduceat(ys, bounds[:-1]) / sizes
+    indexes = [0]
+    a = 0
+    for i in range(buckets - 2):
+        start, end = bounds[i], bounds[i + 1]
+        ax, ay = xs[a], ys[a]
+        areas = numpy.abs((ax - avg_xs[i + 1]) * (ys[start:end] - ay) -
+                          (ax - xs[start:end]) * (avg_ys[i + 1] - ay))
+        a = start + int(areas.argmax())
+        indexes.append(a)
+    indexes.append(count - 1)
+    return indexes
+
+
+def minmax_python(xs, ys, buckets):
+    bounds = bucket_bounds(len(ys), buckets)
+    # The first and the last points are always kept, for the x range
+    indexes = set([0, len(ys) - 1])
+    get_y = ys.__getitem__
+    for i in range(buckets):
+        points = range(bounds[i], bounds[i + 1])
+        indexes.update((min(points, key=get_y), max(points, key=get_y)))
+    return sorted(indexes)
+
+
+def minmax_numpy(xs, ys, buckets):
+    ys = numpy.asarray(ys, dtype=float)
+    bounds = bucket_bounds(len(ys), buckets)
+    indexes = set([0, len(ys) - 1])
+    for i in range(buckets):
+        start, end = bounds[i], bounds[i + 1]
+        values = ys[start:end]
+        indexes.update((start + int(values.argmin()), start + int(values.argmax())))
+    return sorted(indexes)
+
+
+METHODS = {
+    'lttb': (lttb_python, lttb_numpy),
+    'minmax': (minmax_python, minmax_numpy),
+}
+
+
+def downsample_indexes(xs, ys, buckets, method='lttb', use_numpy=None):
+    """
+    Indexes of the points of ``xs`` and ``ys``, sorted by x, that ``method``
+    keeps, ``buckets`` being about the number of pixels.
+    """
+    if method not in METHODS:
+        raise ValueError('Unknown downsampling method %r' % method)
+    if method == 'lttb':
+        # Take the first and the last points as buckets
+        buckets = max(buckets, 3)
+    if len(xs) <= buckets:
+        return list(range(len(xs)))
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    return METHODS[method][bool(use_numpy)](xs, ys, buckets)
+
+
+def downsample(points, buckets, method='lttb'):
+    """
+    Downsample a series of ``(x, y)`` points, sorted by x. The points
+    without a y value are dropped. Series of other values than numbers and
+    dates, e.g. categories, are returned as they are.
+    """
+    if len(points) <= buckets:
+        return points
+    kept = [p for p in points if p[1] is not None]
+    try:
+        xs = [to_number(x) for x, y in kept]
+        ys = [to_number(y) for x, y in kept]
+    except (TypeError, ValueError):
+        return points
+    return [kept[i] for i in downsample_indexes(xs, ys, buckets, method)]
@@ -112,6 +112,10 @@ manager = FieldFilterManager()
 class FieldFilter(BaseFilter):
 
     lookup_formats = {}
+    # Field path the choices are grouped by when FilterPlugin counts them
+    facet_lookup = None
+    # {facet_key(value): count}, set by FilterPlugin.list_filter_facets
+    facet_counts = None
 
     def __init__(self, field, request, params, model, admin_view, field_path):
         self.field = field
@@ -147,6 +151,9 @@ class FieldFilter(BaseFilter):
     def do_filte(self, queryset):
         return queryset.filter(**self.used_params)
 
+    def facet_key(self, value):
+        return None if value is None else smart_text(value)
+
 
 class ListFieldFilter(FieldFilter):
     template = 'xadmin/filters/list.html'
@@ -154,6 +161,10 @@ class ListFieldFilter(FieldFilter):
     def get_context(self):
         context = super(ListFieldFilter, self).get_context()
         context['choices'] = list(self.choices())
+        if self.facet_counts is not None:
+            for choice in context['choices']:
+                if 'facet' in choice:
+                    choice['count'] = self.facet_counts.get(choice['facet'], 0)
         return context
 
 
@@ -165,18 +176,29 @@ class BooleanFieldListFilter(ListFieldFilter):
     def test(cls, field, request, params, model, admin_view, field_path):
         return isinstance(field, (models.BooleanField, models.NullBooleanField))
 
+    def __init__(self, field, request, params, model, admin_view, field_path):
+        super(BooleanFieldListFilter, self).__init__(
+            field, request, params, model, admin_view, field_path)
+        self.facet_lookup = field_path
+
+    def facet_key(self, value):
+        return None if value is None else smart_text(bool(value))
+
     def choices(self):
         for lookup, title in (
                 ('', _('All')),
                 ('1', _('Yes')),
                 ('0', _('No'))):
-            yield {
+            choice = {
                 'selected': self.lookup_exact_val == lookup and not self.lookup_isnull_val,
                 'query_string': self.query_string({
                 self.lookup_exact_name: lookup,
                 }, [self.lookup_isnull_name]),
                 'display': title,
             }
+            if lookup:
+                choice['facet'] = smart_text(lookup == '1')
+            yield choice
         if isinstance(self.field, models.NullBooleanField):
             yield {
                 'selected': self.lookup_isnull_val == 'True',
@@ -184,6 +206,7 @@ class BooleanFieldListFilter(ListFieldFilter):
                 self.lookup_isnull_name: 'True',
                 }, [self.lookup_exact_name]),
                 'display': _('Unknown'),
+                'facet': None,
             }
 
 
@@ -195,6 +218,11 @@ class ChoicesFieldListFilter(ListFieldFilter):
     def test(cls, field, request, params, model, admin_view, field_path):
         return bool(field.choices)
 
+    def __init__(self, field, request, params, model, admin_view, field_path):
+        super(ChoicesFieldListFilter, self).__init__(
+            field, request, params, model, admin_view, field_path)
+        self.facet_lookup = field_path
+
     def choices(self):
         yield {
             'selected': self.lookup_exact_val is '',
@@ -206,6 +234,7 @@ class ChoicesFieldListFilter(ListFieldFilter):
                 'selected': smart_text(lookup) == self.lookup_exact_val,
                 'query_string': self.query_string({self.lookup_exact_name: lookup}),
                 'display': title,
+                'facet': self.facet_key(lookup),
             }
 
 
@@ -220,12 +249,11 @@ class TextFieldListFilter(FieldFilter):
 
     def do_filte(self, queryset):
         if 'django.contrib.postgres' in settings.INSTALLED_APPS:
-            param_keys = list(self.used_params.keys())
-            for key in param_keys:
+            params = {}
+            for key, value in self.used_params.items():
                 k = key.rfind("__")
-                new_key = key[:k] + "__unaccent" + key[k:]
-                self.used_params[new_key] = self.used_params[key]
-                del(self.used_params[key])
+                params[key[:k] + "__unaccent" + key[k:]] = value
+            return queryset.filter(**params)
         return super(TextFieldListFilter, self).do_filte(queryset)
 
 
@@ -435,6 +463,7 @@ class RelatedFieldListFilter(ListFieldFilter):
         self.lookup_choices = field.get_choices(include_blank=False)
         super(RelatedFieldListFilter, self).__init__(
             field, request, params, model, model_admin, field_path)
+        self.facet_lookup = field_path
 
         if hasattr(field, 'verbose_name'):
             self.lookup_title = field.verbose_name
@@ -468,6 +497,7 @@ class RelatedFieldListFilter(ListFieldFilter):
                     self.lookup_exact_name: pk_val,
                 }, [self.lookup_isnull_name]),
                 'display': val,
+                'facet': self.facet_key(pk_val),
             }
         if (isinstance(self.field, ForeignObjectRel)
                 and self.field.field.null or hasattr(self.field, 'rel')
@@ -478,6 +508,7 @@ class RelatedFieldListFilter(ListFieldFilter):
                     self.lookup_isnull_name: 'True',
                 }, [self.lookup_exact_name]),
                 'display': EMPTY_CHANGELIST_VALUE,
+                'facet': None,
             }
 
 @manager.register
@@ -510,6 +541,7 @@ class MultiSelectFieldListFilter(ListFieldFilter):
 
     def __init__(self, field, request, params, model, model_admin, field_path,field_order_by=None,field_limit=None,sort_key=None,cache_config=None):
         super(MultiSelectFieldListFilter,self).__init__(field, request, params, model, model_admin, field_path)
+        self.facet_lookup = field_path
 
         # Check for it in the cachce
         if cache_config is not None and type(cache_config)==dict:
@@ -553,6 +585,7 @@ class MultiSelectFieldListFilter(ListFieldFilter):
                 'query_string': self.query_string({self.lookup_in_name: ",".join([val]+self.lookup_in_val),}),
                 'remove_query_string': self.query_string({self.lookup_in_name: ",".join([v for v in self.lookup_in_val if v != val]),}),
                 'display': val,
+                'facet': self.facet_key(val),
             }
 
 @manager.register
@@ -578,6 +611,7 @@ class AllValuesFieldListFilter(ListFieldFilter):
                                .values_list(field.name, flat=True))
         super(AllValuesFieldListFilter, self).__init__(
             field, request, params, model, admin_view, field_path)
+        self.facet_lookup = field_path
 
     def choices(self):
         yield {
@@ -596,6 +630,7 @@ class AllValuesFieldListFilter(ListFieldFilter):
                 'query_string': self.query_string({self.lookup_exact_name: val},
                                                   [self.lookup_isnull_name]),
                 'display': val,
+                'facet': val,
             }
         if include_none:
             yield {
@@ -603,4 +638,5 @@ class AllValuesFieldListFilter(ListFieldFilter):
                 'query_string': self.query_string({self.lookup_isnull_name: 'True'},
                                                   [self.lookup_exact_name]),
                 'display': EMPTY_CHANGELIST_VALUE,
+                'facet': None,
             }
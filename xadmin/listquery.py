@@ -0,0 +1,114 @@
+"""
+Where the list views remember the last list query string.
+
+After saving an object, the edit views redirect to the list with the
+filters, search and ordering the user left it with.
+``ModelAdminView.list_query_store`` chooses where that query string is kept:
+
+* ``SessionListQuery``, the default: in the session.
+* ``CookieListQuery``: in a signed cookie, so nothing is written server side.
+* ``CacheListQuery``: in the cache, one entry per user.
+
+Each of them only writes when the query changes, so paging through a list
+or reloading it doesn't write anything.
+"""
+from django.core.cache import cache
+
+from xadmin.util import json
+
+LIST_QUERY_KEY = 'LIST_QUERY'
+
+
+class BaseListQuery(object):
+
+    def __init__(self, admin_view):
+        self.admin_view = admin_view
+        self.request = admin_view.request
+
+    def load(self):
+        """
+        Return the stored ``[app_label, model_name, query_string]`` list.
+        """
+        raise NotImplementedError
+
+    def store(self, value):
+        raise NotImplementedError
+
+    def _load(self):
+        value = self.load()
+        if isinstance(value, (list, tuple)) and len(value) == 3:
+            return list(value)
+        return None
+
+    def get(self):
+        """
+        Return the last list query string of the model, or None if the last
+        list seen was another model's.
+        """
+        value = self._load()
+        if value is not None and value[:2] == list(self.admin_view.model_info):
+            return value[2]
+        return None
+
+    def save(self, query_string):
+        value = list(self.admin_view.model_info) + [query_string]
+        if self._load() != value:
+            self.store(value)
+
+    def process_response(self, response):
+        return response
+
+
+class SessionListQuery(BaseListQuery):
+
+    def load(self):
+        return self.request.session.get(LIST_QUERY_KEY)
+
+    def store(self, value):
+        self.request.session[LIST_QUERY_KEY] = value
+
+
+class CookieListQuery(BaseListQuery):
+
+    cookie_name = 'xadmin_list_query'
+    salt = 'xadmin.listquery'
+    # Longer query strings are not remembered, cookies are sent with every
+    # request to the admin.
+    max_length = 2048
+
+    pending = None
+
+    def load(self):
+        if self.pending is not None:
+            return self.pending
+        value = self.request.get_signed_cookie(self.cookie_name, default=None, salt=self.salt)
+        try:
+            return json.loads(value) if value else None
+        except ValueError:
+            return None
+
+    def store(self, value):
+        self.pending = value
+
+    def process_response(self, response):
+        if self.pending is not None:
+            value = json.dumps(self.pending)
+            if len(value) <= self.max_length:
+                response.set_signed_cookie(
+                    self.cookie_name, value, salt=self.salt, httponly=True,
+                    path=self.admin_view.get_admin_url('index'))
+        return response
+
+
+class CacheListQuery(BaseListQuery):
+
+    timeout = 24 * 60 * 60
+
+    def get_cache_key(self):
+        return 'xadmin_list_query_%s' % self.request.user.pk
+
+    def load(self):
+        return cache.get(self.get_cache_key())
+
+    def store(self, value):
+        cache.set(self.get_cache_key(), value, self.timeout)
@@ -0,0 +1,45 @@
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import router, DatabaseError
+
+from xadmin.search import get_search_backend
+from xadmin.sites import site
+
+
+class Command(BaseCommand):
+    help = "Build or refresh the full-text index of the admin searches using " \
+        "xadmin.search.FullTextSearch, for every such model or the given ones."
+    args = '[app_label.ModelName ...]'
+    option_list = BaseCommand.option_list + (
+        make_option('--database', action='store', dest='database', default=None,
+                    help='Database to index, the database the models are written to by default.'),
+        make_option('--clear', action='store_true', dest='clear', default=False,
+                    help='Remove the models from the index instead of indexing them.'),
+    )
+
+    def handle(self, *labels, **options):
+        backends = []
+        for model in site._registry:
+            backend = get_search_backend(model)
+            if backend is not None:
+                backends.append(('%s.%s' % (model._meta.app_label, model._meta.object_name), backend))
+
+        if labels:
+            names = dict((name.lower(), (name, backend)) for name, backend in backends)
+            try:
+                backends = [names[label.lower()] for label in labels]
+            except KeyError as e:
+                raise CommandError('%s is not searched with a full-text index.' % e.args[0])
+
+        for name, backend in backends:
+            using = options['database'] or router.db_for_write(backend.model)
+            try:
+                if options['clear']:
+                    backend.clear(using)
+                    self.stdout.write('Removed %s from the index' % name)
+                else:
+                    count = backend.rebuild(using)
+                    self.stdout.write('Indexed %d %s' % (count, name))
+            except DatabaseError as e:
+                raise CommandError('%s: %s' % (name, e))
@@ -112,6 +112,42 @@ class UserSettings(models.Model):
         verbose_name_plural = _('User Settings')
 
 
+class ExportJob(models.Model):
+    STATUS_CHOICES = (
+        ('pending', _(u'Pending')),
+        ('running', _(u'Running')),
+        ('done', _(u'Finished')),
+        ('failed', _(u'Failed')),
+    )
+
+    user = models.ForeignKey(AUTH_USER_MODEL, verbose_name=_(u"user"))
+    content_type = models.ForeignKey(ContentType)
+    export_type = models.CharField(_(u'Export Type'), max_length=16)
+    query = models.TextField(_(u'Query String'), blank=True)
+    status = models.CharField(_(u'Status'), max_length=16, choices=STATUS_CHOICES, default='pending')
+    progress = models.PositiveIntegerField(_(u'Exported Rows'), default=0)
+    total = models.PositiveIntegerField(_(u'Total Rows'), blank=True, null=True)
+    file = models.FileField(_(u'File'), upload_to='xadmin/exports', blank=True)
+    error = models.TextField(_(u'Error'), blank=True)
+    created = models.DateTimeField(_(u'Created'), auto_now_add=True)
+    finished = models.DateTimeField(_(u'Finished'), blank=True, null=True)
+
+    @property
+    def percent(self):
+        if self.status == 'done':
+            return 100
+        if not self.total:
+            return 0
+        return min(100, self.progress * 100 // self.total)
+
+    def __unicode__(self):
+        return "%s %s export" % (self.user, self.content_type)
+
+    class Meta:
+        verbose_name = _(u'Export Job')
+        verbose_name_plural = _('Export Jobs')
+
+
 class UserWidget(models.Model):
     user = models.ForeignKey(AUTH_USER_MODEL, verbose_name=_(u"user"))
     page_id = models.CharField(_(u"Page"), max_length=256)
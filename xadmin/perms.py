@@ -0,0 +1,180 @@
+"""
+Cached permission sets.
+
+``get_user_perms(user)`` returns the ``app_label.codename`` permissions of
+a user as a frozenset. The set is kept in the cache under the user id and a
+version counter. The counter is bumped when permissions are granted or
+revoked, directly or through groups, so a stale set is never read. Call
+``bump_perms_version()`` after changing permissions some other way, e.g.
+with raw SQL.
+
+``user_has_perm(user, perm)`` answers like ``user.has_perm(perm)`` for the
+authentication backends that list the permissions they grant. It falls back
+to ``has_perm()`` when a backend doesn't.
+
+Admin views and plugins ask ``PermissionOracle`` instead, one per request,
+see ``get_perm_oracle()``. It answers from the permission set in memory and
+runs the object level predicates plugins register once per object and
+permission::
+
+    class OwnerPlugin(BaseAdminPlugin):
+
+        def init_request(self, *args, **kwargs):
+            self.admin_view.perm_oracle.add_object_predicate(
+                lambda user, obj: obj.owner_id == user.pk,
+                'blog.change_post')
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+PERMS_VERSION_KEY = 'xadmin_perms_version'
+
+
+def get_perms_version():
+    version = cache.get(PERMS_VERSION_KEY)
+    if version is None:
+        cache.add(PERMS_VERSION_KEY, 1, None)
+        version = cache.get(PERMS_VERSION_KEY, 1)
+    return version
+
+
+def bump_perms_version():
+    try:
+        cache.incr(PERMS_VERSION_KEY)
+    except ValueError:
+        cache.add(PERMS_VERSION_KEY, 1, None)
+
+
+_perm_sets_supported = {}
+
+
+def perm_sets_supported():
+    backends = tuple(settings.AUTHENTICATION_BACKENDS)
+    if backends not in _perm_sets_supported:
+        from django.contrib.auth import get_backends
+        _perm_sets_supported[backends] = all(
+            hasattr(backend, 'get_all_permissions') for backend in get_backends())
+    return _perm_sets_supported[backends]
+
+
+def get_user_perms(user):
+    """
+    Return the permissions of ``user``, read once per user object.
+    """
+    perms = getattr(user, '_xadmin_perms', None)
+    if perms is None:
+        key = 'xadmin_perms_%s_%s' % (user.pk, get_perms_version())
+        perms = cache.get(key)
+        if perms is None:
+            perms = frozenset(user.get_all_permissions())
+            cache.set(key, perms, getattr(settings, 'XADMIN_PERMS_CACHE_TIMEOUT', 300))
+        user._xadmin_perms = perms
+    return perms
+
+
+def user_has_perm(user, perm):
+    if not user.is_active:
+        return False
+    if user.is_superuser:
+        return True
+    if user.pk is None or not perm_sets_supported():
+        return user.has_perm(perm)
+    return perm in get_user_perms(user)
+
+
+class PermissionOracle(object):
+
+    def __init__(self, user):
+        self.user = user
+        self._perms = None
+        # perm -> has_perm() result, when the backends can't list permissions
+        self._checked = {}
+        # (predicate, perm or None for every permission)
+        self._predicates = []
+        # (app_label, model_name, pk, perm) -> result
+        self._object_perms = {}
+
+    @property
+    def perms(self):
+        """
+        The ``app_label.codename`` permissions of the user, a frozenset.
+        """
+        if self._perms is None:
+            self._perms = get_user_perms(self.user) if self.user.pk is not None else frozenset()
+        return self._perms
+
+    def has_perm(self, perm, obj=None):
+        if obj is not None:
+            return self.has_object_perm(perm, obj)
+        if not self.user.is_active:
+            return False
+        if self.user.is_superuser:
+            return True
+        if self.user.pk is None or not perm_sets_supported():
+            if perm not in self._checked:
+                self._checked[perm] = self.user.has_perm(perm)
+            return self._checked[perm]
+        return perm in self.perms
+
+    def has_object_perm(self, perm, obj):
+        """
+        Return whether the user has ``perm`` and every object predicate
+        registered for it accepts ``obj``.
+        """
+        opts = obj._meta.concrete_model._meta
+        key = (opts.app_label, opts.model_name, obj.pk, perm)
+        if key not in self._object_perms:
+            self._object_perms[key] = self.has_perm(perm) and all(
+                predicate(self.user, obj) for predicate, predicate_perm in self._predicates
+                if predicate_perm is None or predicate_perm == perm)
+        return self._object_perms[key]
+
+    def add_object_predicate(self, predicate, perm=None):
+        """
+        Check ``predicate(user, obj)`` on every object level check of
+        ``perm``, or of every permission if ``perm`` is None.
+        """
+        self._predicates.append((predicate, perm))
+        self._object_perms.clear()
+
+
+def get_perm_oracle(request, user=None):
+    """
+    Return the oracle of ``user``, the request user by default, shared by
+    every admin view and plugin of ``request``.
+    """
+    if user is not None and user != request.user:
+        return PermissionOracle(user)
+    oracle = getattr(request, '_xadmin_perm_oracle', None)
+    if oracle is None or oracle.user is not request.user:
+        oracle = request._xadmin_perm_oracle = PermissionOracle(request.user)
+    return oracle
+
+
+def _perm_m2m_senders():
+    from django.contrib.auth.models import Group
+    from xadmin.util import User
+    senders = set([Group.permissions.through])
+    for name in ('groups', 'user_permissions'):
+        field = getattr(User, name, None)
+        if field is not None:
+            senders.add(field.through)
+    return senders
+
+
+def _m2m_changed(sender, **kwargs):
+    if sender in _perm_m2m_senders():
+        bump_perms_version()
+
+
+def _model_changed(sender, **kwargs):
+    # Deleting a group or a permission removes its links without m2m_changed
+    from django.contrib.auth.models import Group, Permission
+    if issubclass(sender, (Group, Permission)):
+        bump_perms_version()
+
+
+m2m_changed.connect(_m2m_changed, dispatch_uid='xadmin_perms_m2m_changed')
+post_save.connect(_model_changed, dispatch_uid='xadmin_perms_post_save')
+post_delete.connect(_model_changed, dispatch_uid='xadmin_perms_post_delete')
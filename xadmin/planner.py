@@ -0,0 +1,164 @@
+"""
+Query planning for the list view.
+
+``QueryPlan`` collects the relations the list columns will touch and turns
+them into ``select_related`` (forward foreign keys and one to one relations,
+joined into the main query) and ``prefetch_related`` (many to many and
+reverse foreign keys, one extra query per relation) calls, so rendering a
+page doesn't issue one query per row.
+
+It also collects the concrete fields the columns read, so the rows of the
+page can be loaded with ``only()``. Columns that aren't model fields must
+declare what they read with an ``admin_fields`` attribute, the same way
+``admin_order_field`` is declared::
+
+    def price_with_tax(self, obj):
+        return obj.price * (1 + obj.tax_rate)
+    price_with_tax.admin_fields = ('price', 'tax_rate')
+
+A single column without it keeps the full rows.
+"""
+import logging
+
+from django.db import models
+from django.db.models.constants import LOOKUP_SEP
+
+logger = logging.getLogger('xadmin.planner')
+
+
+class QueryPlan(object):
+
+    def __init__(self, model):
+        self.model = model
+        self.select_related = []
+        self.prefetch_related = []
+        self.only = []
+        # Column preventing only(), if any
+        self.unprojected = None
+        # (column, decision) pairs, used by report()
+        self.notes = []
+
+    def add_select_related(self, path):
+        if path not in self.select_related:
+            self.select_related.append(path)
+
+    def add_prefetch_related(self, path):
+        if path not in self.prefetch_related:
+            self.prefetch_related.append(path)
+
+    def add_only(self, path):
+        if path not in self.only:
+            self.only.append(path)
+
+    def add_only_path(self, path):
+        """
+        Keep the concrete field at the start of ``path`` in the projection.
+        Related rows are loaded in full, their ``__str__`` may need any field.
+        """
+        piece = path.split(LOOKUP_SEP)[0]
+        try:
+            field, model, direct, m2m = self.model._meta.get_field_by_name(piece)
+        except models.FieldDoesNotExist:
+            return False
+        if direct and not m2m:
+            if getattr(field, 'column', None) is None:
+                # e.g. a generic foreign key, it reads fields of its own
+                return False
+            self.add_only(piece)
+        return True
+
+    def is_forward_field(self, name):
+        try:
+            field, model, direct, m2m = self.model._meta.get_field_by_name(name)
+        except models.FieldDoesNotExist:
+            return False
+        return direct and not m2m
+
+    def disable_projection(self, column):
+        if self.unprojected is None:
+            self.unprojected = column
+        self.note(column, 'no admin_fields, rows are not projected')
+
+    def note(self, column, decision):
+        self.notes.append((column, decision))
+
+    def add_path(self, path, column=None):
+        """
+        Plan the fields and relations read by a ``rel__field`` style ``path``.
+        Return False if ``path`` doesn't start with a field of the model.
+        """
+        column = column or path
+        if not self.add_only_path(path):
+            return False
+        opts = self.model._meta
+        selected = []
+        for piece in path.split(LOOKUP_SEP):
+            try:
+                field, model, direct, m2m = opts.get_field_by_name(piece)
+            except models.FieldDoesNotExist:
+                break
+            if direct and not m2m and getattr(field, 'rel', None) is not None:
+                # Forward foreign key or one to one: join it.
+                selected.append(piece)
+                opts = field.rel.to._meta
+            elif not direct and not m2m and isinstance(field.field, models.OneToOneField):
+                # Reverse one to one: join it.
+                selected.append(piece)
+                opts = field.field.model._meta
+            elif m2m or not direct:
+                # Many to many or reverse foreign key: the rows can't be
+                # joined, fetch them for the whole page in one query.
+                lookup = LOOKUP_SEP.join(selected + [piece])
+                if selected:
+                    self.add_select_related(LOOKUP_SEP.join(selected))
+                self.add_prefetch_related(lookup)
+                self.note(column, 'prefetch_related(%r)' % lookup)
+                return True
+            else:
+                break
+        if selected:
+            lookup = LOOKUP_SEP.join(selected)
+            self.add_select_related(lookup)
+            self.note(column, 'select_related(%r)' % lookup)
+        else:
+            self.note(column, 'no relation')
+        return True
+
+    def apply(self, queryset, select_related=True):
+        if select_related and self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        return queryset
+
+    def project(self, queryset):
+        """
+        Restrict ``queryset`` to the planned fields, when every column told
+        which fields it reads.
+        """
+        if self.only and self.unprojected is None:
+            only = list(self.only)
+            # The foreign keys queryset() joined itself can't be deferred
+            if isinstance(queryset.query.select_related, dict):
+                for name in queryset.query.select_related:
+                    if name not in only and self.is_forward_field(name):
+                        only.append(name)
+            queryset = queryset.only(*only)
+        return queryset
+
+    def report(self):
+        """
+        Return a readable description of the plan, one line per decision.
+        """
+        lines = ['Query plan for %s.%s:' % (self.model._meta.app_label, self.model._meta.model_name)]
+        lines.extend(['  %s: %s' % note for note in self.notes])
+        lines.append('  select_related: %s' % (', '.join(self.select_related) or '-'))
+        lines.append('  prefetch_related: %s' % (', '.join(self.prefetch_related) or '-'))
+        if self.unprojected is None:
+            lines.append('  only: %s' % (', '.join(self.only) or '-'))
+        else:
+            lines.append('  only: - (%s)' % self.unprojected)
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return self.report()
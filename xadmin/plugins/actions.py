@@ -30,6 +30,7 @@ action_checkbox.short_description = mark_safe(
 action_checkbox.allow_tags = True
 action_checkbox.allow_export = False
 action_checkbox.is_column = False
+action_checkbox.admin_fields = ()
 
 
 class BaseActionView(ModelAdminView):
@@ -146,14 +147,18 @@ class ActionPlugin(BaseAdminPlugin):
         return list_display_links
 
     def get_context(self, context):
-        if self.actions and self.admin_view.result_count:
+        if self.actions and self.admin_view.result_count != 0:
             av = self.admin_view
-            selection_note_all = ungettext('%(total_count)s selected',
-                                           'All %(total_count)s selected', av.result_count)
+            if av.result_count is None:
+                # Keyset pagination doesn't count the rows.
+                selection_note_all = _('All selected')
+            else:
+                selection_note_all = ungettext('%(total_count)s selected',
+                                               'All %(total_count)s selected', av.result_count) % {'total_count': av.result_count}
 
             new_context = {
                 'selection_note': _('0 of %(cnt)s selected') % {'cnt': len(av.result_list)},
-                'selection_note_all': selection_note_all % {'total_count': av.result_count},
+                'selection_note_all': selection_note_all,
                 'action_choices': self.get_action_choices(),
                 'actions_selection_counter': self.actions_selection_counter,
             }
@@ -276,13 +281,13 @@ class ActionPlugin(BaseAdminPlugin):
 
     # Media
     def get_media(self, media):
-        if self.actions and self.admin_view.result_count:
+        if self.actions and self.admin_view.result_count != 0:
             media = media + self.vendor('xadmin.plugin.actions.js', 'xadmin.plugins.css')
         return media
 
     # Block Views
     def block_results_bottom(self, context, nodes):
-        if self.actions and self.admin_view.result_count:
+        if self.actions and self.admin_view.result_count != 0:
             nodes.append(loader.render_to_string('xadmin/blocks/model_list.results_bottom.actions.html', context_instance=context))
 
 
@@ -1,6 +1,7 @@
 from django.db.models import FieldDoesNotExist, Avg, Max, Min, Count, Sum
 from django.utils.translation import ugettext as _
 
+from xadmin import resultcache
 from xadmin.sites import site
 from xadmin.views import BaseAdminPlugin, ListAdminView
 
@@ -18,6 +19,8 @@ AGGREGATE_TITLE = {
 class AggregationPlugin(BaseAdminPlugin):
 
     aggregate_fields = {}
+    # Seconds the aggregates are cached, see xadmin.resultcache
+    result_cache_timeout = None
 
     def init_request(self, *args, **kwargs):
         return bool(self.aggregate_fields)
@@ -43,10 +46,18 @@ class AggregationPlugin(BaseAdminPlugin):
 
         return item
 
-    def _get_aggregate_row(self):
+    def _get_aggregate(self):
         queryset = self.admin_view.list_queryset._clone()
-        obj = queryset.aggregate(*[AGGREGATE_METHODS[method](field_name) for field_name, method in
-                                   self.aggregate_fields.items() if method in AGGREGATE_METHODS])
+        return queryset.aggregate(*[AGGREGATE_METHODS[method](field_name) for field_name, method in
+                                    self.aggregate_fields.items() if method in AGGREGATE_METHODS])
+
+    def _get_aggregate_row(self):
+        if self.result_cache_timeout is None:
+            obj = self._get_aggregate()
+        else:
+            obj = resultcache.get_cached_result(
+                self.admin_view, 'aggregate', repr(sorted(self.aggregate_fields.items())),
+                self._get_aggregate, self.result_cache_timeout)
 
         row = ResultRow()
         row['is_display_first'] = False
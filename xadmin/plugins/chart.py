@@ -12,16 +12,43 @@ if sys.version_info.major < 3:
    from django.utils.encoding import smart_unicode as smart_text
 else:
    from django.utils.encoding import smart_text
-from xadmin.util import lookup_field, label_for_field, force_text, json
-
-from django.db import models
+from xadmin.util import lookup_field, label_for_field, display_for_field, force_text, json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, models
+from django.db.models import Count, Max, Min, Sum
+from django.utils import timezone
+from django.utils.datastructures import SortedDict
+from django.utils.dateparse import parse_date, parse_datetime
 from django.utils.http import urlencode
 from django.utils.translation import ugettext_lazy as _, ugettext
 
+from xadmin import resultcache
+from xadmin.downsample import downsample
 from xadmin.sites import site
 from xadmin.views import BaseAdminPlugin, ListAdminView
 from xadmin.views.dashboard import ModelBaseWidget, widget_manager
 
+# Width of the chart in pixels, sent by xadmin.plugin.charts.js
+CHART_WIDTH_VAR = '_width'
+
+DATE_BUCKETS = ('year', 'month', 'week', 'day', 'hour')
+
+# Aggregates of the buckets, averages are computed from a sum and a count
+BUCKET_AGGREGATES = {
+    'sum': Sum, 'count': Count, 'min': Min, 'max': Max,
+}
+# Merge the aggregates of two rows of the same bucket, e.g. the days of a
+# week
+MERGE_AGGREGATES = {
+    'sum': lambda a, b: a + b,
+    'count': lambda a, b: a + b,
+    'avg': lambda a, b: a + b,
+    'min': min,
+    'max': max,
+}
+
 
 @widget_manager.register
 class ChartWidget(ModelBaseWidget):
@@ -107,8 +134,43 @@ class ChartsPlugin(BaseAdminPlugin):
 
 
 class ChartsView(ListAdminView):
+    """
+    JSON data of a chart of ``data_charts``. Without a ``bucket``, a chart
+    has a point per object of the page. With one, the y-fields are
+    aggregated by bucket of the x-field over every filtered object::
+
+        data_charts = {
+            'sales': {'title': 'Sales', 'x-field': 'date', 'y-field': ('total', 'id'),
+                      # 'hour', 'day', 'week', 'month', 'year', the width of
+                      # numeric bins, e.g. 100, or 'category'
+                      'bucket': 'week',
+                      # 'sum' (default), 'count', 'avg', 'min' or 'max', or
+                      # one of them per y-field
+                      'aggregate': {'total': 'sum', 'id': 'count'}},
+        }
+
+    Bucketed x-fields are fields of the model, related fields only work
+    as categories.
+
+    With a ``downsample`` method, ``'lttb'`` or ``'minmax'``, the series
+    are cut down to about one point per pixel, see ``xadmin.downsample``.
+
+    Bucketed charts are cached with ``result_cache_timeout``, incrementally
+    with ``'incremental': True``, see ``xadmin.resultcache``.
+    """
 
     data_charts = {}
+    # Chart fields aren't list columns, keep the full rows
+    list_projection = False
+    # Downsampling width when the request doesn't tell it, and its maximum
+    chart_width = 800
+    max_chart_width = 4000
+    # Seconds the bucketed chart data is cached, see xadmin.resultcache
+    result_cache_timeout = None
+
+    def save_list_query(self):
+        # Asked by the list page, the list query is the page's
+        pass
 
     def get_ordering(self):
         if 'order' in self.chart:
@@ -120,6 +182,7 @@ class ChartsView(ListAdminView):
         if name not in self.data_charts:
             return HttpResponseNotFound()
 
+        self.chart_name = name
         self.chart = self.data_charts[name]
 
         self.x_field = self.chart['x-field']
@@ -130,13 +193,24 @@ class ChartsView(ListAdminView):
         datas = [{"data":[], "label": force_text(label_for_field(
             i, self.model, model_admin=self))} for i in self.y_fields]
 
-        self.make_result_list()
+        bucket = self.chart.get('bucket')
+        if bucket is not None:
+            for i, points in enumerate(self.get_bucket_series(bucket)):
+                datas[i]["data"] = points
+        else:
+            self.make_result_list()
+
+            for obj in self.result_list:
+                xf, attrs, value = lookup_field(self.x_field, obj, self)
+                for i, yfname in enumerate(self.y_fields):
+                    yf, yattrs, yv = lookup_field(yfname, obj, self)
+                    datas[i]["data"].append((value, yv))
 
-        for obj in self.result_list:
-            xf, attrs, value = lookup_field(self.x_field, obj, self)
-            for i, yfname in enumerate(self.y_fields):
-                yf, yattrs, yv = lookup_field(yfname, obj, self)
-                datas[i]["data"].append((value, yv))
+        method = self.chart.get('downsample')
+        if method and bucket != 'category':
+            width = self.get_chart_width()
+            for data in datas:
+                data["data"] = downsample(data["data"], width, method)
 
         option = {'series': {'lines': {'show': True}, 'points': {'show': False}},
                   'grid': {'hoverable': True, 'clickable': True}}
@@ -152,6 +226,8 @@ class ChartsView(ListAdminView):
                     option['xaxis']['timeformat'] = "%y/%m/%d %H:%M:%S"
         except Exception:
             pass
+        if bucket == 'category':
+            option['xaxis'] = {'mode': 'categories'}
 
         option.update(self.chart.get('option', {}))
 
@@ -160,5 +236,161 @@ class ChartsView(ListAdminView):
 
         return HttpResponse(result)
 
+    def get_chart_width(self):
+        try:
+            width = int(self.request.GET.get(CHART_WIDTH_VAR))
+        except (TypeError, ValueError):
+            width = 0
+        if width <= 0:
+            return self.chart_width
+        return min(width, self.max_chart_width)
+
+    def get_aggregates(self):
+        aggregates = self.chart.get('aggregate', 'sum')
+        if isinstance(aggregates, dict):
+            return [aggregates.get(name, 'sum') for name in self.y_fields]
+        return [aggregates] * len(self.y_fields)
+
+    def get_bucket_sql(self, bucket, connection):
+        """
+        SQL and parameters of the bucket of the x-field, a truncated date or
+        the index of a numeric bin.
+        """
+        field = self.opts.get_field(self.x_field)
+        column = '%s.%s' % (connection.ops.quote_name(self.opts.db_table),
+                            connection.ops.quote_name(field.column))
+        if bucket in DATE_BUCKETS:
+            # Weeks are merged from days, the databases don't agree on them
+            lookup = 'day' if bucket == 'week' else bucket
+            if isinstance(field, models.DateTimeField):
+                tzname = timezone.get_current_timezone_name() if settings.USE_TZ else None
+                return connection.ops.datetime_trunc_sql(lookup, column, tzname)
+            return connection.ops.date_trunc_sql(lookup, column), []
+        size = float(bucket)
+        if connection.vendor == 'sqlite':
+            # No FLOOR(), CAST() truncates towards zero
+            value = '(%s / %%s)' % column
+            return 'CAST(%s AS INTEGER) - (%s < CAST(%s AS INTEGER))' % (value, value, value), \
+                [size, size, size]
+        return 'FLOOR(%s / %%s)' % column, [size]
+
+    def get_bucket_value(self, bucket, value):
+        if bucket == 'category':
+            return value
+        if bucket in DATE_BUCKETS:
+            if not isinstance(value, datetime.date):
+                value = parse_datetime(value) or parse_date(value)
+            if bucket == 'week':
+                value -= datetime.timedelta(days=value.weekday())
+            return value
+        # Index of the bin
+        return int(value) * bucket
+
+    def get_buckets(self, bucket, queryset):
+        """
+        Aggregates of every y-field by bucket of the x-field of the objects
+        of ``queryset``, with a single grouped query.
+
+        ``bucket`` is one of ``DATE_BUCKETS``, a number, the width of numeric
+        bins, or ``'category'``, a bucket by value.
+        """
+        if bucket == 'category':
+            x_name = self.x_field
+        else:
+            x_name = '_chart_x'
+            sql, params = self.get_bucket_sql(bucket, connections[queryset.db])
+            queryset = queryset.extra(select={x_name: sql}, select_params=params)
+
+        aggregates = self.get_aggregates()
+        annotations = {}
+        for i, (name, method) in enumerate(zip(self.y_fields, aggregates)):
+            if method == 'avg':
+                annotations['_chart_y%d' % i] = Sum(name)
+                annotations['_chart_n%d' % i] = Count(name)
+            else:
+                annotations['_chart_y%d' % i] = BUCKET_AGGREGATES[method](name)
+        rows = queryset.values(x_name).annotate(**annotations).order_by(x_name)
+
+        # bucket -> [(aggregate, count of the averages)] of every y-field
+        buckets = SortedDict()
+        for row in rows:
+            if row[x_name] is None:
+                continue
+            x = self.get_bucket_value(bucket, row[x_name])
+            values = [(row['_chart_y%d' % i], row.get('_chart_n%d' % i))
+                      for i in range(len(self.y_fields))]
+            if x not in buckets:
+                buckets[x] = values
+                continue
+            merged = []
+            for method, (a, a_count), (b, b_count) in zip(aggregates, buckets[x], values):
+                if a is not None and b is not None:
+                    a = MERGE_AGGREGATES[method](a, b)
+                merged.append((b if a is None else a, (a_count or 0) + (b_count or 0)))
+            buckets[x] = merged
+        return buckets
+
+    def get_cached_buckets(self, bucket, queryset):
+        """
+        ``get_buckets()`` through the result cache. After objects were added,
+        the incremental charts only aggregate again their last bucket and
+        the new ones.
+        """
+        key = resultcache.get_result_key(self, 'chart', self.chart_name, (CHART_WIDTH_VAR,))
+        state = resultcache.get_state(self.model)
+        entry = cache.get(key)
+        if entry is not None and entry[0] == state:
+            return entry[1]
+
+        if entry is not None and entry[0][0] == state[0] and entry[1] and \
+                self.chart.get('incremental') and bucket != 'category':
+            buckets = entry[1]
+            watermark = list(buckets.keys())[-1]
+            del buckets[watermark]
+            if isinstance(watermark, datetime.datetime) and settings.USE_TZ:
+                watermark = timezone.make_aware(watermark, timezone.get_current_timezone())
+            buckets.update(self.get_buckets(
+                bucket, queryset.filter(**{'%s__gte' % self.x_field: watermark})))
+        else:
+            buckets = self.get_buckets(bucket, queryset)
+        cache.set(key, (state, buckets), self.result_cache_timeout)
+        return buckets
+
+    def get_bucket_series(self, bucket):
+        """
+        Points of every y-field, aggregated by bucket of the x-field over all
+        the filtered objects.
+        """
+        queryset = self.get_list_queryset().order_by()
+        if self.result_cache_timeout is None:
+            buckets = self.get_buckets(bucket, queryset)
+        else:
+            buckets = self.get_cached_buckets(bucket, queryset)
+        aggregates = self.get_aggregates()
+
+        if bucket == 'category':
+            field = self.opts.get_field(self.x_field) if '__' not in self.x_field else None
+            labels = [force_text(display_for_field(x, field)) if field else force_text(x)
+                      for x in buckets.keys()]
+        else:
+            labels = list(buckets.keys())
+
+        series = []
+        for i, method in enumerate(aggregates):
+            points = []
+            for x, values in zip(labels, buckets.values()):
+                y, count = values[i]
+                if method == 'avg':
+                    if not count:
+                        y = None
+                    elif not isinstance(y, decimal.Decimal):
+                        # No integer division of integer sums on Python 2
+                        y = float(y) / count
+                    else:
+                        y = y / count
+                points.append((x, y))
+            series.append(points)
+        return series
+
 site.register_plugin(ChartsPlugin, ListAdminView)
 site.register_modelview(r'^chart/(.+)/$', ChartsView, name='%s_%s_chart')
@@ -1,10 +1,7 @@
-
-
 from django.utils.translation import ugettext as _
-from django.core.urlresolvers import reverse, NoReverseMatch
 from django.db import models
 
-from xadmin.sites import site
+from xadmin.sites import site, quote_url_arg
 from xadmin.views import BaseAdminPlugin, ListAdminView
 
 
@@ -13,6 +10,41 @@ class DetailsPlugin(BaseAdminPlugin):
     show_detail_fields = []
     show_all_rel_details = True
 
+    def init_request(self, *args, **kwargs):
+        # Related model -> (detail url, change url) templates, or None when
+        # the user can't view it
+        self.rel_details = {}
+        self.details_title = _(u'Details of %s')
+        for field_name in set(self.admin_view.list_display) | set(self.show_detail_fields):
+            if not hasattr(field_name, 'startswith'):
+                continue
+            try:
+                field = self.opts.get_field(field_name)
+            except models.FieldDoesNotExist:
+                continue
+            if isinstance(getattr(field, 'rel', None), models.ManyToOneRel):
+                if self.show_all_rel_details or field_name in self.show_detail_fields:
+                    self.get_rel_details(field.rel.to)
+            elif field_name in self.show_detail_fields:
+                self.get_rel_details(self.model)
+
+    def get_url_template(self, model, name):
+        opts = model._meta
+        return self.admin_site.get_url_template(
+            '%s:%s_%s_%s' % (self.admin_site.app_name, opts.app_label, opts.model_name, name), 1)
+
+    def get_rel_details(self, rel_model):
+        if rel_model not in self.rel_details:
+            details = None
+            if self.has_model_perm(rel_model, 'view'):
+                detail_url = self.get_url_template(rel_model, 'detail')
+                if detail_url:
+                    change_url = self.has_model_perm(rel_model, 'change') and \
+                        self.get_url_template(rel_model, 'change')
+                    details = (detail_url, change_url or '')
+            self.rel_details[rel_model] = details
+        return self.rel_details[rel_model]
+
     def result_item(self, item, obj, field_name, row):
         if (self.show_all_rel_details or (field_name in self.show_detail_fields)):
             rel_obj = None
@@ -22,36 +54,13 @@ class DetailsPlugin(BaseAdminPlugin):
                 rel_obj = obj
 
             if rel_obj:
-                if rel_obj.__class__ in site._registry:
-                    try:
-                        model_admin = site._registry[rel_obj.__class__]
-                        has_view_perm = model_admin(self.admin_view.request).has_view_permission(rel_obj)
-                        has_change_perm = model_admin(self.admin_view.request).has_change_permission(rel_obj)
-                    except:
-                        has_view_perm = self.admin_view.has_model_perm(rel_obj.__class__, 'view')
-                        has_change_perm = self.has_model_perm(rel_obj.__class__, 'change')
-                else:
-                    has_view_perm = self.admin_view.has_model_perm(rel_obj.__class__, 'view')
-                    has_change_perm = self.has_model_perm(rel_obj.__class__, 'change')
-
-            if rel_obj and has_view_perm:
-                opts = rel_obj._meta
-                try:
-                    item_res_uri = reverse(
-                        '%s:%s_%s_detail' % (self.admin_site.app_name,
-                                             opts.app_label, opts.model_name),
-                        args=(getattr(rel_obj, opts.pk.attname),))
-                    if item_res_uri:
-                        if has_change_perm:
-                            edit_url = reverse(
-                                '%s:%s_%s_change' % (self.admin_site.app_name, opts.app_label, opts.model_name),
-                                args=(getattr(rel_obj, opts.pk.attname),))
-                        else:
-                            edit_url = ''
-                        item.btns.append('<a data-res-uri="%s" data-edit-uri="%s" class="details-handler" rel="tooltip" title="%s"><i class="fa fa-info-circle"></i></a>'
-                                         % (item_res_uri, edit_url, _(u'Details of %s') % str(rel_obj)))
-                except NoReverseMatch:
-                    pass
+                rel_model = rel_obj._meta.proxy_for_model if rel_obj._deferred else rel_obj.__class__
+                details = self.get_rel_details(rel_model)
+                if details:
+                    detail_url, change_url = details
+                    pk = quote_url_arg(getattr(rel_obj, rel_obj._meta.pk.attname))
+                    item.btns.append('<a data-res-uri="%s" data-edit-uri="%s" class="details-handler" rel="tooltip" title="%s"><i class="fa fa-info-circle"></i></a>'
+                                     % (detail_url % pk, change_url and change_url % pk, self.details_title % str(rel_obj)))
         return item
 
     # Media
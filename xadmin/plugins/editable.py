@@ -45,6 +45,7 @@ class EditablePlugin(BaseAdminPlugin):
                                           return_attr=False
                                           )
 
+            item.editable = True
             item.wraps.insert(0, '<span class="editable-field">%s</span>')
             item.btns.append((
                 '<a class="editable-handler" title="%s" data-editable-field="%s" data-editable-loadurl="%s">' +
@@ -55,6 +56,12 @@ class EditablePlugin(BaseAdminPlugin):
                 self.editable_need_fields[field_name] = item.field
         return item
 
+    def cached_result_row(self, row, obj, cached_row):
+        for item in row.cells:
+            if getattr(item, 'editable', False) and item.field_name not in self.editable_need_fields:
+                self.editable_need_fields[item.field_name] = self.opts.get_field(item.field_name)
+        return row
+
     # Media
     def get_media(self, media):
         if self.editable_need_fields:
@@ -2,21 +2,43 @@ import sys
 if sys.version_info.major < 3:
    import StringIO
    from django.utils.encoding import force_unicode as force_text, smart_unicode as smart_text
+   from Queue import Queue
 else:
    from io import BytesIO, StringIO
    from django.utils.encoding import force_text, smart_text
+   from queue import Queue
 import datetime
-
-from django.http import HttpResponse
+import logging
+import os
+import tempfile
+import threading
+import traceback
+
+from django import forms
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.files import File
+from django.core.urlresolvers import reverse
+from django.db import connections, transaction
+from django.http import HttpResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 from django.template import loader
+from django.test.client import RequestFactory
+from django.utils.importlib import import_module
+from django.utils.timezone import now
+from django.utils.datastructures import SortedDict
 from django.utils.html import escape
 from django.utils.translation import ugettext as _
 from django.utils.xmlutils import SimplerXMLGenerator
+from django.db import models
 from django.db.models import BooleanField, NullBooleanField
+from xadmin.models import ExportJob
 from xadmin.sites import site
-from xadmin.views import BaseAdminPlugin, ListAdminView
-from xadmin.util import json
-from xadmin.views.list import ALL_VAR
+from xadmin.views import BaseAdminPlugin, BaseAdminView, ListAdminView
+from xadmin.views.dashboard import widget_manager, BaseWidget
+from xadmin.util import json, lookup_field, display_for_field, tz_localtime
+from xadmin.views.list import ALL_VAR, EMPTY_CHANGELIST_VALUE
 
 try:
     import xlwt
@@ -33,9 +55,9 @@ except:
 
 class ExportMenuPlugin(BaseAdminPlugin):
 
-    list_export = ('xlsx', 'xls', 'csv', 'xml', 'json')
+    list_export = ('xlsx', 'xls', 'csv', 'xml', 'json', 'jsonl')
     export_names = {'xlsx': 'Excel 2007', 'xls': 'Excel', 'csv': 'CSV',
-                    'xml': 'XML', 'json': 'JSON'}
+                    'xml': 'XML', 'json': 'JSON', 'jsonl': 'JSON Lines'}
 
     def init_request(self, *args, **kwargs):
         if not self.has_model_perm(self.model, 'export'):
@@ -47,7 +69,7 @@ class ExportMenuPlugin(BaseAdminPlugin):
     def block_top_toolbar(self, context, nodes):
         if self.list_export:
             context.update({
-                'show_export_all': self.admin_view.paginator.count > self.admin_view.list_per_page and not ALL_VAR in self.admin_view.request.GET,
+                'show_export_all': self.admin_view.multi_page and not ALL_VAR in self.admin_view.request.GET,
                 'form_params': self.admin_view.get_form_params({'_do_': 'export'}, ('export_type',)),
                 'export_types': [{'type': et, 'name': self.export_names[et]} for et in self.list_export],
             })
@@ -58,13 +80,22 @@ class ExportPlugin(BaseAdminPlugin):
 
     export_mimes = {'xlsx': 'application/vnd.ms-excel',
                     'xls': 'application/vnd.ms-excel', 'csv': 'text/csv',
-                    'xml': 'application/xhtml+xml', 'json': 'application/json'}
+                    'xml': 'application/xhtml+xml', 'json': 'application/json',
+                    'jsonl': 'application/x-ndjson'}
+    # These types are written row by row from the queryset, skipping the
+    # html list rendering, and streamed to the client.
+    stream_export_types = ('csv', 'xml', 'jsonl', 'xlsx')
+    # Called with the number of rows written so far, set by background jobs
+    export_progress = None
 
     def init_request(self, *args, **kwargs):
         if not self.has_model_perm(self.model, 'export'):
             return False;
         return self.request.GET.get('_do_') == 'export'
 
+    def get_export_type(self):
+        return self.request.GET.get('export_type', 'csv')
+
     def _format_value(self, o):
         value = None
         if (o.field is None and getattr(o.attr, 'boolean', False)) or \
@@ -92,46 +123,6 @@ class ExportPlugin(BaseAdminPlugin):
         new_rows.insert(0, [force_text(c.text) for c in context['result_headers'].cells if c.export])
         return new_rows
 
-    def get_xlsx_export(self, context):
-        datas = self._get_datas(context)
-        if sys.version_info.major < 3:
-            output = StringIO.StringIO()
-        else:
-            output = BytesIO()
-        export_header = (
-            self.request.GET.get('export_xlsx_header', 'off') == 'on')
-
-        model_name = self.opts.verbose_name
-        book = xlsxwriter.Workbook(output)
-        sheet = book.add_worksheet(
-            u"%s %s" % (_(u'Sheet'), force_text(model_name)))
-        styles = {'datetime': book.add_format({'num_format': 'yyyy-mm-dd hh:mm:ss'}),
-                  'date': book.add_format({'num_format': 'yyyy-mm-dd'}),
-                  'time': book.add_format({'num_format': 'hh:mm:ss'}),
-                  'header': book.add_format({'font': 'name Times New Roman', 'color': 'red', 'bold': 'on', 'num_format': '#,##0.00'}),
-                  'default': book.add_format()}
-
-        if not export_header:
-            datas = datas[1:]
-        for rowx, row in enumerate(datas):
-            for colx, value in enumerate(row):
-                if export_header and rowx == 0:
-                    cell_style = styles['header']
-                else:
-                    if isinstance(value, datetime.datetime):
-                        cell_style = styles['datetime']
-                    elif isinstance(value, datetime.date):
-                        cell_style = styles['date']
-                    elif isinstance(value, datetime.time):
-                        cell_style = styles['time']
-                    else:
-                        cell_style = styles['default']
-                sheet.write(rowx, colx, value, cell_style)
-        book.close()
-
-        output.seek(0)
-        return output.getvalue()
-
     def get_xls_export(self, context):
         datas = self._get_datas(context)
         if sys.version_info.major < 3:
@@ -230,23 +221,213 @@ class ExportPlugin(BaseAdminPlugin):
         return json.dumps({'objects': results}, ensure_ascii=False,
                           indent=(self.request.GET.get('export_json_format', 'off') == 'on') and 4 or None)
 
-    def get_response(self, response, context, *args, **kwargs):
-        file_type = self.request.GET.get('export_type', 'csv')
-        response = HttpResponse(
+    def _get_export_columns(self):
+        """
+        Return ``(field_name, header)`` for the exported list columns.
+        """
+        return [(c.field_name, force_text(c.text)) for c in
+                self.admin_view.result_headers().cells if c.export]
+
+    def _get_export_value(self, field_name, obj):
+        """
+        Same value as ``_format_value`` gives for the list cell, without
+        rendering the cell.
+        """
+        try:
+            f, attr, value = lookup_field(field_name, obj, self.admin_view)
+        except (AttributeError, ObjectDoesNotExist):
+            return escape(EMPTY_CHANGELIST_VALUE)
+        if f is None:
+            if getattr(attr, 'boolean', False):
+                return value
+            text = value
+        elif isinstance(f, (BooleanField, NullBooleanField)):
+            return value
+        elif isinstance(f.rel, models.ManyToOneRel):
+            text = EMPTY_CHANGELIST_VALUE if value is None else value
+        else:
+            text = display_for_field(value, f)
+        return escape(force_text(text))
+
+    def _get_export_field(self, field_name):
+        try:
+            return self.opts.get_field(field_name)
+        except models.FieldDoesNotExist:
+            return None
+
+    def _iter_export_objects(self):
+        av = self.admin_view
+        if isinstance(av.result_list, models.query.QuerySet):
+            objects = av.iter_result_queryset(av.result_list)
+        else:
+            objects = av.result_list
+        chunk_size = av.queryset_chunk_size
+        for i, obj in enumerate(objects):
+            yield obj
+            if self.export_progress and (i + 1) % chunk_size == 0:
+                self.export_progress(i + 1)
+
+    def _iter_export_rows(self):
+        field_names = [name for name, header in self._get_export_columns()]
+        for obj in self._iter_export_objects():
+            yield [self._get_export_value(name, obj) for name in field_names]
+
+    def stream_csv_export(self):
+        first = True
+        if self.request.GET.get('export_csv_header', 'off') == 'on':
+            yield ','.join(map(self._format_csv_text, [h for n, h in self._get_export_columns()]))
+            first = False
+        for row in self._iter_export_rows():
+            line = ','.join(map(self._format_csv_text, row))
+            yield line if first else '\r\n' + line
+            first = False
+
+    def stream_xml_export(self):
+        headers = [h for n, h in self._get_export_columns()]
+        if sys.version_info.major < 3:
+            stream = StringIO.StringIO()
+        else:
+            stream = StringIO()
+        xml = SimplerXMLGenerator(stream, "utf-8")
+
+        yield '<objects>'
+        for row in self._iter_export_rows():
+            xml.startElement("row", {})
+            self._to_xml(xml, dict(zip(headers, row)))
+            xml.endElement("row")
+            yield stream.getvalue()
+            stream.seek(0)
+            stream.truncate()
+        yield '</objects>'
+
+    def stream_jsonl_export(self):
+        headers = [h for n, h in self._get_export_columns()]
+        for row in self._iter_export_rows():
+            yield json.dumps(SortedDict(zip(headers, row)), ensure_ascii=False) + '\n'
+
+    def _get_xlsx_writer(self, sheet, styles, field_name):
+        """
+        Return ``write(rowx, colx, obj)`` for a column, its cell format is
+        chosen here once. Date and time fields are written as Excel dates,
+        other columns as their exported text.
+        """
+        field = self._get_export_field(field_name)
+        if isinstance(field, (models.DateField, models.TimeField)):
+            if isinstance(field, models.DateTimeField):
+                style = styles['datetime']
+            elif isinstance(field, models.DateField):
+                style = styles['date']
+            else:
+                style = styles['time']
+            attname = field.attname
+
+            def write(rowx, colx, obj):
+                value = getattr(obj, attname)
+                if value is None:
+                    sheet.write_blank(rowx, colx, None, style)
+                else:
+                    if getattr(value, 'tzinfo', None) is not None:
+                        value = tz_localtime(value).replace(tzinfo=None)
+                    sheet.write_datetime(rowx, colx, value, style)
+        else:
+            style = styles['default']
+
+            def write(rowx, colx, obj):
+                sheet.write(rowx, colx, self._get_export_value(field_name, obj), style)
+        return write
+
+    def stream_xlsx_export(self):
+        columns = self._get_export_columns()
+        export_header = (
+            self.request.GET.get('export_xlsx_header', 'off') == 'on')
+
+        # constant_memory flushes every finished row to a temporary file,
+        # the workbook itself is written to another one.
+        output = tempfile.TemporaryFile()
+        try:
+            book = xlsxwriter.Workbook(output, {'constant_memory': True})
+            sheet = book.add_worksheet(
+                u"%s %s" % (_(u'Sheet'), force_text(self.opts.verbose_name)))
+            styles = {'datetime': book.add_format({'num_format': 'yyyy-mm-dd hh:mm:ss'}),
+                      'date': book.add_format({'num_format': 'yyyy-mm-dd'}),
+                      'time': book.add_format({'num_format': 'hh:mm:ss'}),
+                      'header': book.add_format({'font': 'name Times New Roman', 'color': 'red', 'bold': 'on', 'num_format': '#,##0.00'}),
+                      'default': book.add_format()}
+            writers = [self._get_xlsx_writer(sheet, styles, name) for name, header in columns]
+
+            rowx = 0
+            if export_header:
+                for colx, (name, header) in enumerate(columns):
+                    sheet.write(rowx, colx, header, styles['header'])
+                rowx += 1
+            for obj in self._iter_export_objects():
+                for colx, write in enumerate(writers):
+                    write(rowx, colx, obj)
+                rowx += 1
+            book.close()
+
+            output.seek(0)
+            while True:
+                data = output.read(65536)
+                if not data:
+                    break
+                yield data
+        finally:
+            output.close()
+
+    def get_stream_response(self):
+        file_type = self.get_export_type()
+        response = StreamingHttpResponse(
+            getattr(self, 'stream_%s_export' % file_type)(),
             content_type="%s; charset=UTF-8" % self.export_mimes[file_type])
+        response['Content-Disposition'] = self.get_content_disposition(file_type)
+        return response
 
+    def get_content_disposition(self, file_type):
         file_name = self.opts.verbose_name.replace(' ', '_')
-        response['Content-Disposition'] = ('attachment; filename=%s.%s' % (
-            file_name, file_type)).encode('utf-8')
+        return ('attachment; filename=%s.%s' % (file_name, file_type)).encode('utf-8')
+
+    def get_response(self, response, context, *args, **kwargs):
+        file_type = self.get_export_type()
+        response = HttpResponse(
+            content_type="%s; charset=UTF-8" % self.export_mimes[file_type])
+        response['Content-Disposition'] = self.get_content_disposition(file_type)
 
         response.write(getattr(self, 'get_%s_export' % file_type)(context))
         return response
 
+    def start_background_export(self):
+        """
+        Save the list request as an :class:`~xadmin.models.ExportJob` and
+        hand it to the export executor, then send the user back to the list.
+        """
+        params = self.request.GET.copy()
+        params.pop('export_background', None)
+        job = ExportJob.objects.create(
+            user=self.user, content_type=ContentType.objects.get_for_model(self.model),
+            export_type=self.get_export_type(), query=params.urlencode())
+        submit = lambda: get_export_executor().submit(run_export_job, job.pk)
+        if hasattr(transaction, 'on_commit'):
+            # The job is read by another connection, after ATOMIC_REQUESTS commits
+            transaction.on_commit(submit)
+        else:
+            submit()
+
+        self.message_user(_('The export has been started. You can download it from the '
+                            'exports widget of your dashboard once it is finished.'), 'success')
+        return HttpResponseRedirect(self.admin_view.get_query_string(
+            remove=['_do_', 'export_', 'all']))
+
     # View Methods
     def get_result_list(self, __):
+        if self.request.GET.get('export_background', 'off') == 'on':
+            return self.start_background_export()
         if self.request.GET.get('all', 'off') == 'on':
             self.admin_view.list_per_page = 0
-        return __()
+        response = __()
+        if response is None and self.get_export_type() in self.stream_export_types:
+            return self.get_stream_response()
+        return response
 
     def result_header(self, item, field_name, row):
         item.export = not item.attr or field_name == '__str__' or getattr(item.attr, 'allow_export', True)
@@ -257,5 +438,142 @@ class ExportPlugin(BaseAdminPlugin):
         return item
 
 
+class ThreadExportExecutor(object):
+    """
+    Run export jobs on a few daemon threads of the current process, so no
+    broker or worker process is needed. Jobs still running when the process
+    exits are lost and stay ``running``.
+    """
+
+    def __init__(self, workers=2):
+        self.workers = workers
+        self.queue = Queue()
+        self.threads = []
+        self.lock = threading.Lock()
+
+    def _work(self):
+        while True:
+            func, args = self.queue.get()
+            try:
+                func(*args)
+            except Exception as e:
+                logging.error(e, exc_info=True)
+            finally:
+                # Each thread has its own connection, don't leave it open
+                for conn in connections.all():
+                    conn.close()
+
+    def submit(self, func, *args):
+        with self.lock:
+            self.threads = [t for t in self.threads if t.is_alive()]
+            while len(self.threads) < self.workers:
+                thread = threading.Thread(target=self._work)
+                thread.daemon = True
+                thread.start()
+                self.threads.append(thread)
+        self.queue.put((func, args))
+
+
+_export_executor = None
+
+
+def get_export_executor():
+    """
+    Return the executor running background exports: the class (or factory)
+    at the ``XADMIN_EXPORT_EXECUTOR`` setting path, or a
+    :class:`ThreadExportExecutor` by default. It only needs a
+    ``submit(func, *args)`` method.
+    """
+    global _export_executor
+    if _export_executor is None:
+        path = getattr(settings, 'XADMIN_EXPORT_EXECUTOR', None)
+        if path:
+            module, attr = path.rsplit('.', 1)
+            _export_executor = getattr(import_module(module), attr)()
+        else:
+            _export_executor = ThreadExportExecutor()
+    return _export_executor
+
+
+def run_export_job(job_id):
+    """
+    Run the list view with the saved request of the job and write its export
+    to the default storage.
+    """
+    try:
+        job = ExportJob.objects.get(pk=job_id)
+        ExportJob.objects.filter(pk=job.pk).update(status='running')
+        model = job.content_type.model_class()
+        request = RequestFactory().get('/?%s' % job.query)
+        request.user = job.user
+        request.session = {}
+        list_view = site.get_view_class(ListAdminView, site._registry[model])(request)
+
+        for plugin in list_view.plugins:
+            if isinstance(plugin, ExportPlugin):
+                plugin.export_progress = lambda n: ExportJob.objects.filter(
+                    pk=job.pk).update(progress=n)
+
+        response = list_view.get(request)
+        ExportJob.objects.filter(pk=job.pk).update(total=list_view.result_count)
+
+        output = tempfile.TemporaryFile()
+        try:
+            if getattr(response, 'streaming', False):
+                for chunk in response.streaming_content:
+                    output.write(chunk)
+            else:
+                output.write(response.content)
+            output.seek(0)
+            job = ExportJob.objects.get(pk=job.pk)
+            job.file.save('%s.%s' % (model._meta.model_name, job.export_type), File(output), save=False)
+        finally:
+            output.close()
+
+        job.status = 'done'
+        job.progress = list_view.result_count or job.progress
+        job.finished = now()
+        job.save()
+    except Exception:
+        ExportJob.objects.filter(pk=job_id).update(
+            status='failed', error=traceback.format_exc(), finished=now())
+
+
+class ExportDownloadView(BaseAdminView):
+
+    def get(self, request, job_id):
+        job = get_object_or_404(ExportJob, pk=job_id, user=request.user, status='done')
+        job.file.open('rb')
+        response = StreamingHttpResponse(job.file.chunks(), content_type="%s; charset=UTF-8" % (
+            ExportPlugin.export_mimes.get(job.export_type, 'application/octet-stream')))
+        response['Content-Disposition'] = 'attachment; filename=%s' % os.path.basename(job.file.name)
+        return response
+
+
+@widget_manager.register
+class ExportJobsWidget(BaseWidget):
+    widget_type = 'exports'
+    widget_title = _('exports')
+    description = _(u'List your background exports and download the finished ones.')
+    template = 'xadmin/widgets/exports.html'
+    base_title = _(u'Exports')
+    widget_icon = 'fa fa-download'
+
+    count = forms.IntegerField(label=_('Count'), initial=10, required=False)
+
+    def context(self, context):
+        jobs = list(ExportJob.objects.filter(user=self.user).select_related(
+            'content_type').order_by('-created')[:self.cleaned_data.get('count') or 10])
+        for job in jobs:
+            if job.status == 'done':
+                job.download_url = reverse('%s:xadmin_export_download' % self.admin_site.app_name,
+                                           args=(job.pk,))
+        context['jobs'] = jobs
+
+    def has_perm(self):
+        return True
+
+
 site.register_plugin(ExportMenuPlugin, ListAdminView)
 site.register_plugin(ExportPlugin, ListAdminView)
+site.register_view(r'^xadmin/export/(\d+)/$', ExportDownloadView, name='xadmin_export_download')
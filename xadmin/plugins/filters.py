@@ -1,10 +1,11 @@
-import operator
+import hashlib
 from xadmin import widgets
 
 from xadmin.util import get_fields_from_path, lookup_needs_distinct
-from django.conf import settings
 from django.core.exceptions import SuspiciousOperation, ImproperlyConfigured, ValidationError
-from django.db import models
+from django.core.cache import cache
+from django.db import models, router
+from django.db.models import Count
 from django.db.models.fields import FieldDoesNotExist
 
 from django import get_version
@@ -17,15 +18,16 @@ from django.db.models.sql.query import LOOKUP_SEP, QUERY_TERMS
 from django.template import loader
 import sys
 if sys.version_info.major < 3:
-   from django.utils.encoding import smart_str as smart_text
+   from django.utils.encoding import smart_str as smart_text, smart_str as smart_bytes
 else:
    from django.utils.encoding import smart_bytes, smart_text
 from django.utils.translation import ugettext as _
 
+from xadmin.search import LookupSearch
 from xadmin.filters import manager as filter_manager, FILTER_PREFIX, SEARCH_VAR, DateFieldListFilter, RelatedFieldSearchFilter
 from xadmin.sites import site
 from xadmin.views import BaseAdminPlugin, ListAdminView
-from functools import reduce
+from xadmin.views.list import ORDER_VAR
 
 class IncorrectLookupParameters(Exception):
     pass
@@ -36,6 +38,14 @@ class FilterPlugin(BaseAdminPlugin):
     search_fields = ()
     ajax_search_fields = ()
     free_query_filter = True
+    # See xadmin.search
+    search_backend = LookupSearch
+    # Show how many rows each filter choice matches
+    list_filter_facets = False
+    list_filter_facets_timeout = 300
+    # Rows a query grouped by several filters may return before each filter
+    # is counted on its own
+    list_filter_facets_limit = 1000
 
     def lookup_allowed(self, lookup, value):
         model = self.model
@@ -83,6 +93,8 @@ class FilterPlugin(BaseAdminPlugin):
         return clean_lookup in self.list_filter
 
     def get_list_queryset(self, queryset):
+        # Unfiltered queryset, facets are counted from it
+        self.base_queryset = queryset
         lookup_params = dict([(smart_text(k)[len(FILTER_PREFIX):], v) for k, v in self.admin_view.params.items()
                               if str(k).startswith(FILTER_PREFIX) and v != ''])
         for p_key, p_val in lookup_params.items():
@@ -148,6 +160,8 @@ class FilterPlugin(BaseAdminPlugin):
                 self.filter_specs.append(spec)
 
         self.has_filters = bool(self.filter_specs)
+        # Lookups not handled by a filter spec
+        self.lookup_params = lookup_params
         self.admin_view.filter_specs = self.filter_specs
         self.admin_view.used_filter_num = len(
             list(filter(lambda f: f.is_used, self.filter_specs)))
@@ -166,46 +180,131 @@ class FilterPlugin(BaseAdminPlugin):
         except Exception as e:
             raise IncorrectLookupParameters(e)
 
-        query = self.request.GET.get(SEARCH_VAR, '')
+        queryset, search_distinct = self.get_search_queryset(queryset)
+        use_distinct = use_distinct or search_distinct
 
-        # Apply keyword searches.
-        def construct_search(field_name):
-            key = ''
-            if 'django.contrib.postgres' in settings.INSTALLED_APPS:
-                field_type = self.model._meta.get_field(field_name).get_internal_type()
-                if field_type in ['CharField', 'TextField', ]:
-                    key = '__unaccent'
-
-            if field_name.startswith('^'):
-                return "%s%s__istartswith" % (field_name[1:], key)
-            elif field_name.startswith('='):
-                return "%s%s__iexact" % (field_name[1:], key)
-            elif field_name.startswith('@'):
-                return "%s%s__search" % (field_name[1:], key)
-            else:
-                return "%s%s__icontains" % (field_name, key)
+        if use_distinct:
+            queryset = queryset.distinct()
+        self.filtered_queryset = queryset
+        return queryset
+
+    def get_search_queryset(self, queryset):
+        """
+        Apply the keyword search, return the queryset and whether it needs
+        distinct().
+        """
+        use_distinct = False
+        query = self.request.GET.get(SEARCH_VAR, '')
 
         if self.request.is_ajax() and self.ajax_search_fields:
             self.search_fields = self.ajax_search_fields
 
         if self.search_fields and query:
-            orm_lookups = [construct_search(str(search_field))
-                           for search_field in self.search_fields]
-            for bit in query.split():
-                or_queries = [models.Q(**{orm_lookup: bit})
-                              for orm_lookup in orm_lookups]
-                queryset = queryset.filter(reduce(operator.or_, or_queries))
-            if not use_distinct:
-                for search_spec in orm_lookups:
-                    if lookup_needs_distinct(self.opts, search_spec):
-                        use_distinct = True
-                        break
+            queryset, use_distinct = self.get_search_backend()(queryset, query)
             self.admin_view.search_query = query
+        return queryset, use_distinct
+
+    def get_search_backend(self):
+        if self.request.is_ajax() and self.ajax_search_fields:
+            # The full-text index only holds search_fields
+            return LookupSearch(self.model, self.ajax_search_fields)
+        # Classes aren't copied from the admin options to the plugins, read
+        # the option from the admin view
+        backend = getattr(self.admin_view, 'search_backend', self.search_backend)
+        return backend(self.model, self.search_fields)
 
+    def get_ordering(self, ordering):
+        # Best matches first, unless the user sorted the list
+        query = self.request.GET.get(SEARCH_VAR, '')
+        if self.search_fields and query and not self.admin_view.params.get(ORDER_VAR):
+            rank = self.get_search_backend().get_rank_ordering(
+                query, router.db_for_read(self.model))
+            if rank is not None:
+                return [rank] + list(ordering)
+        return ordering
+
+    def get_facet_queryset(self, exclude_spec):
+        """
+        Return the list queryset filtered by every filter but
+        ``exclude_spec``, the choices of that filter are counted in it.
+        """
+        queryset = self.base_queryset
+        for spec in self.filter_specs:
+            if spec is not exclude_spec and spec.has_output():
+                try:
+                    queryset = spec.do_filte(queryset)
+                except ValidationError:
+                    pass
+        queryset = queryset.filter(**self.lookup_params)
+        queryset, use_distinct = self.get_search_queryset(queryset)
         if use_distinct:
-            return queryset.distinct()
-        else:
-            return queryset
+            queryset = queryset.distinct()
+        return queryset
+
+    def get_facet_cache_key(self):
+        # Only the filter and search params change the counts. The user is
+        # part of the key because queryset() may depend on it.
+        params = sorted((k, sorted(self.request.GET.getlist(k))) for k in self.request.GET
+                        if k.startswith(FILTER_PREFIX) or k == SEARCH_VAR)
+        return 'xadmin_facets_%s' % hashlib.md5(smart_bytes(repr((
+            self.opts.app_label, self.opts.model_name, self.user.pk, params)))).hexdigest()
+
+    def get_facet_counts(self):
+        """
+        Return ``{spec index: {value: count}}`` for the filters listing
+        choices, each counted under the other active filters.
+        """
+        key = self.get_facet_cache_key()
+        counts = cache.get(key)
+        if counts is None:
+            counts = self.count_facets()
+            cache.set(key, counts, self.list_filter_facets_timeout)
+        return counts
+
+    def count_facets(self):
+        counts = {}
+        # Filters without a value are all counted in the filtered queryset,
+        # single valued ones with one query grouped by all their fields.
+        shared = []
+        for i, spec in enumerate(self.filter_specs):
+            path = getattr(spec, 'facet_lookup', None)
+            if path is None or not spec.has_output():
+                continue
+            multi_valued = lookup_needs_distinct(self.opts, path)
+            if spec.is_used or multi_valued:
+                queryset = self.get_facet_queryset(spec)
+                counts[i] = self._count_values(queryset, spec, path, multi_valued)
+            else:
+                shared.append((i, spec, path))
+
+        if len(shared) > 1:
+            paths = [path for i, spec, path in shared]
+            rows = list(self._facet_source(self.filtered_queryset).values(*paths).annotate(
+                xadmin_facet_count=Count('pk'))[:self.list_filter_facets_limit + 1])
+            if len(rows) <= self.list_filter_facets_limit:
+                for i, spec, path in shared:
+                    values = counts[i] = {}
+                    for row in rows:
+                        value = spec.facet_key(row[path])
+                        values[value] = values.get(value, 0) + row['xadmin_facet_count']
+                shared = []
+        for i, spec, path in shared:
+            counts[i] = self._count_values(self.filtered_queryset, spec, path, False)
+        return counts
+
+    def _facet_source(self, queryset):
+        if queryset.query.distinct:
+            # Grouping would count the rows duplicated by the joins
+            return self.model._default_manager.filter(pk__in=queryset.order_by().values('pk'))
+        return queryset.order_by()
+
+    def _count_values(self, queryset, spec, path, distinct):
+        values = {}
+        for row in self._facet_source(queryset).values(path).annotate(
+                xadmin_facet_count=Count('pk', distinct=distinct)):
+            value = spec.facet_key(row[path])
+            values[value] = values.get(value, 0) + row['xadmin_facet_count']
+        return values
 
     # Media
     def get_media(self, media):
@@ -223,6 +322,9 @@ class FilterPlugin(BaseAdminPlugin):
     # Block Views
     def block_nav_menu(self, context, nodes):
         if self.has_filters:
+            if self.list_filter_facets:
+                for i, values in self.get_facet_counts().items():
+                    self.filter_specs[i].facet_counts = values
             nodes.append(loader.render_to_string('xadmin/blocks/model_list.nav_menu.filters.html', context_instance=context))
 
     def block_nav_form(self, context, nodes):
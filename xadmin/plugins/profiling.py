@@ -0,0 +1,87 @@
+from django.template import loader
+from django.utils.encoding import force_text
+from django.utils.translation import ugettext as _
+
+from xadmin.profiling import get_profiler
+from xadmin.sites import site
+from xadmin.util import json
+from xadmin.views import BaseAdminPlugin, CommAdminView
+
+PANEL_PLACEHOLDER = '<!-- xadmin profiling panel -->'
+
+
+class ProfilingPlugin(BaseAdminPlugin):
+    """
+    Profiles the admin pages of superusers, see ``xadmin.profiling``. The
+    report is shown in a panel at the bottom of the page and sent as JSON in
+    the ``X-Xadmin-Profile`` response header, without the SQL of every
+    query. Enable it in a settings class of ``CommAdminView``::
+
+        class GlobalSetting(object):
+            enable_profiling = True
+
+        xadmin.site.register(views.CommAdminView, GlobalSetting)
+    """
+
+    enable_profiling = False
+    profiling_header = 'X-Xadmin-Profile'
+    # Items of each list of the header report, and length of their SQL
+    profiling_header_items = 10
+    profiling_header_sql_length = 200
+
+    def init_request(self, *args, **kwargs):
+        # Only the requests routed to a view, not the ones dashboard widgets
+        # make up for their views.
+        if not (self.enable_profiling and self.user.is_superuser and
+                getattr(self.request, 'resolver_match', None)):
+            return False
+        self.admin_view.profiler = get_profiler(self.request, self.profiled)
+
+    def get_header_report(self, report):
+        items = self.profiling_header_items
+        sql = report['sql']
+
+        def queries(groups):
+            return [dict(g, sql=g['sql'][:self.profiling_header_sql_length])
+                    for g in groups[:items]]
+
+        return dict(report, hooks=report['hooks'][:items], plugins=report['plugins'][:items],
+                    blocks=report['blocks'][:items], sql={
+                        'count': sql['count'], 'time': sql['time'],
+                        'duplicates': queries(sql['duplicates']),
+                        'similar': queries(sql['similar']),
+                    })
+
+    def render_panel(self, report):
+        def ms(sections):
+            return [dict(s, time=s['time'] * 1000, own=s['own'] * 1000) for s in sections]
+
+        sql = report['sql']
+        return loader.render_to_string('xadmin/blocks/comm.extrabody.profiling.html', {
+            'total': report['total'] * 1000,
+            'view': (report['view'] or 0) * 1000,
+            'render': (report['render'] or 0) * 1000,
+            'sections': [(_(u'Hooks'), ms(report['hooks'])), (_(u'Plugins'), ms(report['plugins'])),
+                         (_(u'Blocks'), ms(report['blocks']))],
+            'sql_count': sql['count'],
+            'sql_time': sql['time'] * 1000,
+            'sql_groups': [(_(u'Duplicated queries'), sql['duplicates']),
+                           (_(u'Similar queries'), sql['similar'])],
+            'queries': [dict(q, time=q['time'] * 1000) for q in sql['queries']],
+        })
+
+    def profiled(self, response, report):
+        response[self.profiling_header] = json.dumps(self.get_header_report(report))
+        if not getattr(response, 'streaming', False) and \
+                response.get('Content-Type', '').startswith('text/html'):
+            content = force_text(response.content)
+            if PANEL_PLACEHOLDER in content:
+                response.content = content.replace(PANEL_PLACEHOLDER, self.render_panel(report))
+
+    # Block Views
+    def block_extrabody(self, context, nodes):
+        # Replaced once the page is rendered, to report all of it
+        nodes.append(PANEL_PLACEHOLDER)
+
+
+site.register_plugin(ProfilingPlugin, CommAdminView)
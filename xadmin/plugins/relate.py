@@ -1,5 +1,4 @@
 # coding=UTF-8
-from django.core.urlresolvers import reverse
 import sys
 if sys.version_info.major < 3:
    from django.utils.encoding import force_unicode as force_text
@@ -70,14 +69,14 @@ class RelateMenuPlugin(BaseAdminPlugin):
 
                             '<a href="%s?%s=%s" title="%s"><i class="icon fa fa-th-list"></i> %s</a>' %
                           (
-                            reverse('%s:%s_%s_changelist' % (
+                            self.admin_site.reverse('%s:%s_%s_changelist' % (
                                     self.admin_site.app_name, label, model_name)),
                             RELATE_PREFIX + lookup_name, str(instance.pk), verbose_name, verbose_name) if view_perm else
                             '<a><span class="text-muted"><i class="icon fa fa-blank"></i> %s</span></a>' % verbose_name,
 
                             '<a class="add_link dropdown-menu-btn" href="%s?%s=%s"><i class="icon fa fa-plus pull-right"></i></a>' %
                           (
-                            reverse('%s:%s_%s_add' % (
+                            self.admin_site.reverse('%s:%s_%s_add' % (
                                     self.admin_site.app_name, label, model_name)),
                             RELATE_PREFIX + lookup_name, str(
                 instance.pk)) if add_perm else "",
@@ -91,6 +90,7 @@ class RelateMenuPlugin(BaseAdminPlugin):
     related_link.allow_tags = True
     related_link.allow_export = False
     related_link.is_column = False
+    related_link.admin_fields = ()
 
     def get_list_display(self, list_display):
         if self.use_related_menu and len(self.get_related_list()):
@@ -0,0 +1,129 @@
+"""
+Cache of the changelist rows.
+
+With ``list_row_cache = True``, the rows a list page builds are kept in the
+cache, cells and all, so the next pages showing the same objects skip
+``result_row``, ``result_item`` and the plugin hooks of every cell::
+
+    class CountryAdmin(object):
+        list_display = ('name', 'code', 'continent')
+        list_row_cache = True
+        # Optional, a field changed on every save
+        list_row_cache_version_field = 'updated_at'
+
+A row is reused for the same object version, columns, active plugins,
+user, permissions, language and time zone. The rows are per user, their
+links may depend on object permissions, e.g. the predicates of
+``xadmin.perms``. Without a version field, the version is a counter the
+``post_save`` and ``post_delete`` signals bump. Rows showing
+related objects, e.g. ``continent`` above, keep their old text until
+``list_row_cache_timeout`` when only the related object changes.
+
+Cached cells don't keep their ``field``, ``attr`` and ``value``, so the
+exports build their rows as usual.
+"""
+import hashlib
+import pickle
+import uuid
+
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.utils import timezone, translation
+
+from xadmin.sites import site
+from xadmin.views import BaseAdminPlugin, ListAdminView
+
+ROW_VERSION_KEY = 'xadmin_row_version_%s_%s_%s'
+
+
+def get_row_version_key(model, pk):
+    opts = model._meta.concrete_model._meta
+    return ROW_VERSION_KEY % (opts.app_label, opts.model_name, pk)
+
+
+class RowCachePlugin(BaseAdminPlugin):
+
+    list_row_cache = False
+    list_row_cache_version_field = None
+    list_row_cache_timeout = 300
+    # Query string parameters changing the cells, besides the columns
+    list_row_cache_vary = ('_layout',)
+
+    def init_request(self, *args, **kwargs):
+        # Exports read the field and value of every cell
+        return bool(self.list_row_cache) and self.request.method == 'GET' and \
+            self.request.GET.get('_do_') != 'export'
+
+    def get_perms_fingerprint(self):
+        if self.user.is_superuser:
+            return 'superuser'
+        return hashlib.md5('\n'.join(sorted(self.admin_view.perm_oracle.perms))
+                           .encode('utf-8')).hexdigest()
+
+    def get_row_cache_prefix(self):
+        """
+        Key prefix of the rows of this page, what the cells depend on
+        besides the object.
+        """
+        opts = self.opts.concrete_model._meta
+        parts = [
+            opts.app_label, opts.model_name,
+            list(self.admin_view.list_display),
+            [type(p).__name__ for p in self.admin_view.plugins],
+            [self.request.GET.get(param) for param in self.list_row_cache_vary],
+            self.user.pk, self.get_perms_fingerprint(),
+            translation.get_language(),
+            timezone.get_current_timezone_name(),
+        ]
+        return 'xadmin_row_%s' % hashlib.md5(repr(parts).encode('utf-8')).hexdigest()
+
+    def get_row_versions(self, objs):
+        if self.list_row_cache_version_field:
+            return [getattr(obj, self.list_row_cache_version_field) for obj in objs]
+        keys = [get_row_version_key(self.model, obj.pk) for obj in objs]
+        versions = cache.get_many(keys)
+        for key in keys:
+            if key not in versions:
+                # Never reuse a version, even if the counter was evicted
+                cache.add(key, uuid.uuid4().hex, None)
+                versions[key] = cache.get(key)
+        return [versions[key] for key in keys]
+
+    def results(self, __):
+        objs = self.admin_view.result_list
+        if not objs:
+            return __()
+        prefix = self.get_row_cache_prefix()
+        keys = ['%s_%s_%s' % (prefix, obj.pk, version)
+                for obj, version in zip(objs, self.get_row_versions(objs))]
+        cached = cache.get_many(keys)
+
+        rows = []
+        missed = {}
+        for obj, key in zip(objs, keys):
+            if key in cached:
+                row = self.admin_view.cached_result_row(obj, pickle.loads(cached[key]))
+            else:
+                row = self.admin_view.result_row(obj)
+                del row['object']
+                missed[key] = pickle.dumps(row, pickle.HIGHEST_PROTOCOL)
+                row['object'] = obj
+            rows.append(row)
+        if missed:
+            cache.set_many(missed, self.list_row_cache_timeout)
+        return rows
+    # Replaces the base results(), other plugins get the cached rows
+    results.priority = 0
+
+
+def _bump_row_version(sender, instance, **kwargs):
+    admin_class = site._registry.get(sender._meta.concrete_model) or site._registry.get(sender)
+    if getattr(admin_class, 'list_row_cache', False) and \
+            not getattr(admin_class, 'list_row_cache_version_field', None):
+        cache.set(get_row_version_key(sender, instance.pk), uuid.uuid4().hex, None)
+
+
+post_save.connect(_bump_row_version, dispatch_uid='xadmin_row_cache_save')
+post_delete.connect(_bump_row_version, dispatch_uid='xadmin_row_cache_delete')
+
+site.register_plugin(RowCachePlugin, ListAdminView)
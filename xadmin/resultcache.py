@@ -0,0 +1,110 @@
+"""
+Cache of the results computed over the whole filtered list, the chart data
+of ``ChartsView`` and the aggregates of ``AggregationPlugin``.
+
+With ``result_cache_timeout`` set, they are kept for that many seconds per
+model, list filters, chart and user::
+
+    class AccessRecordAdmin(object):
+        aggregate_fields = {'user_count': 'sum'}
+        data_charts = {
+            'users': {'title': 'Users', 'x-field': 'date', 'y-field': ('user_count',),
+                      'bucket': 'day', 'incremental': True},
+        }
+        result_cache_timeout = 600
+        # Share the results between the users, when queryset() doesn't
+        # depend on the user
+        result_cache_shared = True
+
+Saving or deleting an object of the model throws its results away. Adding
+one only marks them stale: the charts with ``'incremental': True`` then
+aggregate again the buckets from their last one on, the others are
+computed again. Incremental charts expect the new objects to fall in the
+last buckets, e.g. a creation date. Changes the signals don't tell, e.g.
+``update()`` or changes of related objects, are seen after the timeout.
+"""
+import hashlib
+import uuid
+
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.utils import timezone
+
+from xadmin.sites import site
+from xadmin.views.list import ALL_VAR, COL_LIST_VAR, CURSOR_VAR, ORDER_VAR, PAGE_VAR
+
+# Query string parameters not changing the results
+IGNORED_PARAMS = (ALL_VAR, COL_LIST_VAR, CURSOR_VAR, ORDER_VAR, PAGE_VAR, '_layout')
+
+# Changed when an object of the model is saved or deleted
+GENERATION_KEY = 'xadmin_results_gen_%s_%s'
+# Changed when an object of the model is added
+APPENDED_KEY = 'xadmin_results_new_%s_%s'
+
+
+def get_state_keys(model):
+    opts = model._meta.concrete_model._meta
+    return GENERATION_KEY % (opts.app_label, opts.model_name), \
+        APPENDED_KEY % (opts.app_label, opts.model_name)
+
+
+def get_state(model):
+    """
+    ``(generation, appended)`` of the model, the results computed with
+    another state are outdated.
+    """
+    keys = get_state_keys(model)
+    state = cache.get_many(keys)
+    for key in keys:
+        if key not in state:
+            cache.add(key, uuid.uuid4().hex, None)
+            state[key] = cache.get(key)
+    return tuple(state[key] for key in keys)
+
+
+def get_params(request, ignored=()):
+    return sorted((name, sorted(request.GET.getlist(name))) for name in request.GET
+                  if name not in IGNORED_PARAMS and name not in ignored)
+
+
+def get_result_key(admin_view, kind, name, ignored=()):
+    """
+    Cache key of the result ``name`` of the filtered list of ``admin_view``.
+    """
+    opts = admin_view.opts.concrete_model._meta
+    parts = [
+        opts.app_label, opts.model_name, kind, name,
+        get_params(admin_view.request, ignored),
+        timezone.get_current_timezone_name(),
+    ]
+    if not getattr(admin_view, 'result_cache_shared', False):
+        parts.append(admin_view.user.pk)
+    return 'xadmin_result_%s' % hashlib.md5(repr(parts).encode('utf-8')).hexdigest()
+
+
+def get_cached_result(admin_view, kind, name, func, timeout, ignored=()):
+    """
+    Return ``func()``, cached for ``timeout`` seconds or until the model
+    changes.
+    """
+    key = get_result_key(admin_view, kind, name, ignored)
+    # Read first, a change while computing the result outdates it
+    state = get_state(admin_view.model)
+    entry = cache.get(key)
+    if entry is not None and entry[0] == state:
+        return entry[1]
+    result = func()
+    cache.set(key, (state, result), timeout)
+    return result
+
+
+def _model_changed(sender, instance, created=False, **kwargs):
+    admin_class = site._registry.get(sender._meta.concrete_model) or site._registry.get(sender)
+    if getattr(admin_class, 'result_cache_timeout', None) is None:
+        return
+    generation_key, appended_key = get_state_keys(sender)
+    cache.set(appended_key if created else generation_key, uuid.uuid4().hex, None)
+
+
+post_save.connect(_model_changed, dispatch_uid='xadmin_result_cache_save')
+post_delete.connect(_model_changed, dispatch_uid='xadmin_result_cache_delete')
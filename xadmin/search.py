@@ -0,0 +1,351 @@
+"""
+Keyword search backends for the list view.
+
+``FilterPlugin.search_backend`` is instantiated with the model and its
+``search_fields``, then called with the list queryset and the search string.
+It returns ``(queryset, use_distinct)``.
+
+``LookupSearch`` is the default. Every word of the search must be found by
+one of the ``__icontains`` lookups, or the ``^``, ``=`` and ``@`` prefixed
+ones. ``FullTextSearch`` looks the words up in a full-text index instead:
+
+* PostgreSQL: a ``tsvector`` column with a GIN index.
+* SQLite: an FTS5 table, handy for local development and tests.
+
+With ``FullTextSearch``, the rows are ordered by relevance unless the user
+sorted the list. Other databases use ``LookupSearch``, and so does a
+database whose index hasn't been created yet::
+
+    class ArticleAdmin(object):
+        search_fields = ('title', 'body', 'author__name')
+        search_backend = FullTextSearch
+
+The index is a single table, ``xadmin_search_index``, that holds one
+document per object for every model searched this way. It is created and
+filled by::
+
+    python manage.py xadmin_search_index
+
+It is updated when an object is saved or deleted. If a related object used
+in ``search_fields`` changes (e.g. ``author__name``), run the command again
+to pick it up. Full-text search needs a model with an integer primary key.
+"""
+import logging
+import operator
+import re
+from functools import reduce
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections, models, router, transaction, DatabaseError
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.signals import post_save, post_delete
+
+from xadmin.util import lookup_needs_distinct, force_text
+
+logger = logging.getLogger('xadmin.search')
+
+INDEX_TABLE = 'xadmin_search_index'
+# Extra select column holding the relevance of each row, greater is better
+RANK_FIELD = 'xadmin_search_rank'
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+class BaseSearch(object):
+
+    # Whether the objects are kept in the full-text index
+    indexed = False
+
+    def __init__(self, model, search_fields):
+        self.model = model
+        self.opts = model._meta
+        self.search_fields = [str(f) for f in search_fields]
+
+    def __call__(self, queryset, query):
+        raise NotImplementedError
+
+    def get_rank_ordering(self, query, using):
+        """
+        Return the ordering item putting the best matches of ``query`` first,
+        or None if the backend can't rank them.
+        """
+        return None
+
+
+class LookupSearch(BaseSearch):
+
+    def construct_search(self, field_name):
+        key = ''
+        if 'django.contrib.postgres' in settings.INSTALLED_APPS:
+            field_type = self.opts.get_field(field_name).get_internal_type()
+            if field_type in ['CharField', 'TextField', ]:
+                key = '__unaccent'
+
+        if field_name.startswith('^'):
+            return "%s%s__istartswith" % (field_name[1:], key)
+        elif field_name.startswith('='):
+            return "%s%s__iexact" % (field_name[1:], key)
+        elif field_name.startswith('@'):
+            return "%s%s__search" % (field_name[1:], key)
+        else:
+            return "%s%s__icontains" % (field_name, key)
+
+    def __call__(self, queryset, query):
+        orm_lookups = [self.construct_search(search_field)
+                       for search_field in self.search_fields]
+        for bit in query.split():
+            or_queries = [models.Q(**{orm_lookup: bit})
+                          for orm_lookup in orm_lookups]
+            queryset = queryset.filter(reduce(operator.or_, or_queries))
+        use_distinct = any(lookup_needs_distinct(self.opts, search_spec)
+                           for search_spec in orm_lookups)
+        return queryset, use_distinct
+
+
+class SearchIndex(object):
+    """
+    The SQL of the full-text index for one database vendor.
+    """
+
+    def __init__(self):
+        self._exists = set()
+
+    def exists(self, using):
+        if using not in self._exists:
+            if INDEX_TABLE not in connections[using].introspection.table_names():
+                return False
+            self._exists.add(using)
+        return True
+
+    def create(self, using):
+        if not self.exists(using):
+            cursor = connections[using].cursor()
+            for sql in self.create_sql:
+                cursor.execute(sql)
+
+    def delete(self, using, content_type_id, pks=None):
+        sql = 'DELETE FROM %s WHERE content_type_id = %%s' % INDEX_TABLE
+        params = [content_type_id]
+        if pks is not None:
+            if not pks:
+                return
+            sql += ' AND object_id IN (%s)' % ', '.join(['%s'] * len(pks))
+            params.extend(pks)
+        connections[using].cursor().execute(sql, params)
+
+    def update(self, using, content_type_id, documents, config):
+        """
+        Replace the documents of the ``(pk, text)`` pairs in ``documents``.
+        """
+        self.delete(using, content_type_id, [pk for pk, text in documents])
+        connections[using].cursor().executemany(self.insert_sql, [
+            self.insert_params(content_type_id, pk, text, config) for pk, text in documents])
+
+    def search(self, queryset, content_type_id, words, config):
+        raise NotImplementedError
+
+    def _join_where(self, queryset):
+        qn = connections[queryset.db].ops.quote_name
+        opts = queryset.model._meta
+        return [
+            '%s.content_type_id = %%s' % INDEX_TABLE,
+            '%s.object_id = %s.%s' % (INDEX_TABLE, qn(opts.db_table), qn(opts.pk.column)),
+        ]
+
+
+class PostgresSearchIndex(SearchIndex):
+
+    create_sql = (
+        'CREATE TABLE %s (content_type_id integer NOT NULL, object_id bigint NOT NULL, '
+        'document tsvector NOT NULL, PRIMARY KEY (content_type_id, object_id))' % INDEX_TABLE,
+        'CREATE INDEX %s_document ON %s USING GIN (document)' % (INDEX_TABLE, INDEX_TABLE),
+    )
+    insert_sql = 'INSERT INTO %s (content_type_id, object_id, document) ' \
+        'VALUES (%%s, %%s, to_tsvector(%%s, %%s))' % INDEX_TABLE
+
+    def insert_params(self, content_type_id, pk, text, config):
+        return (content_type_id, pk, config, text)
+
+    def search(self, queryset, content_type_id, words, config):
+        # Every word must match, as a prefix so the list narrows while typing
+        tsquery = ' & '.join(['%s:*' % word for word in words])
+        return queryset.extra(
+            select={RANK_FIELD: 'ts_rank(%s.document, to_tsquery(%%s, %%s))' % INDEX_TABLE},
+            select_params=(config, tsquery),
+            tables=[INDEX_TABLE],
+            where=self._join_where(queryset) + [
+                '%s.document @@ to_tsquery(%%s, %%s)' % INDEX_TABLE],
+            params=[content_type_id, config, tsquery])
+
+
+class SQLiteSearchIndex(SearchIndex):
+
+    create_sql = (
+        'CREATE VIRTUAL TABLE %s USING fts5(document, content_type_id UNINDEXED, '
+        'object_id UNINDEXED)' % INDEX_TABLE,
+    )
+    insert_sql = 'INSERT INTO %s (content_type_id, object_id, document) ' \
+        'VALUES (%%s, %%s, %%s)' % INDEX_TABLE
+
+    def insert_params(self, content_type_id, pk, text, config):
+        return (content_type_id, pk, text)
+
+    def search(self, queryset, content_type_id, words, config):
+        # Quoted prefix tokens, implicitly ANDed
+        match = ' '.join(['"%s"*' % word for word in words])
+        return queryset.extra(
+            # bm25() is lower for better matches
+            select={RANK_FIELD: '-bm25(%s)' % INDEX_TABLE},
+            tables=[INDEX_TABLE],
+            where=self._join_where(queryset) + ['%s MATCH %%s' % INDEX_TABLE],
+            params=[content_type_id, match])
+
+
+class FullTextSearch(BaseSearch):
+
+    indexed = True
+    # Search configuration of the PostgreSQL index, 'simple' doesn't stem
+    # words so it suits names and codes in any language.
+    config = 'simple'
+    fallback = LookupSearch
+    indexes = {
+        'postgresql': PostgresSearchIndex(),
+        'sqlite': SQLiteSearchIndex(),
+    }
+    chunk_size = 500
+
+    def get_index(self, using):
+        if self.opts.pk.get_internal_type() not in (
+                'AutoField', 'BigAutoField', 'IntegerField', 'BigIntegerField',
+                'PositiveIntegerField', 'SmallIntegerField', 'PositiveSmallIntegerField'):
+            return None
+        return self.indexes.get(connections[using].vendor)
+
+    def get_search_index(self, using):
+        # The index to query, if it has been created
+        index = self.get_index(using)
+        if index is None or not index.exists(using):
+            return None
+        return index
+
+    def get_content_type_id(self):
+        return ContentType.objects.get_for_model(self.model, for_concrete_model=False).pk
+
+    def __call__(self, queryset, query):
+        index = self.get_search_index(queryset.db)
+        if index is None:
+            return self.fallback(self.model, self.search_fields)(queryset, query)
+        words = WORD_RE.findall(query)
+        if not words:
+            return queryset, False
+        return index.search(queryset, self.get_content_type_id(), words, self.config), False
+
+    def get_rank_ordering(self, query, using):
+        if WORD_RE.search(query) and self.get_search_index(using) is not None:
+            return '-' + RANK_FIELD
+        return None
+
+    def get_document(self, obj):
+        values = []
+        for field_name in self.search_fields:
+            values.extend(_get_path_values(obj, field_name.lstrip('^=@').split(LOOKUP_SEP)))
+        return ' '.join([force_text(v) for v in values if v is not None and v != ''])
+
+    def update(self, objs, using):
+        index = self.get_search_index(using)
+        if index is not None:
+            with transaction.atomic(using=using):
+                index.update(using, self.get_content_type_id(),
+                             [(obj.pk, self.get_document(obj)) for obj in objs], self.config)
+
+    def delete(self, pks, using):
+        index = self.get_search_index(using)
+        if index is not None:
+            index.delete(using, self.get_content_type_id(), list(pks))
+
+    def clear(self, using):
+        index = self.get_search_index(using)
+        if index is not None:
+            index.delete(using, self.get_content_type_id())
+
+    def rebuild(self, using):
+        """
+        Create the index if needed and fill it with every object of the
+        model, return the number of objects indexed.
+        """
+        index = self.get_index(using)
+        if index is None:
+            raise DatabaseError('Full-text search is not available for %s on the %r database.'
+                                % (self.opts.object_name, using))
+        index.create(using)
+        content_type_id = self.get_content_type_id()
+        queryset = self.model._default_manager.using(using).order_by('pk')
+        count = 0
+        with transaction.atomic(using=using):
+            index.delete(using, content_type_id)
+            last_pk = None
+            while True:
+                chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+                objs = list(chunk[:self.chunk_size])
+                if not objs:
+                    break
+                index.update(using, content_type_id,
+                             [(obj.pk, self.get_document(obj)) for obj in objs], self.config)
+                count += len(objs)
+                last_pk = objs[-1].pk
+        return count
+
+
+def _get_path_values(obj, path):
+    value = getattr(obj, path[0], None)
+    if value is None:
+        return []
+    if isinstance(value, models.Manager):
+        # Many to many or reverse foreign key
+        objs = value.all()
+    else:
+        objs = [value]
+    if len(path) == 1:
+        return list(objs)
+    values = []
+    for o in objs:
+        values.extend(_get_path_values(o, path[1:]))
+    return values
+
+
+def get_search_backend(model):
+    """
+    Return the ``search_backend`` of the admin of ``model``, if it keeps the
+    model in the full-text index.
+    """
+    from xadmin.sites import site
+    admin_class = site._registry.get(model)
+    backend = getattr(admin_class, 'search_backend', None)
+    if backend is None or not getattr(backend, 'indexed', False):
+        return None
+    return backend(model, getattr(admin_class, 'search_fields', ()))
+
+
+def _update_index(sender, instance, raw=False, using=None, **kwargs):
+    backend = get_search_backend(sender)
+    if backend is not None and not raw:
+        try:
+            backend.update([instance], using or router.db_for_write(sender))
+        except DatabaseError:
+            logger.exception('Could not index %s %r', sender._meta.object_name, instance.pk)
+
+
+def _delete_index(sender, instance, using=None, **kwargs):
+    backend = get_search_backend(sender)
+    if backend is not None:
+        try:
+            using = using or router.db_for_write(sender)
+            with transaction.atomic(using=using):
+                backend.delete([instance.pk], using)
+        except DatabaseError:
+            logger.exception('Could not remove %s %r from the index',
+                             sender._meta.object_name, instance.pk)
+
+
+post_save.connect(_update_index, dispatch_uid='xadmin_search_update')
+post_delete.connect(_delete_index, dispatch_uid='xadmin_search_delete')
@@ -3,7 +3,10 @@ from imp import reload
 from functools import update_wrapper
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
+from django.core.urlresolvers import reverse, get_script_prefix, get_urlconf, NoReverseMatch
 from django.db.models.base import ModelBase
+from django.utils import translation
+from django.utils.http import urlquote
 from django.views.decorators.cache import never_cache
 
 reload(sys)
@@ -11,6 +14,17 @@ if sys.version_info.major < 3:
   sys.setdefaultencoding("utf-8")
 
 
+# Characters reverse() leaves unquoted in url arguments
+URL_ARG_SAFE = "!$&'()*+,;=/~:@"
+
+
+def quote_url_arg(value):
+    """
+    Quote ``value`` the way reverse() quotes url arguments.
+    """
+    return urlquote(value, safe=URL_ARG_SAFE)
+
+
 class AlreadyRegistered(Exception):
     pass
 
@@ -19,6 +33,37 @@ class NotRegistered(Exception):
     pass
 
 
+class LazyModelAdminView(object):
+    """
+    Model admin view creating its merged view class on first use, see
+    ``AdminSite.lazy_urls``.
+    """
+
+    def __init__(self, admin_site, admin_view_class, model, option_class):
+        self.admin_site = admin_site
+        self.admin_view_class = admin_view_class
+        self.model = model
+        self.option_class = option_class
+        self._view = None
+        self.__name__ = admin_view_class.__name__
+        self.__module__ = admin_view_class.__module__
+        self.__doc__ = admin_view_class.__doc__
+
+    @property
+    def view(self):
+        if self._view is None:
+            self._view = self.admin_site.create_model_admin_view(
+                self.admin_view_class, self.model, self.option_class)
+        return self._view
+
+    @property
+    def need_site_permission(self):
+        return self.view.need_site_permission
+
+    def __call__(self, request, *args, **kwargs):
+        return self.view(request, *args, **kwargs)
+
+
 class MergeAdminMetaclass(type):
     def __new__(cls, name, bases, attrs):
         return type.__new__(cls, str(name), bases, attrs)
@@ -40,6 +85,15 @@ class AdminSite(object):
         self._registry_plugins = {}  # view_class class -> plugin_class class
 
         self._admin_view_cache = {}
+        # Create the model admin views on their first request instead of in
+        # get_urls(), for sites with many models.
+        self.lazy_urls = getattr(settings, 'XADMIN_LAZY_URLS', False)
+        # CommAdminView.get_nav_menu_key() -> compiled menu, see
+        # CommAdminView.get_cached_nav_menu()
+        self._nav_menu_cache = {}
+        # (url name, args count, current_app, script prefix, urlconf) -> url
+        # template or None, see get_url_template()
+        self._url_template_cache = {}
 
         self.check_dependencies()
 
@@ -63,6 +117,7 @@ class AdminSite(object):
         self._registry_settings = data['settings']
         self._registry_modelviews = data['modelviews']
         self._registry_plugins = data['plugins']
+        self._nav_menu_cache.clear()
 
     def register_modelview(self, path, admin_view_class, name):
         from xadmin.views.base import BaseAdminView
@@ -80,12 +135,14 @@ class AdminSite(object):
         if issubclass(plugin_class, BaseAdminPlugin):
             self._registry_plugins.setdefault(
                 admin_view_class, []).append(plugin_class)
+            self._nav_menu_cache.clear()
         else:
             raise ImproperlyConfigured(u'The registered plugin class %s isn\'t subclass of %s' %
                                       (plugin_class.__name__, BaseAdminPlugin.__name__))
 
     def register_settings(self, name, admin_class):
         self._registry_settings[name.lower()] = admin_class
+        self._nav_menu_cache.clear()
 
     def register(self, model_or_iterable, admin_class=object, **options):
         from xadmin.views.base import BaseAdminView
@@ -114,6 +171,7 @@ class AdminSite(object):
                 admin_class.order = self.model_admins_order
                 self.model_admins_order += 1
                 self._registry[model] = admin_class
+                self._nav_menu_cache.clear()
             else:
                 if model in self._registry_avs:
                     raise AlreadyRegistered('The admin_view_class %s is already registered' % model.__name__)
@@ -124,6 +182,7 @@ class AdminSite(object):
 
                 # Instantiate the admin class to save in the registry
                 self._registry_avs[model] = admin_class
+                self._nav_menu_cache.clear()
 
     def unregister(self, model_or_iterable):
         """
@@ -140,10 +199,50 @@ class AdminSite(object):
                     raise NotRegistered(
                         'The model %s is not registered' % model.__name__)
                 del self._registry[model]
+                self._nav_menu_cache.clear()
             else:
                 if model not in self._registry_avs:
                     raise NotRegistered('The admin_view_class %s is not registered' % model.__name__)
                 del self._registry_avs[model]
+                self._nav_menu_cache.clear()
+
+    def get_url_template(self, viewname, nargs, current_app=None):
+        """
+        Return ``viewname`` reversed once with ``nargs`` placeholder args, as
+        a template to format quote_url_arg() quoted args into. Return None
+        if the url can't be reversed that way, e.g. when its pattern only
+        accepts digits.
+        """
+        # The language for i18n_patterns and translated patterns
+        key = (viewname, nargs, current_app, get_script_prefix(), get_urlconf(),
+               translation.get_language())
+        try:
+            return self._url_template_cache[key]
+        except KeyError:
+            pass
+        placeholders = ['XADMINARG%dX' % i for i in range(nargs)]
+        try:
+            url = reverse(viewname, args=placeholders, current_app=current_app).replace('%', '%%')
+        except NoReverseMatch:
+            url = None
+        for placeholder in placeholders:
+            if url is None or url.count(placeholder) != 1:
+                url = None
+                break
+            url = url.replace(placeholder, '%s')
+        self._url_template_cache[key] = url
+        return url
+
+    def reverse(self, viewname, args=(), current_app=None):
+        """
+        Same as ``reverse(viewname, args=args)``, but only the first call per
+        url name walks the resolver, the next ones format ``args`` into
+        the url template.
+        """
+        template = self.get_url_template(viewname, len(args), current_app)
+        if template is None:
+            return reverse(viewname, args=args, current_app=current_app)
+        return template % tuple([quote_url_arg(arg) for arg in args])
 
     def set_loginview(self, login_view):
         self.login_view = login_view
@@ -268,10 +367,15 @@ class AdminSite(object):
         new_class_name = ''.join([c.__name__ for c in merges])
 
         if new_class_name not in self._admin_view_cache:
+            from xadmin.views.base import HookRegistry
             plugins = self.get_plugins(view_class, option_class)
-            self._admin_view_cache[new_class_name] = MergeAdminMetaclass(
+            merged_class = MergeAdminMetaclass(
                 new_class_name, tuple(merges),
                 dict({'plugin_classes': plugins, 'admin_site': self}, **opts))
+            # Resolve plugin filter methods once per merged class, so
+            # ``filter_hook`` calls don't rescan plugins on every request.
+            merged_class.hook_registry = HookRegistry(plugins, merged_class.get_hook_names())
+            self._admin_view_cache[new_class_name] = merged_class
 
         return self._admin_view_cache[new_class_name]
 
@@ -281,6 +385,9 @@ class AdminSite(object):
     def create_model_admin_view(self, admin_view_class, model, option_class):
         return self.get_view_class(admin_view_class, option_class).as_view()
 
+    def create_lazy_model_admin_view(self, admin_view_class, model, option_class):
+        return LazyModelAdminView(self, admin_view_class, model, option_class)
+
     def get_urls(self):
         from django.conf.urls import patterns, url, include
         from xadmin.views.base import BaseAdminView
@@ -302,15 +409,16 @@ class AdminSite(object):
         # Registed admin views
         urlpatterns += patterns('',
                                 *[url(
-                                  path, wrap(self.create_admin_view(clz_or_func)) if type(clz_or_func) == type and issubclass(clz_or_func, BaseAdminView) else include(clz_or_func(self)),
+                                  path, wrap(self.create_admin_view(clz_or_func), getattr(clz_or_func, 'cacheable', False)) if type(clz_or_func) == type and issubclass(clz_or_func, BaseAdminView) else include(clz_or_func(self)),
                                   name=name) for path, clz_or_func, name in self._registry_views]
                                 )
 
         # Add in each model's views.
+        create_view = self.create_lazy_model_admin_view if self.lazy_urls \
+            else self.create_model_admin_view
         for model, admin_class in self._registry.items():
             view_urls = [url(
-                path, wrap(
-                    self.create_model_admin_view(clz, model, admin_class)),
+                path, wrap(create_view(clz, model, admin_class)),
                 name=name % (model._meta.app_label, model._meta.model_name))
                 for path, clz, name in self._registry_modelviews]
             urlpatterns += patterns('',
@@ -75,4 +75,47 @@ jQuery(function() {
   $('.btn-quick-form').on('post-success', function(e){
     window.location.reload();
   });
-});
\ No newline at end of file
+});
+jQuery(function() {
+  // Widgets shown as loading are fetched after the page, and again every
+  // data-widget-refresh seconds.
+  function loadWidget(widget, url, refresh){
+    $.ajax({
+      url: url,
+      dataType: 'html',
+      ifModified: true,
+      success: function(html, status){
+        if(status == 'notmodified') return;
+        var nodes = $($.parseHTML(html, document, true)).filter(function(){
+          if(this.nodeType != 1) return false;
+          // The page may have the media of the widget already
+          var el = $(this);
+          if(el.is('script[src]')) return !$('script[src="' + el.attr('src') + '"]').length;
+          if(el.is('link[href]')) return !$('link[href="' + el.attr('href') + '"]').length;
+          return true;
+        });
+        var loaded = nodes.filter('.widget');
+        widget.replaceWith(nodes);
+        widget = loaded;
+        widget.find('.exform:not(.rended)').exform();
+        widget.trigger('widget-loaded');
+      },
+      error: function(){
+        if(widget.hasClass('loading')){
+          widget.find('.panel-body').html('<span class="text-danger"><i class="icon fa fa-exclamation-triangle"></i> ' +
+            gettext('The widget could not be loaded.') + '</span>');
+        }
+      },
+      complete: function(){
+        if(refresh){
+          setTimeout(function(){ loadWidget(widget, url, refresh); }, refresh * 1000);
+        }
+      }
+    });
+  }
+
+  $('.widget[data-widget-url]').each(function(){
+    var widget = $(this);
+    loadWidget(widget, widget.data('widget-url'), widget.data('widget-refresh'));
+  });
+});
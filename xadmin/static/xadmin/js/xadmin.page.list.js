@@ -26,4 +26,16 @@ jQuery(function($){
         $('.results table').addClass('table-condensed');
     });
 
+    // estimated result count, ask the server for the exact one
+    $('.pagination .exact-count').click(function(e){
+        e.preventDefault();
+        var $el = $(this);
+        $el.find('i').addClass('fa-spin');
+        $.getJSON($el.data('count-url'), function(data){
+            $('.pagination .estimated-count').remove();
+            $('.pagination .result-count').text(data.count);
+            $('.pagination .exact-count').parent().remove();
+        });
+    });
+
 });
\ No newline at end of file
@@ -13,11 +13,16 @@ $(document).ready(function(){
       $(this).each(function(){
         var $chart = $(this);
 
-        if($chart.data('chart-obj')) return;
+        if($chart.data('chart-obj') || $chart.data('chart-loading')) return;
+        $chart.data('chart-loading', true);
 
         $chart.html('<span class="text-muted"><i class="icon fa-spinner fa-spin"></i> Loading chart...</span>');
 
-        $.getJSON($chart.data('chart-url'), function(data){
+        // The series are downsampled to the width of the chart
+        var url = $chart.data('chart-url');
+        url += (url.indexOf('?') < 0 ? '?' : '&') + '_width=' + Math.round($chart.width());
+
+        $.getJSON(url, function(data){
             var chart = $.plot($chart, data.data, data.option);
             var previousPoint = null;
             $chart.bind("plothover", function (event, pos, item) {
@@ -47,7 +52,7 @@ $(document).ready(function(){
       })
     }
 
-    $('.chart-tab a').click(function(e){
+    $(document).on('click', '.chart-tab a', function(e){
       e.preventDefault();
       $(this).tab('show');
 
@@ -55,4 +60,10 @@ $(document).ready(function(){
     });
     $('.chart-tab a:first').click();
     $('.chart.init').chart();
+
+    // Charts of the dashboard widgets loaded after the page
+    $(document).on('widget-loaded', '.widget', function(){
+      $(this).find('.chart-tab a:first').click();
+      $(this).find('.chart.init').chart();
+    });
 });
\ No newline at end of file
@@ -22,7 +22,7 @@ jQuery(function() {
         }
     });
 
-    $( ".panel-heading .icon.chevron" ).click(function() {
+    $( document ).on( "click", ".panel-heading .icon.chevron", function() {
         $( this ).toggleClass( "fa fa-chevron-up" ).toggleClass( "fa fa-chevron-down" );
         $( this ).parents( ".panel:first" ).find( ".panel-body" ).toggle('fast');
     });
@@ -1,4 +1,5 @@
 from django.template import Library
+from xadmin.profiling import get_plugin_name
 from xadmin.util import static, vendor as util_vendor
 
 register = Library()
@@ -10,13 +11,25 @@ def view_block(context, block_name, *args, **kwargs):
         return ""
 
     admin_view = context['admin_view']
+    profiler = getattr(admin_view, 'profiler', None)
+    if profiler is not None:
+        return profiler.call('block', block_name, render_view_block,
+                             admin_view, context, block_name, args, kwargs, profiler)
+    return render_view_block(admin_view, context, block_name, args, kwargs)
+
+
+def render_view_block(admin_view, context, block_name, args, kwargs, profiler=None):
     nodes = []
     method_name = 'block_%s' % block_name
 
     for view in [admin_view] + admin_view.plugins:
         if hasattr(view, method_name) and callable(getattr(view, method_name)):
             block_func = getattr(view, method_name)
-            result = block_func(context, nodes, *args, **kwargs)
+            if profiler is not None and view is not admin_view:
+                result = profiler.call('plugin', get_plugin_name(view), block_func,
+                                       context, nodes, *args, **kwargs)
+            else:
+                result = block_func(context, nodes, *args, **kwargs)
             if result and type(result) in (str, ):
                 nodes.append(result)
     if nodes:
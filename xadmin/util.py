@@ -205,6 +205,8 @@ def get_deleted_objects(objs, opts, user, admin_site, using):
     collector = NestedObjects(using=using)
     collector.collect(objs)
     perms_needed = set()
+    # Permission name -> has_perm() result, checked once per model
+    checked_perms = {}
 
     def format_callback(obj):
         has_admin = obj.__class__ in admin_site._registry
@@ -218,7 +220,9 @@ def get_deleted_objects(objs, opts, user, admin_site, using):
                                 None, (quote(obj._get_pk_val()),))
             p = '%s.%s' % (opts.app_label,
                            get_permission_codename('delete', opts))
-            if not user.has_perm(p):
+            if p not in checked_perms:
+                checked_perms[p] = user.has_perm(p)
+            if not checked_perms[p]:
                 perms_needed.add(opts.verbose_name)
             # Display a link to the admin page.
             return mark_safe(u'<span class="label label-info">%s:</span> <a href="%s">%s</a>' %
@@ -330,7 +334,8 @@ def model_ngettext(obj, n=None):
 def is_rel_field(name,model):
     if hasattr(name,'split') and name.find("__")>0:
         parts = name.split("__")
-        if parts[0] in model._meta.get_all_field_names():
+        # Proxy (and deferred) models list no fields of their own
+        if parts[0] in model._meta.concrete_model._meta.get_all_field_names():
             return True
     return False
 
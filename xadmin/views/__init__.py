@@ -4,12 +4,13 @@ from xadmin.views.base import BaseAdminPlugin, BaseAdminView, CommAdminView, \
     AutocompleteView, InMapView
 
 
-from xadmin.views.list import ListAdminView
+from xadmin.views.list import ListAdminView, ListCountView
 from xadmin.views.edit import CreateAdminView, UpdateAdminView, ModelFormAdminView
 from xadmin.views.delete import DeleteAdminView
 from xadmin.views.detail import DetailAdminView
 from xadmin.views.form import FormAdminView
-from xadmin.views.dashboard import Dashboard, BaseWidget, widget_manager, ModelDashboard
+from xadmin.views.dashboard import Dashboard, BaseWidget, widget_manager, ModelDashboard, \
+    DashboardWidgetView
 from xadmin.views.website import IndexView, LoginView, LogoutView, UserSettingView
 
 __all__ = (
@@ -28,9 +29,11 @@ def register_builtin_views(site):
     site.register_view(r'^logout/$', LogoutView, name='logout')
 
     site.register_view(r'^settings/user$', UserSettingView, name='user_settings')
+    site.register_view(r'^dashboard/widget/(\d+)/$', DashboardWidgetView, name='dashboard_widget')
 
     site.register_modelview(r'^$', ListAdminView, name='%s_%s_changelist')
     site.register_modelview(r'^add/$', CreateAdminView, name='%s_%s_add')
+    site.register_modelview(r'^count/$', ListCountView, name='%s_%s_count')
     site.register_modelview(
         r'^(.+)/delete/$', DeleteAdminView, name='%s_%s_delete')
     site.register_modelview(
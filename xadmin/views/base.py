@@ -1,5 +1,4 @@
 import sys
-import copy
 import functools
 import datetime
 import decimal
@@ -32,6 +31,8 @@ from django.utils.translation import ugettext as _
 from django.views.decorators.csrf import csrf_protect
 from django.views.generic import View
 from xadmin.util import static, json, vendor, sortkeypicker
+from xadmin.perms import get_perm_oracle
+from xadmin.listquery import SessionListQuery
 
 
 csrf_protect_m = method_decorator(csrf_protect)
@@ -60,6 +61,79 @@ def filter_chain(filters, token, func, *args, **kwargs):
         return filter_chain(filters, token - 1, _inner_method, *args, **kwargs)
 
 
+# How a plugin filter method receives the parent method result
+HOOK_NO_ARG = 0  # only ``self``, parent result must be None
+HOOK_VALUE = 1  # receive the parent result as first arg
+HOOK_WRAP = 2  # first arg named ``__``, receive the parent method itself
+
+
+def get_hook_mode(fm):
+    fargs = getargspec(fm)[0]
+    if len(fargs) == 1:
+        return HOOK_NO_ARG
+    return HOOK_WRAP if fargs[1] == '__' else HOOK_VALUE
+
+
+def run_hook_chain(hooks, func, args, kwargs):
+    """
+    Run ``func`` through ``hooks``, a list of ``(method, mode)`` ordered by
+    priority. Methods are called in a plain loop, only the part of the chain
+    wrapped by a ``__`` method is deferred into a callable.
+    """
+    start = 0
+    for index in range(len(hooks) - 1, -1, -1):
+        if hooks[index][1] == HOOK_WRAP:
+            inner = hooks[:index]
+            result = hooks[index][0](lambda: run_hook_chain(inner, func, args, kwargs), *args, **kwargs)
+            start = index + 1
+            break
+    else:
+        result = func()
+
+    for fm, mode in hooks[start:]:
+        if mode == HOOK_NO_ARG:
+            if result is not None:
+                raise IncorrectPluginArg(u'Plugin filter method need a arg to receive parent method result.')
+            result = fm()
+        else:
+            result = fm(result, *args, **kwargs)
+    return result
+
+
+class HookRegistry(object):
+    """
+    Plugin filter methods of a merged admin view class, keyed by hook name.
+
+    Each entry is a list of ``(plugin index, mode)`` sorted by ``priority``,
+    the index points into the view class ``plugin_classes``.
+    """
+
+    def __init__(self, plugin_classes, hook_names=()):
+        self.plugin_classes = plugin_classes
+        self._hooks = {}
+        for name in hook_names:
+            self.get(name)
+
+    def get(self, name):
+        try:
+            return self._hooks[name]
+        except KeyError:
+            pass
+        hooks = []
+        for index, plugin_class in enumerate(self.plugin_classes):
+            fm = getattr(plugin_class, name, None)
+            if callable(fm):
+                try:
+                    mode = get_hook_mode(fm)
+                except TypeError:
+                    # Resolved on the bound method at request time
+                    mode = None
+                hooks.append((getattr(fm, 'priority', 10), index, mode))
+        hooks.sort(key=lambda h: h[0])
+        self._hooks[name] = hooks = [(index, mode) for p, index, mode in hooks]
+        return hooks
+
+
 def filter_hook(func):
     tag = func.__name__
     func.__doc__ = "``filter_hook``\n\n" + (func.__doc__ or "")
@@ -70,13 +144,14 @@ def filter_hook(func):
         def _inner_method():
             return func(self, *args, **kwargs)
 
+        profiler = getattr(self, 'profiler', None)
+        if profiler is not None:
+            return profiler.run_hook(self, tag, _inner_method, args, kwargs)
         if self.plugins:
-            filters = [(getattr(getattr(p, tag), 'priority', 10), getattr(p, tag))
-                       for p in self.plugins if callable(getattr(p, tag, None))]
-            filters = [f for p, f in sorted(filters, key=lambda x:x[0])]
-            return filter_chain(filters, len(filters) - 1, _inner_method, *args, **kwargs)
+            return run_hook_chain(self.get_plugin_hooks(tag), _inner_method, args, kwargs)
         else:
             return _inner_method()
+    method.hook_name = tag
     return method
 
 
@@ -133,20 +208,24 @@ class BaseAdminObject(object):
         return self.get_view(view_class, self.admin_site._registry.get(model), *args, **kwargs)
 
     def get_admin_url(self, name, *args, **kwargs):
-        return reverse('%s:%s' % (self.admin_site.app_name, name), args=args, kwargs=kwargs)
+        if kwargs:
+            return reverse('%s:%s' % (self.admin_site.app_name, name), args=args, kwargs=kwargs)
+        return self.admin_site.reverse('%s:%s' % (self.admin_site.app_name, name), args)
 
     def get_model_url(self, model, name, *args, **kwargs):
-        return reverse(
-            '%s:%s_%s_%s' % (self.admin_site.app_name, model._meta.app_label,
-                             model._meta.model_name, name),
-            args=args, kwargs=kwargs, current_app=self.admin_site.name)
+        viewname = '%s:%s_%s_%s' % (self.admin_site.app_name, model._meta.app_label,
+                                    model._meta.model_name, name)
+        if kwargs:
+            return reverse(viewname, args=args, kwargs=kwargs, current_app=self.admin_site.name)
+        return self.admin_site.reverse(viewname, args, current_app=self.admin_site.name)
 
     def get_model_perm(self, model, name):
         return '%s.%s_%s' % (model._meta.app_label, name, model._meta.model_name)
 
     def has_model_perm(self, model, name, user=None):
-        user = user or self.user
-        return user.has_perm(self.get_model_perm(model, name)) or (name == 'view' and self.has_model_perm(model, 'change', user))
+        oracle = get_perm_oracle(self.request, user)
+        return oracle.has_perm(self.get_model_perm(model, name)) or \
+            (name == 'view' and oracle.has_perm(self.get_model_perm(model, 'change')))
 
     def get_query_string(self, new_params=None, remove=None):
         if new_params is None:
@@ -230,11 +309,15 @@ class BaseAdminView(BaseAdminObject, View):
 
     base_template = 'xadmin/base.html'
     need_site_permission = True
+    # xadmin.profiling.Profiler timing the request, set by ProfilingPlugin
+    profiler = None
 
     def __init__(self, request, *args, **kwargs):
         self.request = request
         self.request_method = request.method.lower()
         self.user = request.user
+        # Permission checks of the request, see xadmin.perms
+        self.perm_oracle = get_perm_oracle(request)
 
         self.base_plugins = [p(self) for p in getattr(self,
                                                       "plugin_classes", [])]
@@ -258,6 +341,8 @@ class BaseAdminView(BaseAdminObject, View):
             else:
                 handler = self.http_method_not_allowed
 
+            if self.profiler is not None:
+                return self.profiler.run_view(handler, request, *args, **kwargs)
             return handler(request, *args, **kwargs)
 
         # take name and docstring from class
@@ -271,6 +356,7 @@ class BaseAdminView(BaseAdminObject, View):
 
     def init_plugin(self, *args, **kwargs):
         plugins = []
+        active_plugins = []
         for p in self.base_plugins:
             p.request = self.request
             p.user = self.user
@@ -279,7 +365,43 @@ class BaseAdminView(BaseAdminObject, View):
             result = p.init_request(*args, **kwargs)
             if result is not False:
                 plugins.append(p)
+                active_plugins.append(p)
+            else:
+                active_plugins.append(None)
         self.plugins = plugins
+        self._active_plugins = active_plugins
+        self._plugin_hooks = {}
+
+    @classmethod
+    def get_hook_registry(cls):
+        registry = cls.__dict__.get('hook_registry')
+        if registry is None:
+            registry = HookRegistry(getattr(cls, 'plugin_classes', []))
+            cls.hook_registry = registry
+        return registry
+
+    @classmethod
+    def get_hook_names(cls):
+        return [name for name in dir(cls)
+                if getattr(getattr(cls, name, None), 'hook_name', None) == name]
+
+    def get_plugin_hooks(self, name):
+        """
+        Return the ``(method, mode)`` list of the plugins enabled for this
+        request, bound once per hook name.
+        """
+        try:
+            return self._plugin_hooks[name]
+        except KeyError:
+            pass
+        hooks = []
+        for index, mode in self.get_hook_registry().get(name):
+            plugin = self._active_plugins[index]
+            if plugin is not None:
+                fm = getattr(plugin, name)
+                hooks.append((fm, get_hook_mode(fm) if mode is None else mode))
+        self._plugin_hooks[name] = hooks
+        return hooks
 
     @filter_hook
     def get_context(self):
@@ -386,42 +508,87 @@ class CommAdminView(BaseAdminView):
 
         return site_menu
 
+    def get_nav_menu_key(self):
+        """
+        Key of the menu in the site cache: views with the same site menu,
+        titles and icons, and the same plugins around get_nav_menu(), share
+        one menu.
+        """
+        return (
+            getattr(self.get_site_menu, '__func__', None),
+            tuple([type(getattr(method, '__self__', None)) for method, mode in
+                   self.get_plugin_hooks('get_nav_menu') + self.get_plugin_hooks('get_model_icon')]),
+            frozenset(self.global_models_icon.items()),
+            frozenset(self.apps_label_title.items()),
+            frozenset(self.apps_icons.items()),
+            self.default_model_icon,
+        )
+
+    def get_cached_nav_menu(self):
+        """
+        Return ``(items, perms)``, the result of get_nav_menu() built once per
+        admin site. ``perms`` lists the distinct permission names the menu
+        requires. Each item is an ``(attrs, perm, children)`` tuple, where a
+        permission name is replaced by its index in ``perms``.
+        """
+        key = self.get_nav_menu_key()
+        menu_cache = self.admin_site._nav_menu_cache
+        if key not in menu_cache:
+            perms = []
+
+            def compile_items(items):
+                compiled = []
+                for item in items:
+                    attrs = dict(item)
+                    perm = attrs.pop('perm', None)
+                    children = attrs.pop('menus', None)
+                    if perm is not None and not callable(perm) and perm != 'super':
+                        if perm not in perms:
+                            perms.append(perm)
+                        perm = perms.index(perm)
+                    compiled.append((attrs, perm, None if children is None else compile_items(children)))
+                return compiled
+
+            menu_cache[key] = (compile_items(self.get_nav_menu()), perms)
+        return menu_cache[key]
+
+    def get_user_nav_menu(self):
+        """
+        Return a copy of the cached menu holding the items the user may see.
+        """
+        items, perms = self.get_cached_nav_menu()
+        granted = [self.perm_oracle.has_perm(perm) for perm in perms]
+
+        def check_menu_permission(need_perm):
+            if need_perm is None:
+                return True
+            elif callable(need_perm):
+                return need_perm(self.user)
+            elif need_perm == 'super':
+                return self.user.is_superuser
+            else:
+                return granted[need_perm]
+
+        def filter_items(items):
+            result = []
+            for attrs, need_perm, children in items:
+                if not check_menu_permission(need_perm):
+                    continue
+                item = dict(attrs)
+                if children is not None:
+                    item['menus'] = filter_items(children)
+                    if children and not item['menus']:
+                        continue
+                result.append(item)
+            return result
+
+        return filter_items(items)
+
     @filter_hook
     def get_context(self):
         context = super(CommAdminView, self).get_context()
 
-        if not settings.DEBUG and 'nav_menu' in self.request.session:
-            nav_menu = json.loads(self.request.session['nav_menu'])
-        else:
-            menus = copy.copy(self.get_nav_menu())
-
-            def check_menu_permission(item):
-                need_perm = item.pop('perm', None)
-                if need_perm is None:
-                    return True
-                elif callable(need_perm):
-                    return need_perm(self.user)
-                elif need_perm == 'super':
-                    return self.user.is_superuser
-                else:
-                    return self.user.has_perm(need_perm)
-
-            def filter_item(item):
-                if 'menus' in item:
-                    before_filter_length = len(item['menus'])
-                    item['menus'] = [filter_item(
-                        i) for i in item['menus'] if check_menu_permission(i)]
-                    after_filter_length = len(item['menus'])
-                    if after_filter_length == 0 and before_filter_length > 0:
-                        return None
-                return item
-
-            nav_menu = [filter_item(item) for item in menus if check_menu_permission(item)]
-            nav_menu = list(filter(lambda x:x, nav_menu))
-
-            if not settings.DEBUG:
-                self.request.session['nav_menu'] = json.dumps(nav_menu)
-                self.request.session.modified = True
+        nav_menu = self.get_user_nav_menu()
 
         def check_selected(menu, path):
             selected = False
@@ -474,6 +641,8 @@ class ModelAdminView(CommAdminView):
     ordering = None
     model = None
     remove_permissions = []
+    # Where the last list query string is kept, see xadmin.listquery
+    list_query_store = SessionListQuery
 
     def __init__(self, request, *args, **kwargs):
         self.opts = self.model._meta
@@ -529,9 +698,11 @@ class ModelAdminView(CommAdminView):
             return None
 
     def model_admin_url(self, name, *args, **kwargs):
-        return reverse(
-            "%s:%s_%s_%s" % (self.admin_site.app_name, self.opts.app_label,
-            self.model_name, name), args=args, kwargs=kwargs)
+        viewname = "%s:%s_%s_%s" % (self.admin_site.app_name, self.opts.app_label,
+                                    self.model_name, name)
+        if kwargs:
+            return reverse(viewname, args=args, kwargs=kwargs)
+        return self.admin_site.reverse(viewname, args)
 
     def get_model_perms(self):
         """
@@ -573,24 +744,25 @@ class ModelAdminView(CommAdminView):
         view_codename = get_permission_codename('view', self.opts)
         change_codename = get_permission_codename('change', self.opts)
 
-        return ('view' not in self.remove_permissions) and (self.user.has_perm('%s.%s' % (self.app_label, view_codename)) or \
-            self.user.has_perm('%s.%s' % (self.app_label, change_codename)))
+        return ('view' not in self.remove_permissions) and (
+            self.perm_oracle.has_perm('%s.%s' % (self.app_label, view_codename), obj) or
+            self.perm_oracle.has_perm('%s.%s' % (self.app_label, change_codename), obj))
 
     def has_add_permission(self):
         codename = get_permission_codename('add', self.opts)
-        return ('add' not in self.remove_permissions) and self.user.has_perm('%s.%s' % (self.app_label, codename))
+        return ('add' not in self.remove_permissions) and self.perm_oracle.has_perm('%s.%s' % (self.app_label, codename))
 
     def has_change_permission(self, obj=None):
         codename = get_permission_codename('change', self.opts)
-        return ('change' not in self.remove_permissions) and self.user.has_perm('%s.%s' % (self.app_label, codename))
+        return ('change' not in self.remove_permissions) and self.perm_oracle.has_perm('%s.%s' % (self.app_label, codename), obj)
 
     def has_delete_permission(self, obj=None):
         codename = get_permission_codename('delete', self.opts)
-        return ('delete' not in self.remove_permissions) and self.user.has_perm('%s.%s' % (self.app_label, codename))
+        return ('delete' not in self.remove_permissions) and self.perm_oracle.has_perm('%s.%s' % (self.app_label, codename), obj)
 
 
     def has_export_permission(self, obj=None):
-        return ('export' not in self.remove_permissions) and self.user.has_perm('%s.export_%s' % self.model_info)
+        return ('export' not in self.remove_permissions) and self.perm_oracle.has_perm('%s.export_%s' % self.model_info, obj)
 
 
 class AutocompleteView(BaseAdminView):
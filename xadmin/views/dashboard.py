@@ -1,12 +1,20 @@
+import hashlib
+import logging
+import threading
+import time
+
 from django import forms
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
-from django.core.urlresolvers import reverse, NoReverseMatch
-from django.db import models
+from django.core.urlresolvers import reverse, NoReverseMatch, get_script_prefix, set_script_prefix, \
+    get_urlconf, set_urlconf
+from django.db import close_old_connections, connections, models
 from django.db.models.base import ModelBase
 from django.forms.forms import DeclarativeFieldsMetaclass
 from django.forms.util import flatatt
 from django.template import loader
-from django.http import Http404
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.middleware.csrf import get_token
 from django.template.context import RequestContext
 from django.test.client import RequestFactory
 import sys
@@ -14,10 +22,13 @@ if sys.version_info.major < 3:
    from django.utils.encoding import force_unicode as force_text, smart_unicode as smart_text
 else:
    from django.utils.encoding import force_text, smart_text
+from django.utils import timezone, translation
+from django.utils.six.moves import queue
 from django.utils.html import escape
 from django.utils.safestring import mark_safe
 from django.utils.translation import ugettext as _
-from django.utils.http import urlencode, urlquote
+from django.utils.cache import patch_cache_control
+from django.utils.http import urlencode, urlquote, parse_etags, quote_etag
 from django.views.decorators.cache import never_cache
 from xadmin import widgets as exwidgets
 from xadmin.layout import FormHelper
@@ -185,6 +196,12 @@ class BaseWidget(forms.Form):
     widget_icon = 'fa fa-plus-square'
     widget_type = 'base'
     base_title = None
+    # Shown as loading, the page then fetches it from DashboardWidgetView
+    lazy_load = False
+    # Seconds the HTML fetched is cached, None renders it every time
+    cache_timeout = None
+    # Seconds between two fetches of a lazy widget, None fetches it once
+    refresh_interval = None
 
     id = forms.IntegerField(label=_('Widget ID'), widget=forms.HiddenInput)
     title = forms.CharField(label=_('Widget Title'), required=False, widget=exwidgets.AdminTextInputWidget)
@@ -213,8 +230,16 @@ class BaseWidget(forms.Form):
         if not (self.user.is_superuser or self.has_perm()):
             raise PermissionDenied
 
+    # HTML of the widget once rendered
+    rendered = None
+
     @property
     def widget(self):
+        if self.rendered is None:
+            self.rendered = self.render_widget()
+        return self.rendered
+
+    def render_widget(self):
         context = {'widget_id': self.id, 'widget_title': self.title, 'widget_icon': self.widget_icon,
             'widget_type': self.widget_type, 'form': self, 'widget': self}
         self.context(context)
@@ -388,7 +413,7 @@ class QuickBtnWidget(BaseWidget):
             btn = {}
             if 'model' in b:
                 model = self.get_model(b['model'])
-                if not self.user.has_perm("%s.view_%s" % (model._meta.app_label, model._meta.model_name)):
+                if not self.dashboard.perm_oracle.has_perm("%s.view_%s" % (model._meta.app_label, model._meta.model_name)):
                     continue
                 btn['url'] = reverse("%s:%s_%s_%s" % (self.admin_site.app_name, model._meta.app_label,
                                                       model._meta.model_name, b.get('view', 'changelist')))
@@ -488,10 +513,162 @@ class AddFormWidget(ModelBaseWidget, PartialBaseWidget):
         return self.add_view.media + self.add_view.form_obj.media + self.vendor('xadmin.plugin.quick-form.js')
 
 
+class LoadingWidget(object):
+    """
+    Shown in place of a lazy widget, or of a widget the dashboard stopped
+    waiting for. The page then fetches it from ``DashboardWidgetView``.
+    """
+    template = 'xadmin/widgets/loading.html'
+
+    def __init__(self, dashboard, user_widget):
+        self.dashboard = dashboard
+        self.id = user_widget.id
+        widget_class = widget_manager.get(user_widget.widget_type)
+        self.title = user_widget.get_value().get('title') or widget_class.widget_title or \
+            widget_class.base_title
+        self.widget_icon = widget_class.widget_icon
+        self.refresh_interval = widget_class.refresh_interval
+        self.url = dashboard.get_admin_url('dashboard_widget', user_widget.id)
+
+    @property
+    def widget(self):
+        context = {'widget_id': self.id, 'widget_title': self.title, 'widget_icon': self.widget_icon,
+            'widget_url': self.url, 'widget_refresh': self.refresh_interval, 'widget': self}
+        return loader.render_to_string(self.template, context,
+                                       context_instance=RequestContext(self.dashboard.request))
+
+    def media(self):
+        return forms.Media()
+
+
+class WidgetTask(object):
+    """
+    Call of ``func(*args)`` on a ``WidgetExecutor`` thread, with the
+    language, time zone and urls of the thread creating the task.
+    """
+
+    def __init__(self, func, *args):
+        self.func = func
+        self.args = args
+        self.done = threading.Event()
+        self.lock = threading.Lock()
+        self.started = False
+        self.cancelled = False
+        self.result = None
+        self.language = translation.get_language()
+        self.timezone = timezone.get_current_timezone()
+        self.urlconf = get_urlconf()
+        self.script_prefix = get_script_prefix()
+
+    def run(self):
+        with self.lock:
+            if self.cancelled:
+                return
+            self.started = True
+        if self.language:
+            translation.activate(self.language)
+        timezone.activate(self.timezone)
+        set_urlconf(self.urlconf)
+        set_script_prefix(self.script_prefix)
+        try:
+            self.result = self.func(*self.args)
+        finally:
+            # Like at the end of a request
+            close_old_connections()
+            translation.deactivate()
+            timezone.deactivate()
+            set_urlconf(None)
+            self.done.set()
+
+    def cancel(self):
+        """
+        Drop the task if it didn't start yet. Return whether it is dropped.
+        """
+        with self.lock:
+            if not self.started:
+                self.cancelled = True
+            return self.cancelled
+
+    def wait(self, timeout):
+        """
+        Wait at most ``timeout`` seconds for the task to end. Return whether
+        it ended.
+        """
+        self.done.wait(timeout)
+        return self.done.is_set()
+
+
+def wait_tasks(tasks, timeout):
+    """
+    Wait at most ``timeout`` seconds in all for ``tasks`` to end, and drop
+    the ones not started by then. Return whether each one ended.
+    """
+    deadline = time.time() + timeout
+    ended = []
+    for task in tasks:
+        done = task.wait(max(deadline - time.time(), 0))
+        if not done:
+            task.cancel()
+        ended.append(done)
+    return ended
+
+
+class WidgetExecutor(object):
+    """
+    Daemon threads running the ``WidgetTask`` of every dashboard in turn.
+    There are as many threads as the largest ``widget_workers`` asked.
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.threads = []
+        self.lock = threading.Lock()
+
+    def submit(self, tasks, workers):
+        with self.lock:
+            while len(self.threads) < workers:
+                thread = threading.Thread(target=self.work)
+                # A widget never ending doesn't keep the process alive
+                thread.daemon = True
+                thread.start()
+                self.threads.append(thread)
+        for task in tasks:
+            self.queue.put(task)
+
+    def work(self):
+        while True:
+            task = self.queue.get()
+            try:
+                task.run()
+            except Exception as e:
+                logging.error(e, exc_info=True)
+
+widget_executor = WidgetExecutor()
+
+
+def shares_connections():
+    """
+    Whether other threads see the same databases. In-memory SQLite
+    databases are per connection.
+    """
+    for connection in connections.all():
+        if connection.vendor == 'sqlite' and \
+                connection.is_in_memory_db(connection.settings_dict['NAME']):
+            return False
+    return True
+
+
 class Dashboard(CommAdminView):
 
     widget_customiz = True
     widgets = []
+    # Threads of widget_executor building and rendering the widgets at the
+    # same time, 0 builds them one after the other. Each thread has its own
+    # database connection.
+    widget_workers = 0
+    # Seconds to wait for the widgets of a page, then it fetches the others
+    # after
+    widget_timeout = 10
     title = _(u"Dashboard")
     icon = None
 
@@ -513,7 +690,7 @@ class Dashboard(CommAdminView):
             class widget_with_perm(wid):
                 def context(self, context):
                     super(widget_with_perm, self).context(context)
-                    context.update({'has_change_permission': self.request.user.has_perm('xadmin.change_userwidget')})
+                    context.update({'has_change_permission': self.dashboard.perm_oracle.has_perm('xadmin.change_userwidget')})
             wid_instance = widget_with_perm(self, data or widget.get_value())
             return wid_instance
         except UserWidget.DoesNotExist:
@@ -560,16 +737,62 @@ class Dashboard(CommAdminView):
                             try:
                                 widget = user_widgets.get(int(wid))
                                 if widget:
-                                    ws.append(self.get_widget(widget))
+                                    ws.append(widget)
                             except Exception as e:
-                                import logging
                                 logging.error(e, exc_info=True)
                         widgets.append(ws)
 
-                return widgets
+                return self.load_widgets(widgets)
 
         return self.get_init_widget()
 
+    def load_widget(self, user_widget, render=False):
+        """
+        Return the widget of ``user_widget``, rendered with ``render``, or
+        None if it fails.
+        """
+        try:
+            widget = self.get_widget(user_widget)
+            if render and widget is not None:
+                widget.widget
+            return widget
+        except Exception as e:
+            logging.error(e, exc_info=True)
+
+    def is_lazy_widget(self, user_widget):
+        try:
+            return widget_manager.get(user_widget.widget_type).lazy_load
+        except KeyError:
+            return False
+
+    def load_widgets(self, columns):
+        """
+        Build the widgets of the ``UserWidget`` columns, the lazy ones being
+        shown as loading. With ``widget_workers``, they are built and
+        rendered in threads, and the ones not ready ``widget_timeout``
+        seconds later are shown as loading too.
+        """
+        if not self.widget_workers or self.profiler is not None or not shares_connections():
+            return [[w for w in [LoadingWidget(self, uw) if self.is_lazy_widget(uw) else self.load_widget(uw)
+                                 for uw in col] if w is not None]
+                    for col in columns]
+
+        tasks = [[None if self.is_lazy_widget(uw) else WidgetTask(self.load_widget, uw, True)
+                  for uw in col] for col in columns]
+        all_tasks = [task for col in tasks for task in col if task is not None]
+        widget_executor.submit(all_tasks, self.widget_workers)
+        ended = dict(zip(all_tasks, wait_tasks(all_tasks, self.widget_timeout)))
+        widgets = []
+        for col, col_tasks in zip(columns, tasks):
+            ws = []
+            for user_widget, task in zip(col, col_tasks):
+                if task is None or not ended[task]:
+                    ws.append(LoadingWidget(self, user_widget))
+                elif task.result is not None:
+                    ws.append(task.result)
+            widgets.append(ws)
+        return widgets
+
     @filter_hook
     def get_title(self):
         return self.title
@@ -667,3 +890,55 @@ class ModelDashboard(Dashboard, ModelAdminView):
     def get(self, request, *args, **kwargs):
         self.widgets = self.get_widgets()
         return self.template_response(self.get_template_list('views/model_dashboard.html'), self.get_context())
+
+
+class DashboardWidgetView(Dashboard):
+    """
+    HTML of a widget of the user and its media, fetched by the dashboards
+    showing it as loading. It is sent with an ETag, and cached for the
+    ``cache_timeout`` of the widget, so fetching it again costs one cache
+    lookup. A widget changes its cache key when its options change.
+    """
+    # Sets its own cache headers, see AdminSite.admin_view
+    cacheable = True
+
+    def init_request(self, widget_id, *args, **kwargs):
+        try:
+            self.user_widget = UserWidget.objects.get(user=self.user, id=widget_id)
+            self.widget_class = widget_manager.get(self.user_widget.widget_type)
+        except (UserWidget.DoesNotExist, KeyError):
+            raise Http404
+
+    def get_page_id(self):
+        return self.user_widget.page_id
+
+    def get_cache_key(self):
+        # The HTML has the csrf token of the form of the options
+        parts = [self.user_widget.id, self.user_widget.value, translation.get_language(),
+                 timezone.get_current_timezone_name(), get_token(self.request)]
+        return 'xadmin_widget_%s' % hashlib.md5(repr(parts).encode('utf-8')).hexdigest()
+
+    @filter_hook
+    def get_content(self):
+        widget = self.get_widget(self.user_widget)
+        return u'%s\n%s' % (widget.media().render(), widget.widget)
+
+    def get(self, request, *args, **kwargs):
+        timeout = self.widget_class.cache_timeout
+        key = self.get_cache_key()
+        entry = cache.get(key) if timeout else None
+        if entry is None:
+            content = self.get_content()
+            entry = (hashlib.md5(content.encode('utf-8')).hexdigest(), content)
+            if timeout:
+                cache.set(key, entry, timeout)
+
+        etag, content = entry
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(content)
+        response['ETag'] = quote_etag(etag)
+        # Asked again each time, the user may have changed the widget
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
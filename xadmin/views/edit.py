@@ -526,9 +526,9 @@ class UpdateAdminView(ModelFormAdminView):
                 return request.REQUEST["_redirect"]
             elif self.has_view_permission():
                 change_list_url = self.model_admin_url('changelist')
-                if 'LIST_QUERY' in self.request.session \
-                and self.request.session['LIST_QUERY'][0] == list(self.model_info):
-                    change_list_url += '?' + self.request.session['LIST_QUERY'][1]
+                list_query = self.list_query_store(self).get()
+                if list_query:
+                    change_list_url += '?' + list_query
                 return change_list_url
             else:
                 return self.get_admin_url('index')
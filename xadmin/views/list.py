@@ -1,4 +1,7 @@
-from django.core.exceptions import PermissionDenied, ObjectDoesNotExist
+import base64
+import datetime
+
+from django.core.exceptions import PermissionDenied, ObjectDoesNotExist, ValidationError
 from django.core.paginator import InvalidPage, Paginator
 from django.db import models
 from django.http import HttpResponseRedirect
@@ -14,7 +17,10 @@ from django.utils.safestring import mark_safe
 from django.utils.text import capfirst
 from django.utils.translation import ugettext as _
 
-from xadmin.util import lookup_field, display_for_field, label_for_field, boolean_icon
+from xadmin.counts import ExactCount
+from xadmin.planner import QueryPlan, logger as planner_logger
+from xadmin.util import lookup_field, display_for_field, label_for_field, boolean_icon, \
+    get_fields_from_path, json
 
 from xadmin.views.base import ModelAdminView, filter_hook, inclusion_tag, csrf_protect_m
 
@@ -25,6 +31,11 @@ PAGE_VAR = 'p'
 TO_FIELD_VAR = 't'
 COL_LIST_VAR = '_cols'
 ERROR_FLAG = 'e'
+CURSOR_VAR = 'c'
+
+# Keyset pagination directions
+CURSOR_NEXT = 'n'
+CURSOR_PREV = 'p'
 
 DOT = '.'
 
@@ -44,20 +55,89 @@ class FakeMethodField(object):
 
 
 class ResultRow(dict):
-    pass
+    # Other attributes, e.g. ``css_class``, are optional and go to the
+    # instance dict. The templates can't tell unset slots from errors.
+    __slots__ = ('cells', '__dict__')
+
+
+class PendingList(list):
+    """
+    Empty list read from a cell list that was never set. It stores itself on
+    the cell when it is first changed, so cells only allocate the lists
+    plugins fill.
+    """
+    __slots__ = ('owner', 'name')
+
+    def __init__(self, owner, name):
+        super(PendingList, self).__init__()
+        self.owner = owner
+        self.name = name
+
+    def _store(self):
+        if self.owner is not None:
+            setattr(self.owner, self.name, self)
+            self.owner = None
+
+    def append(self, value):
+        self._store()
+        super(PendingList, self).append(value)
+
+    def extend(self, values):
+        self._store()
+        super(PendingList, self).extend(values)
+
+    def insert(self, index, value):
+        self._store()
+        super(PendingList, self).insert(index, value)
+
+    def __iadd__(self, values):
+        self._store()
+        return super(PendingList, self).__iadd__(values)
+
+    def __setitem__(self, index, value):
+        self._store()
+        super(PendingList, self).__setitem__(index, value)
+
+
+def cell_list(name):
+    slot = '_' + name
+
+    def get(self):
+        value = getattr(self, slot)
+        return PendingList(self, name) if value is None else value
+
+    def set(self, value):
+        setattr(self, slot, value)
+    return property(get, set)
+
+
+# Cell text computed by display_for_field() from the field and value when
+# it is first read
+LAZY_TEXT = object()
+LAZY_THUMB_TEXT = object()
 
 
 class ResultItem(object):
+    # Plugins may still set other attributes, e.g. ``export``
+    __slots__ = ('_classes', '_text', '_wraps', 'tag', '_tag_attrs', 'allow_tags', '_btns',
+                 '_menus', 'is_display_link', 'row', 'field_name', 'field', 'attr', 'value',
+                 '__dict__')
+
+    classes = cell_list('classes')
+    wraps = cell_list('wraps')
+    tag_attrs = cell_list('tag_attrs')
+    btns = cell_list('btns')
+    menus = cell_list('menus')
 
     def __init__(self, field_name, row):
-        self.classes = []
-        self.text = '&nbsp;'
-        self.wraps = []
+        self._classes = None
+        self._text = '&nbsp;'
+        self._wraps = None
         self.tag = 'td'
-        self.tag_attrs = []
+        self._tag_attrs = None
         self.allow_tags = False
-        self.btns = []
-        self.menus = []
+        self._btns = None
+        self._menus = None
         self.is_display_link = False
         self.row = row
         self.field_name = field_name
@@ -65,24 +145,57 @@ class ResultItem(object):
         self.attr = None
         self.value = None
 
+    @property
+    def text(self):
+        text = self._text
+        if text is LAZY_TEXT:
+            text = self._text = display_for_field(self.value, self.field)
+        elif text is LAZY_THUMB_TEXT:
+            text = self._text = display_for_field(self.value, self.field, show_thumb=True)
+        return text
+
+    @text.setter
+    def text(self, value):
+        self._text = value
+
+    def __getstate__(self):
+        # Rows kept by RowCachePlugin only need what the templates render
+        state = dict(getattr(self, '__dict__', {}))
+        for klass in type(self).__mro__:
+            for name in getattr(klass, '__slots__', ()):
+                if name != '__dict__' and hasattr(self, name):
+                    state[name] = getattr(self, name)
+        for name in ('_classes', '_wraps', '_tag_attrs', '_btns', '_menus'):
+            if state[name] is not None:
+                state[name] = list(state[name])
+        state.update(_text=self.text, field=None, attr=None, value=None)
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
     @property
     def label(self):
         text = mark_safe(
             self.text) if self.allow_tags else conditional_escape(self.text)
         if force_text(text) == '':
             text = mark_safe('&nbsp;')
-        for wrap in self.wraps:
+        for wrap in self._wraps or ():
             text = mark_safe(wrap % text)
         return text
 
     @property
     def tagattrs(self):
+        tag_attrs, classes = self._tag_attrs, self._classes
         return mark_safe(
-            '%s%s' % ((self.tag_attrs and ' '.join(self.tag_attrs) or ''),
-            (self.classes and (' class="%s"' % ' '.join(self.classes)) or '')))
+            '%s%s' % ((tag_attrs and ' '.join(tag_attrs) or ''),
+            (classes and (' class="%s"' % ' '.join(classes)) or '')))
 
 
 class ResultHeader(ResultItem):
+    __slots__ = ('sortable', 'sorted', 'ascending', 'sort_priority', 'url_primary',
+                 'url_remove', 'url_toggle')
 
     def __init__(self, field_name, row):
         super(ResultHeader, self).__init__(field_name, row)
@@ -106,12 +219,22 @@ class ListAdminView(ModelAdminView):
     list_display_links = ()
     list_display_links_details = False
     list_select_related = None
+    # Load the page rows with only() the fields the columns read, see xadmin.planner
+    list_projection = True
     list_per_page = 50
     list_max_show_all = 200
     list_exclude = ()
     list_thumb_fields = []
     search_fields = ()
     paginator_class = Paginator
+    # 'offset' pages with Paginator, 'keyset' seeks from the ordering values
+    # of the previous page's first/last row and never counts the rows.
+    list_pagination = 'offset'
+    # Callable class returning (count, estimated) for a queryset, see xadmin.counts
+    count_strategy = ExactCount
+    estimate_count_threshold = 100000
+    # Rows fetched per query by iter_result_queryset()
+    queryset_chunk_size = 1000
     ordering = None
 
     # Change list templates
@@ -123,7 +246,8 @@ class ListAdminView(ModelAdminView):
             raise PermissionDenied
 
         request = self.request
-        request.session['LIST_QUERY'] = (self.model_info, self.request.META['QUERY_STRING'])
+        self.list_query = self.list_query_store(self)
+        self.save_list_query()
 
         self.pk_attname = self.opts.pk.attname
         self.lookup_opts = self.opts
@@ -143,9 +267,17 @@ class ListAdminView(ModelAdminView):
 
         if PAGE_VAR in self.params:
             del self.params[PAGE_VAR]
+        if CURSOR_VAR in self.params:
+            del self.params[CURSOR_VAR]
         if ERROR_FLAG in self.params:
             del self.params[ERROR_FLAG]
 
+    def save_list_query(self):
+        """
+        Remember the query string of the list, the edit views redirect to it.
+        """
+        self.list_query.save(self.request.META['QUERY_STRING'])
+
     @filter_hook
     def get_list_display(self):
         """
@@ -172,27 +304,36 @@ class ListAdminView(ModelAdminView):
         # Get search parameters from the query string.
         self.base_queryset = self.queryset()
         self.list_queryset = self.get_list_queryset()
+        # The rows displayed on the page, restricted to the fields they show.
+        self.result_queryset = self.query_plan.project(self.list_queryset)
         self.ordering_field_columns = self.get_ordering_field_columns()
+
+        if self.use_keyset_pagination():
+            return self.make_keyset_result_list()
+
         self.paginator = self.get_paginator()
 
         # Get the number of objects, with admin filters applied.
-        self.result_count = self.paginator.count
+        count = self.count_strategy(self)
+        self.result_count, self.result_count_estimated = count(self.list_queryset)
+        self.paginator._count = self.result_count
 
         # Get the total number of objects, with no admin filters applied.
         # Perform a slight optimization: Check to see whether any filters were
-        # given. If not, use paginator.hits to calculate the number of objects,
-        # because we've already done paginator.hits and the value is cached.
+        # given. If not, use the result count we've already got.
         if not self.list_queryset.query.where:
             self.full_result_count = self.result_count
         else:
-            self.full_result_count = self.base_queryset.count()
+            self.full_result_count = count(self.base_queryset)[0]
 
         self.can_show_all = self.result_count <= self.list_max_show_all
         self.multi_page = self.result_count > self.list_per_page
 
         # Get the list of objects to display on this page.
         if self.list_per_page == 0 or (self.show_all and self.can_show_all) or not self.multi_page:
-            self.result_list = self.list_queryset._clone()
+            # Left lazy, exports may iterate it chunk by chunk.
+            self.result_list = self.result_queryset._clone()
+            self.has_more = False
         else:
             if self.page_num >= self.paginator.num_pages:
                 self.page_num = 0
@@ -205,13 +346,184 @@ class ListAdminView(ModelAdminView):
                         'title': _('Database error'),
                     })
                 return HttpResponseRedirect(self.request.path + '?' + ERROR_FLAG + '=1')
-        self.has_more = self.result_count > (
-            self.list_per_page * self.page_num + len(self.result_list))
+            self.has_more = self.result_count > (
+                self.list_per_page * self.page_num + len(self.result_list))
+
+    def use_keyset_pagination(self):
+        # Page number requests (e.g. the ajax select widget) still use offsets.
+        return self.list_pagination == 'keyset' and bool(self.list_per_page) \
+            and PAGE_VAR not in self.request.GET and self.get_keyset_fields() is not None
+
+    def get_keyset_fields(self):
+        """
+        Return ``(lookup, field, descending)`` for each ``get_ordering()`` item,
+        or None if the ordering can't be used as a keyset: every field must be
+        a concrete, not null field reached through not null foreign keys.
+        """
+        if hasattr(self, '_keyset_fields'):
+            return self._keyset_fields
+
+        keyset_fields = []
+        for order in self.get_ordering():
+            if not hasattr(order, 'lstrip') or order.lstrip('-') in ('', '?'):
+                keyset_fields = None
+                break
+            lookup = order.lstrip('-')
+            try:
+                if lookup == 'pk':
+                    fields = [self.opts.pk]
+                else:
+                    fields = get_fields_from_path(self.model, lookup)
+            except models.FieldDoesNotExist:
+                keyset_fields = None
+                break
+            last = fields[-1]
+            if not all(isinstance(f, models.Field) and getattr(f, 'concrete', True) and not f.null
+                       for f in fields) or (last.rel is not None and last is not self.opts.pk) \
+                    or any(not isinstance(f.rel, models.ManyToOneRel) for f in fields[:-1]):
+                keyset_fields = None
+                break
+            keyset_fields.append((lookup, fields, order.startswith('-')))
+
+        self._keyset_fields = keyset_fields
+        return keyset_fields
+
+    def _get_keyset_raw_values(self, obj):
+        values = []
+        for lookup, fields, descending in self.get_keyset_fields():
+            value = obj
+            for f in fields[:-1]:
+                value = getattr(value, f.name)
+            values.append(getattr(value, fields[-1].attname))
+        return values
+
+    def _get_keyset_values(self, obj):
+        values = []
+        for value in self._get_keyset_raw_values(obj):
+            if isinstance(value, (datetime.date, datetime.time)):
+                value = value.isoformat()
+            elif not isinstance(value, (int, float, bool)):
+                value = force_text(value)
+            values.append(value)
+        return values
+
+    def encode_cursor(self, direction, obj):
+        data = [direction, list(self.get_ordering()), self._get_keyset_values(obj)]
+        return force_text(base64.urlsafe_b64encode(json.dumps(data).encode('utf-8')))
+
+    def decode_cursor(self, cursor):
+        """
+        Return ``(direction, values)`` for the cursor query param, or None if
+        it is missing, malformed or was made for a different ordering.
+        """
+        if not cursor:
+            return None
+        try:
+            direction, ordering, values = json.loads(
+                base64.urlsafe_b64decode(str(cursor)).decode('utf-8'))
+            keyset_fields = self.get_keyset_fields()
+            if direction not in (CURSOR_NEXT, CURSOR_PREV) or ordering != list(self.get_ordering()) \
+                    or len(values) != len(keyset_fields):
+                return None
+            values = [fields[-1].to_python(v) for (lookup, fields, descending), v in zip(keyset_fields, values)]
+        except (TypeError, ValueError, ValidationError):
+            return None
+        return direction, values
+
+    def get_keyset_filter(self, values, forward=True):
+        """
+        Build the seek condition ``(a, b, pk) > (va, vb, vpk)`` honoring each
+        field ordering direction.
+        """
+        condition = None
+        equals = {}
+        for (lookup, fields, descending), value in zip(self.get_keyset_fields(), values):
+            op = 'gt' if forward != descending else 'lt'
+            q = models.Q(**dict(equals, **{'%s__%s' % (lookup, op): value}))
+            condition = q if condition is None else condition | q
+            equals[lookup] = value
+        return condition
+
+    def make_keyset_result_list(self):
+        cursor = self.decode_cursor(self.request.GET.get(CURSOR_VAR))
+        direction = cursor[0] if cursor else CURSOR_NEXT
+        forward = direction == CURSOR_NEXT
+
+        queryset = self.result_queryset
+        if cursor:
+            queryset = queryset.filter(self.get_keyset_filter(cursor[1], forward))
+        if not forward:
+            queryset = queryset.reverse()
+
+        # One extra row tells whether there is a page beyond this one.
+        rows = list(queryset[:self.list_per_page + 1])
+        has_extra = len(rows) > self.list_per_page
+        rows = rows[:self.list_per_page]
+        if not forward:
+            rows.reverse()
+
+        self.paginator = None
+        self.result_list = rows
+        if forward:
+            self.has_more = has_extra
+            self.has_previous = cursor is not None
+        else:
+            self.has_more = True
+            self.has_previous = has_extra
+
+        # Only the single page case gives the exact count for free.
+        self.result_count_estimated = False
+        if not self.has_more and not self.has_previous:
+            self.result_count = len(rows)
+            if not self.list_queryset.query.where:
+                self.full_result_count = self.result_count
+            else:
+                self.full_result_count = None
+        else:
+            self.result_count = None
+            self.full_result_count = None
+
+        self.can_show_all = False
+        self.multi_page = self.has_more or self.has_previous
+
+    def iter_result_queryset(self, queryset=None, chunk_size=None):
+        """
+        Yield the objects of ``queryset`` (``result_queryset`` by default) one
+        chunk at a time, so memory stays bounded for any number of rows.
+        Chunks seek from the last row when the ordering can be used as a
+        keyset, otherwise they are sliced by offset.
+        """
+        if queryset is None:
+            queryset = self.result_queryset
+        chunk_size = chunk_size or self.queryset_chunk_size
+        # A page of the paginator is already sliced, it can't be filtered
+        use_keyset = self.get_keyset_fields() is not None and queryset.query.can_filter()
+        chunk_queryset = queryset
+        offset = 0
+        while True:
+            if use_keyset:
+                rows = list(chunk_queryset[:chunk_size])
+            else:
+                rows = list(queryset[offset:offset + chunk_size])
+                offset += chunk_size
+            for obj in rows:
+                yield obj
+            if len(rows) < chunk_size:
+                break
+            if use_keyset:
+                chunk_queryset = queryset.filter(
+                    self.get_keyset_filter(self._get_keyset_raw_values(rows[-1])))
 
     @filter_hook
     def get_result_list(self):
         return self.make_result_list()
 
+    def get_count_url(self):
+        """
+        Url of the ajax view computing the exact count of the current list.
+        """
+        return self.model_admin_url('count') + self.get_query_string(remove=[PAGE_VAR, CURSOR_VAR])
+
     @filter_hook
     def post_result_list(self):
         return self.make_result_list()
@@ -224,26 +536,15 @@ class ListAdminView(ModelAdminView):
         # First, get queryset from base class.
         queryset = self.queryset()
 
-        # Use select_related() if one of the list_display options is a field
-        # with a relationship and the provided queryset doesn't already have
-        # select_related defined.
-        if not queryset.query.select_related:
-            if self.list_select_related:
+        # Follow the relations used by the list columns with select_related()
+        # and prefetch_related(), see get_query_plan().
+        self.query_plan = self.get_query_plan()
+        planner_logger.debug(self.query_plan.report())
+        if self.list_select_related is not False:
+            if self.list_select_related and not queryset.query.select_related:
                 queryset = queryset.select_related()
-            elif self.list_select_related is None:
-                related_fields = []
-                for field_name in self.list_display:
-                    try:
-                        field = self.opts.get_field(field_name)
-                    except models.FieldDoesNotExist:
-                        pass
-                    else:
-                        if isinstance(field.rel, models.ManyToOneRel):
-                            related_fields.append(field_name)
-                if related_fields:
-                    queryset = queryset.select_related(*related_fields)
-            else:
-                pass
+            queryset = self.query_plan.apply(
+                queryset, select_related=not queryset.query.select_related)
 
         # Then, set queryset ordering.
         queryset = queryset.order_by(*self.get_ordering())
@@ -251,6 +552,42 @@ class ListAdminView(ModelAdminView):
         # Return the queryset.
         return queryset
 
+    @filter_hook
+    def get_query_plan(self):
+        """
+        Return the :class:`xadmin.planner.QueryPlan` applied to the list
+        queryset. Override it, or wrap it from a plugin, to add or replace
+        the relations the planner found.
+        """
+        plan = QueryPlan(self.model)
+        for field_name in self.list_display:
+            self.plan_list_column(plan, field_name)
+        if self.list_display_links_details:
+            # The details link title shows the object
+            self.plan_list_column(plan, '__str__')
+        for order in self.get_ordering():
+            if hasattr(order, 'lstrip') and order.lstrip('-') not in ('', '?'):
+                plan.add_only_path(order.lstrip('-'))
+        if not self.list_projection:
+            plan.disable_projection('list_projection')
+        return plan
+
+    def plan_list_column(self, plan, field_name):
+        if callable(field_name):
+            attr = field_name
+        elif plan.add_path(field_name):
+            return
+        elif hasattr(self, field_name) and field_name not in ('__str__', '__unicode__'):
+            attr = getattr(self, field_name)
+        else:
+            attr = getattr(self.model, field_name, None)
+        fields = getattr(attr, 'admin_fields', None)
+        if fields is None:
+            plan.disable_projection(getattr(attr, '__name__', field_name))
+        else:
+            for path in fields:
+                plan.add_path(path, field_name)
+
     # List ordering
     def _get_default_ordering(self):
         ordering = []
@@ -410,16 +747,15 @@ class ListAdminView(ModelAdminView):
         The 'change list' admin view for this model.
         """
         response = self.get_result_list()
-        if response:
-            return response
-
-        context = self.get_context()
-        context.update(kwargs or {})
+        if not response:
+            context = self.get_context()
+            context.update(kwargs or {})
 
-        response = self.get_response(context, *args, **kwargs)
+            response = self.get_response(context, *args, **kwargs) or \
+                TemplateResponse(request, self.object_list_template or
+                                 self.get_template_list('views/model_list.html'), context, current_app=self.admin_site.name)
 
-        return response or TemplateResponse(request, self.object_list_template or
-                                            self.get_template_list('views/model_list.html'), context, current_app=self.admin_site.name)
+        return self.list_query.process_response(response)
 
     @filter_hook
     def post_response(self, *args, **kwargs):
@@ -432,7 +768,7 @@ class ListAdminView(ModelAdminView):
 
     @filter_hook
     def get_paginator(self):
-        return self.paginator_class(self.list_queryset, self.list_per_page, 0, True)
+        return self.paginator_class(self.result_queryset, self.list_per_page, 0, True)
 
     @filter_hook
     def get_page_number(self, i):
@@ -443,6 +779,21 @@ class ListAdminView(ModelAdminView):
         else:
             return mark_safe(u'<a href="%s"%s>%d</a> ' % (escape(self.get_query_string({PAGE_VAR: i})), (i == self.paginator.num_pages - 1 and ' class="end"' or ''), i + 1))
 
+    @filter_hook
+    def get_cursor_link(self, direction):
+        if direction == CURSOR_PREV:
+            title, enabled = _(u'Previous'), self.has_previous
+            obj = self.result_list[0] if self.result_list else None
+            text = u'<i class="fa fa-angle-left"></i> %s' % title
+        else:
+            title, enabled = _(u'Next'), self.has_more
+            obj = self.result_list[-1] if self.result_list else None
+            text = u'%s <i class="fa fa-angle-right"></i>' % title
+        if not enabled or obj is None:
+            return mark_safe(u'<span class="text-muted">%s</span> ' % text)
+        return mark_safe(u'<a href="%s">%s</a> ' % (escape(self.get_query_string(
+            {CURSOR_VAR: self.encode_cursor(direction, obj)}, [PAGE_VAR])), text))
+
     # Result List methods
     @filter_hook
     def result_header(self, field_name, row):
@@ -560,10 +911,11 @@ class ListAdminView(ModelAdminView):
                     else:
                         item.text = field_val
                 else:
+                    # Rendered when read, see ResultItem.text
                     if f.name in self.list_thumb_fields:
-                        item.text = display_for_field(value, f, show_thumb=True)
+                        item.text = LAZY_THUMB_TEXT
                     else:
-                        item.text = display_for_field(value, f)
+                        item.text = LAZY_TEXT
                 if isinstance(f, models.DateField)\
                     or isinstance(f, models.TimeField)\
                         or isinstance(f, models.ForeignKey):
@@ -599,6 +951,16 @@ class ListAdminView(ModelAdminView):
             obj, field_name, row) for field_name in self.list_display]
         return row
 
+    @filter_hook
+    def cached_result_row(self, obj, row):
+        """
+        Row of ``obj`` RowCachePlugin took from the cache instead of calling
+        result_row(). Plugins keeping state from result_item() restore it
+        here.
+        """
+        row['object'] = obj
+        return row
+
     @filter_hook
     def results(self):
         results = []
@@ -630,6 +992,16 @@ class ListAdminView(ModelAdminView):
             not self.show_all or not self.can_show_all) and self.multi_page
         if not pagination_required:
             page_range = []
+        elif paginator is None:
+            # Keyset pagination only knows its neighbour pages.
+            return {
+                'cl': self,
+                'pagination_required': pagination_required,
+                'show_all_url': False,
+                'page_range': map(self.get_cursor_link, (CURSOR_PREV, CURSOR_NEXT)),
+                'ALL_VAR': ALL_VAR,
+                '1': 1,
+            }
         else:
             ON_EACH_SIDE = {'normal': 5, 'small': 3}.get(page_type, 3)
             ON_ENDS = 2
@@ -668,3 +1040,18 @@ class ListAdminView(ModelAdminView):
             'ALL_VAR': ALL_VAR,
             '1': 1,
         }
+
+
+class ListCountView(ListAdminView):
+    """
+    Return the exact number of objects of a filtered list as json, requested
+    by the list page when its count is only an estimate.
+    """
+
+    def save_list_query(self):
+        # Asked by the list page, the list query is the page's
+        pass
+
+    def get(self, request, *args, **kwargs):
+        queryset = self.get_list_queryset()
+        return self.render_response({'count': queryset.count()})